@@ -1,98 +1,72 @@
 # ABOUTME: HTML templates for admin panel
+from html import escape
+from urllib.parse import urlencode
 
-def get_admin_html(players, teams, stats, max_team_size=2, poaching_enabled=True):
-    """Generate admin panel HTML"""
-    
-    # Build team lookup map for faster access
-    team_map = {team.get("id"): team.get("name") for team in teams}
-    
-    # Build players table
-    players_rows = ""
-    for player in players:
-        team_id = player.get("team_id")
-        team_name = team_map.get(team_id, "Free Agent") if team_id else "Free Agent"
-        
-        players_rows += f"""
-        <tr>
-            <td>{player.get('name')}</td>
-            <td>{team_name}</td>
-            <td>{player.get('joined_at', '')[:19]}</td>
-            <td>
-            <form method="POST" action="/admin/delete-player" style="display: inline;">
-            <input type="hidden" name="player_name" value="{player.get('name')}">
-            <button type="submit" onclick="return confirm('Delete player {player.get('name')}?')">Delete</button>
-            </form>
-            </td>
-        </tr>
-        """
-    
-    # Build teams table
-    teams_rows = ""
-    for team in teams:
-        member_count = team.get('member_count', 0)
-        status = "Full" if team.get('is_full') else f"{member_count}/{max_team_size}"
-        
-        teams_rows += f"""
-        <tr>
-            <td>{team.get('name')}</td>
-            <td>{member_count}</td>
-            <td>{status}</td>
-            <td>{team.get('created_at', '')[:19]}</td>
-            <td>
-                <form method="POST" action="/admin/delete-team" style="display: inline;">
-                    <input type="hidden" name="team_name" value="{team.get('name')}">
-                    <button type="submit" onclick="return confirm('Delete team {team.get('name')}?')">Delete</button>
-                </form>
-            </td>
-        </tr>
-        """
-    
-    html = f"""
+# Query parameters of /admin and their defaults; one page of each table is shown
+ADMIN_VIEW_DEFAULTS = {
+    "players_search": "",
+    "players_filter": "all",
+    "players_sort": "joined_at",
+    "players_after": "",
+    "players_before": "",
+    "teams_search": "",
+    "teams_filter": "all",
+    "teams_sort": "created_at",
+    "teams_after": "",
+    "teams_before": "",
+}
+
+PLAYER_FILTER_LABELS = {"all": "All players", "free_agents": "Free agents", "on_team": "On a team"}
+TEAM_FILTER_LABELS = {"all": "All teams", "open": "Open", "full": "Full"}
+
+
+# Static start of the admin panel (head, styles, title); sent before any data is loaded
+ADMIN_HEAD_HTML = """
     <!DOCTYPE html>
     <html>
     <head>
         <title>Team Poaching Game - Admin Panel</title>
         <style>
-            body {{
+            body {
                 font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
                 max-width: 1200px;
                 margin: 0 auto;
                 padding: 20px;
                 background: #f5f5f5;
-            }}
-            h1 {{
+            }
+            h1 {
                 color: #333;
                 border-bottom: 3px solid #007bff;
                 padding-bottom: 10px;
-            }}
-            h2 {{
+            }
+            h2 {
                 color: #555;
                 margin-top: 30px;
-            }}
-            .stats {{
+            }
+            .stats {
                 display: grid;
                 grid-template-columns: repeat(auto-fit, minmax(200px, 1fr));
                 gap: 20px;
                 margin: 20px 0;
-            }}
-            .stat-card {{
+            }
+            .stat-card {
                 background: white;
                 padding: 20px;
                 border-radius: 8px;
                 box-shadow: 0 2px 4px rgba(0,0,0,0.1);
-            }}
-            .stat-card h3 {{
+            }
+            .stat-card h3 {
                 margin: 0 0 10px 0;
                 color: #666;
                 font-size: 14px;
                 text-transform: uppercase;
-            }}
-            .stat-card .number {{
+            }
+            .stat-card .number {
                 font-size: 36px;
                 font-weight: bold;
                 color: #007bff;
-            }}
-            table {{
+            }
+            table {
                 width: 100%;
                 border-collapse: collapse;
                 background: white;
@@ -100,87 +74,245 @@ def get_admin_html(players, teams, stats, max_team_size=2, poaching_enabled=True
                 border-radius: 8px;
                 overflow: hidden;
                 margin: 20px 0;
-            }}
-            th {{
+            }
+            th {
                 background: #007bff;
                 color: white;
                 padding: 12px;
                 text-align: left;
                 font-weight: 600;
-            }}
-            td {{
+            }
+            td {
                 padding: 12px;
                 border-bottom: 1px solid #eee;
-            }}
-            tr:hover {{
+            }
+            tr:hover {
                 background: #f8f9fa;
-            }}
-            button {{
+            }
+            button {
                 padding: 8px 16px;
                 border: none;
                 border-radius: 4px;
                 cursor: pointer;
                 font-size: 14px;
                 transition: all 0.2s;
-            }}
-            button[type="submit"] {{
+            }
+            button[type="submit"] {
                 background: #dc3545;
                 color: white;
-            }}
-            button[type="submit"]:hover {{
+            }
+            button[type="submit"]:hover {
                 background: #c82333;
-            }}
-            .action-buttons {{
+            }
+            .action-buttons {
                 display: flex;
                 gap: 10px;
                 margin: 20px 0;
                 flex-wrap: wrap;
-            }}
-            .action-buttons button {{
+            }
+            .action-buttons button {
                 padding: 12px 24px;
                 font-size: 16px;
-            }}
-            .reset-btn {{
+            }
+            .reset-btn {
                 background: #dc3545;
                 color: white;
-            }}
-            .reset-btn:hover {{
+            }
+            .reset-btn:hover {
                 background: #c82333;
-            }}
-            .test-data-btn {{
+            }
+            .test-data-btn {
                 background: #28a745;
                 color: white;
-            }}
-            .test-data-btn:hover {{
+            }
+            .test-data-btn:hover {
                 background: #218838;
-            }}
-            .auto-assign-btn {{
+            }
+            .auto-assign-btn {
                 background: #17a2b8;
                 color: white;
-            }}
-            .auto-assign-btn:hover {{
+            }
+            .auto-assign-btn:hover {
                 background: #138496;
-            }}
-            .refresh-btn {{
+            }
+            .refresh-btn {
                 background: #007bff;
                 color: white;
-            }}
-            .refresh-btn:hover {{
+            }
+            .refresh-btn:hover {
                 background: #0056b3;
-            }}
-            .warning {{
+            }
+            .table-controls {
+                display: flex;
+                gap: 10px;
+                align-items: center;
+            }
+            .table-controls input, .table-controls select {
+                padding: 8px;
+                border: 2px solid #ddd;
+                border-radius: 4px;
+            }
+            .table-controls button {
+                border: none;
+            }
+            .pager {
+                display: flex;
+                gap: 15px;
+                align-items: center;
+                color: #666;
+            }
+            th a {
+                color: white;
+                text-decoration: none;
+            }
+            th.sorted-asc a::after {
+                content: ' ▲';
+            }
+            th.sorted-desc a::after {
+                content: ' ▼';
+            }
+            .warning {
                 background: #fff3cd;
                 border: 1px solid #ffc107;
                 color: #856404;
                 padding: 12px;
                 border-radius: 4px;
                 margin: 20px 0;
-            }}
+            }
         </style>
     </head>
     <body>
         <h1>🎮 Team Poaching Game - Admin Panel</h1>
-        
+"""
+
+
+def admin_url(view, **changes):
+    """Link to /admin with the current view, some parameters changed; defaults are left out"""
+    params = {**view, **changes}
+    query = urlencode({key: value for key, value in params.items() if value != ADMIN_VIEW_DEFAULTS.get(key)})
+    return "/admin" + (f"?{query}" if query else "")
+
+
+def sort_header(view, table, column, label):
+    """Table header linking to this column's sort, toggling the direction when it is the current one"""
+    current = view[f"{table}_sort"]
+    if current == column:
+        sort, css = f"-{column}", "sorted-asc"
+    elif current == f"-{column}":
+        sort, css = column, "sorted-desc"
+    else:
+        sort, css = column, ""
+    url = admin_url(view, **{f"{table}_sort": sort, f"{table}_after": "", f"{table}_before": ""})
+    return f'<th class="{css}"><a href="{escape(url)}">{label}</a></th>'
+
+
+def table_controls(view, table, filter_labels):
+    """Search box and filter for one table; the other table's view rides along in hidden fields"""
+    hidden = "".join(
+        f'<input type="hidden" name="{key}" value="{escape(str(value))}">'
+        for key, value in view.items()
+        if not key.startswith(table) and value != ADMIN_VIEW_DEFAULTS[key]
+    )
+    if view[f"{table}_sort"] != ADMIN_VIEW_DEFAULTS[f"{table}_sort"]:
+        hidden += f'<input type="hidden" name="{table}_sort" value="{escape(view[f"{table}_sort"])}">'
+    options = "".join(
+        f'<option value="{value}"{" selected" if view[f"{table}_filter"] == value else ""}>{label}</option>'
+        for value, label in filter_labels.items()
+    )
+    return f"""
+        <form method="GET" action="/admin" class="table-controls">
+            {hidden}
+            <input type="search" name="{table}_search" value="{escape(view[f"{table}_search"])}" placeholder="Search by name">
+            <select name="{table}_filter">{options}</select>
+            <button type="submit" class="refresh-btn">Apply</button>
+        </form>
+    """
+
+
+def pager(view, table, cursors):
+    """First/previous/next links for one table, from its (previous, next) page cursors"""
+    previous_cursor, next_cursor = cursors
+    links = []
+    if view[f"{table}_after"] or view[f"{table}_before"]:
+        url = admin_url(view, **{f"{table}_after": "", f"{table}_before": ""})
+        links.append(f'<a href="{escape(url)}">First</a>')
+    if previous_cursor:
+        url = admin_url(view, **{f"{table}_after": "", f"{table}_before": previous_cursor})
+        links.append(f'<a href="{escape(url)}">&larr; Previous</a>')
+    if next_cursor:
+        url = admin_url(view, **{f"{table}_after": next_cursor, f"{table}_before": ""})
+        links.append(f'<a href="{escape(url)}">Next &rarr;</a>')
+    return f'<div class="pager">{" ".join(links)}</div>'
+
+
+# Rows rendered into one chunk of the streamed admin page
+ROWS_PER_CHUNK = 25
+
+
+def _chunks(rows):
+    """Join rendered rows into chunks of ROWS_PER_CHUNK"""
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == ROWS_PER_CHUNK:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def player_row(player):
+    """Players table row with a delete button"""
+    name = escape(player.get('name'))
+    team_name = escape(player.get("team_name") or "Free Agent")
+
+    return f"""
+        <tr>
+            <td>{name}</td>
+            <td>{team_name}</td>
+            <td>{player.get('joined_at', '')[:19]}</td>
+            <td>
+            <form method="POST" action="/admin/delete-player" style="display: inline;">
+            <input type="hidden" name="player_name" value="{name}">
+            <button type="submit" onclick="return confirm(this.dataset.confirm)" data-confirm="Delete player {name}?">Delete</button>
+            </form>
+            </td>
+        </tr>
+        """
+
+
+def team_row(team, max_team_size):
+    """Teams table row with a delete button"""
+    name = escape(team.get('name'))
+    member_count = team.get('member_count', 0)
+    status = "Full" if team.get('is_full') else f"{member_count}/{max_team_size}"
+
+    return f"""
+        <tr>
+            <td>{name}</td>
+            <td>{member_count}</td>
+            <td>{status}</td>
+            <td>{team.get('created_at', '')[:19]}</td>
+            <td>
+                <form method="POST" action="/admin/delete-team" style="display: inline;">
+                    <input type="hidden" name="team_name" value="{name}">
+                    <button type="submit" onclick="return confirm(this.dataset.confirm)" data-confirm="Delete team {name}?">Delete</button>
+                </form>
+            </td>
+        </tr>
+        """
+
+
+def get_admin_html(players, teams, stats, max_team_size=2, poaching_enabled=True, view=None,
+                   players_cursors=(None, None), teams_cursors=(None, None)):
+    """Generate the admin panel for one page of players and teams in chunks, everything after ADMIN_HEAD_HTML
+
+    The caller sends ADMIN_HEAD_HTML before loading the data, so the browser can fetch
+    and lay out the static part of the page while the database is queried.
+    """
+    view = {**ADMIN_VIEW_DEFAULTS, **(view or {})}
+
+    yield f"""
         <div class="stats">
             <div class="stat-card">
                 <h3>Total Players</h3>
@@ -218,36 +350,59 @@ def get_admin_html(players, teams, stats, max_team_size=2, poaching_enabled=True
             </form>
         </div>
 
-        <h2>👥 Players ({len(players)})</h2>
-        <table id="players-table" class="sortable">
+        <h2>👥 Players</h2>
+        {table_controls(view, "players", PLAYER_FILTER_LABELS)}
+        <table id="players-table">
             <thead>
                 <tr>
-                    <th data-type="string">Name</th>
-                    <th data-type="string">Team</th>
-                    <th data-type="date">Joined At</th>
-                    <th data-sortable="false">Actions</th>
+                    {sort_header(view, "players", "name", "Name")}
+                    <th>Team</th>
+                    {sort_header(view, "players", "joined_at", "Joined At")}
+                    <th>Actions</th>
                 </tr>
             </thead>
             <tbody>
-                {players_rows if players_rows else '<tr><td colspan="4" style="text-align: center; color: #999;">No players yet</td></tr>'}
+    """
+
+    # Rows go out in chunks as they are rendered instead of being joined into one string
+    empty = True
+    for chunk in _chunks(player_row(player) for player in players):
+        empty = False
+        yield chunk
+    if empty:
+        yield '<tr><td colspan="4" style="text-align: center; color: #999;">No players found</td></tr>'
+
+    yield f"""
             </tbody>
         </table>
+        {pager(view, "players", players_cursors)}
 
-        <h2>🏆 Teams ({len(teams)})</h2>
-        <table id="teams-table" class="sortable">
+        <h2>🏆 Teams</h2>
+        {table_controls(view, "teams", TEAM_FILTER_LABELS)}
+        <table id="teams-table">
             <thead>
                 <tr>
-                    <th data-type="string">Name</th>
-                    <th data-type="number">Members</th>
-                    <th data-type="string">Status</th>
-                    <th data-type="date">Created At</th>
-                    <th data-sortable="false">Actions</th>
+                    {sort_header(view, "teams", "name", "Name")}
+                    <th>Members</th>
+                    <th>Status</th>
+                    {sort_header(view, "teams", "created_at", "Created At")}
+                    <th>Actions</th>
                 </tr>
             </thead>
             <tbody>
-                {teams_rows if teams_rows else '<tr><td colspan="5" style="text-align: center; color: #999;">No teams yet</td></tr>'}
+    """
+
+    empty = True
+    for chunk in _chunks(team_row(team, max_team_size) for team in teams):
+        empty = False
+        yield chunk
+    if empty:
+        yield '<tr><td colspan="5" style="text-align: center; color: #999;">No teams found</td></tr>'
+
+    yield f"""
             </tbody>
         </table>
+        {pager(view, "teams", teams_cursors)}
 
         <h2>⚙️ Settings</h2>
         <div style="background: white; padding: 20px; border-radius: 8px; box-shadow: 0 2px 4px rgba(0,0,0,0.1); margin: 20px 0;">
@@ -274,91 +429,9 @@ def get_admin_html(players, teams, stats, max_team_size=2, poaching_enabled=True
         <div class="warning">
             ⚠️ <strong>Admin Access:</strong> This panel is password protected. Do not share the URL with players.
         </div>
-        
-        <script>
-        // Simple table sorting for admin tables (ascending/descending toggle)
-        (function() {{
-            function parseValue(val, type) {{
-                if (type === 'number') {{
-                    const n = parseFloat(val.replace(/[^0-9.\-]/g, ''));
-                    return isNaN(n) ? Number.NEGATIVE_INFINITY : n;
-                }}
-                if (type === 'date') {{
-                    const d = new Date(val);
-                    return isNaN(d.getTime()) ? 0 : d.getTime();
-                }}
-                return (val || '').toString().toLowerCase();
-            }}
-
-            function getCellText(row, idx) {{
-                const cell = row.children[idx];
-                return cell ? cell.textContent.trim() : '';
-            }}
-
-            function sortTable(table, columnIndex, type, direction) {{
-                const tbody = table.querySelector('tbody');
-                const rows = Array.from(tbody.querySelectorAll('tr'));
-                const multiplier = direction === 'asc' ? 1 : -1;
-                const withIndex = rows.map((tr, i) => ({{ tr, i }}));
-
-                withIndex.sort((a, b) => {{
-                    const av = parseValue(getCellText(a.tr, columnIndex), type);
-                    const bv = parseValue(getCellText(b.tr, columnIndex), type);
-                    if (av < bv) return -1 * multiplier;
-                    if (av > bv) return 1 * multiplier;
-                    return a.i - b.i; // stable sort
-                }});
-
-                // Reattach rows in sorted order
-                const frag = document.createDocumentFragment();
-                withIndex.forEach(({{ tr }}) => frag.appendChild(tr));
-                tbody.appendChild(frag);
-            }}
-
-            function setupTable(table) {{
-                const headers = Array.from(table.querySelectorAll('thead th'));
-                headers.forEach((th, idx) => {{
-                    const sortable = th.getAttribute('data-sortable');
-                    if (sortable === 'false') return;
-                    th.style.cursor = 'pointer';
-                    th.addEventListener('click', () => {{
-                        const currentCol = table.getAttribute('data-sort-col');
-                        const currentDir = table.getAttribute('data-sort-dir') || 'asc';
-                        const newDir = currentCol == String(idx) ? (currentDir === 'asc' ? 'desc' : 'asc') : 'asc';
-                        const type = th.getAttribute('data-type') || 'string';
-
-                        // Clear previous indicators
-                        headers.forEach(h => {{
-                            h.classList.remove('sorted-asc');
-                            h.classList.remove('sorted-desc');
-                        }});
-
-                        // Perform sort and set indicators
-                        sortTable(table, idx, type, newDir);
-                        th.classList.add(newDir === 'asc' ? 'sorted-asc' : 'sorted-desc');
-                        table.setAttribute('data-sort-col', String(idx));
-                        table.setAttribute('data-sort-dir', newDir);
-                    }});
-                }});
-            }}
-
-            // Add visual indicators via CSS classes
-            const style = document.createElement('style');
-            style.textContent = `
-                .sortable th {{ position: relative; user-select: none; }}
-                .sortable th.sorted-asc::after {{ content: ' ▲'; position: relative; left: 4px; }}
-                .sortable th.sorted-desc::after {{ content: ' ▼'; position: relative; left: 4px; }}
-            `;
-            document.head.appendChild(style);
-
-            document.querySelectorAll('table.sortable').forEach(setupTable);
-        }})();
-        </script>
     </body>
     </html>
     """
-    
-    return html
 
 
 def get_login_html(error=None):
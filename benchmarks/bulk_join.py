@@ -0,0 +1,95 @@
+# ABOUTME: Benchmark comparing N individual /join requests with one /join/bulk request
+"""
+Onboards a class of N players two ways through the FastAPI app in-process
+(no uvicorn) and reports wall time and database round trips for each:
+
+- individual: N concurrent POST /join requests, one batch each
+- bulk: a single POST /join/bulk with all N names, one batch in total
+
+Point it at a database reachable over the network to see round trip costs,
+e.g. a local `turso dev` server or a scratch Turso database:
+
+    TURSO_DATABASE_URL=http://127.0.0.1:8080 uv run python benchmarks/bulk_join.py
+
+The database is reset before every run.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, GameManager
+
+
+class RoundTripCounter:
+    """Counts batches sent to the game's storage backend"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.count = 0
+        self._batch = backend.batch
+        backend.batch = self.batch
+
+    async def batch(self, statements):
+        self.count += 1
+        return await self._batch(statements)
+
+
+async def run_individual(http: httpx.AsyncClient, names: list):
+    responses = await asyncio.gather(*(http.post("/join", json={"player_name": name}) for name in names))
+    for response in responses:
+        if response.status_code != 201:
+            raise RuntimeError(f"/join failed: {response.text}")
+
+
+async def run_bulk(http: httpx.AsyncClient, names: list):
+    response = await http.post("/join/bulk", json={"player_names": names})
+    if response.status_code != 201 or response.json()["conflicts"]:
+        raise RuntimeError(f"/join/bulk failed: {response.text}")
+
+
+async def measure(http: httpx.AsyncClient, counter: RoundTripCounter, runner, size: int, repeats: int) -> dict:
+    """Best of several runs, each on a freshly reset game"""
+    best = None
+    for repeat in range(repeats):
+        await GameManager.reset_database()
+        names = [f"student-{repeat}-{n}" for n in range(size)]
+        counter.count = 0
+        started = time.perf_counter()
+        await runner(http, names)
+        elapsed = time.perf_counter() - started
+        if best is None or elapsed < best["seconds"]:
+            best = {"seconds": elapsed, "round_trips": counter.count}
+    return best
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="30,100,300", help="comma separated class sizes")
+    parser.add_argument("--repeats", type=int, default=3, help="runs per size; the fastest is reported")
+    args = parser.parse_args()
+
+    # Bootstrap the schema before counting round trips
+    await GameManager.get_state_version()
+    counter = RoundTripCounter(GameManager.backend)
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        print(f"{'players':>8} {'individual ms':>14} {'round trips':>12} {'bulk ms':>8} {'round trips':>12} {'speedup':>8}")
+        for size in (int(s) for s in args.sizes.split(",")):
+            individual = await measure(http, counter, run_individual, size, args.repeats)
+            bulk = await measure(http, counter, run_bulk, size, args.repeats)
+            print(
+                f"{size:>8} {individual['seconds'] * 1000:>14.1f} {individual['round_trips']:>12} "
+                f"{bulk['seconds'] * 1000:>8.1f} {bulk['round_trips']:>12} "
+                f"{individual['seconds'] / bulk['seconds']:>7.1f}x"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
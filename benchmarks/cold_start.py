@@ -0,0 +1,86 @@
+# ABOUTME: Benchmark of cold-start latency to the first /status read
+"""
+Simulates fresh worker processes against an already-initialized database and
+measures the time and round trips from a new TursoGameManager to its first
+get_status result. The per-statement bootstrap used before schema versioning
+is replayed on the same database for comparison.
+
+    TURSO_DATABASE_URL=http://127.0.0.1:8080 uv run python benchmarks/cold_start.py
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import StorageBackend, create_backend
+from turso_game_state import TursoGameManager, MIGRATIONS
+
+
+class CountingBackend(StorageBackend):
+    """Wraps a storage backend and counts round trips"""
+
+    def __init__(self, backend: StorageBackend):
+        self.backend = backend
+        self.round_trips = 0
+
+    async def execute(self, sql, args=None):
+        self.round_trips += 1
+        return await self.backend.execute(sql, args)
+
+    async def batch(self, statements):
+        self.round_trips += 1
+        return await self.backend.batch(statements)
+
+    async def close(self):
+        await self.backend.close()
+
+
+async def legacy_bootstrap(backend: StorageBackend):
+    """One round trip per schema statement, as every cold start used to do"""
+    for migration in MIGRATIONS:
+        for statement in migration.split(';'):
+            if statement.strip():
+                await backend.execute(statement.strip())
+
+
+async def cold_start(legacy: bool):
+    backend = CountingBackend(create_backend(os.getenv("TURSO_DATABASE_URL"), os.getenv("TURSO_AUTH_TOKEN")))
+    manager = TursoGameManager(backend=backend)
+    started = time.perf_counter()
+    if legacy:
+        manager._initialized = True
+        await legacy_bootstrap(backend)
+    status = await manager.get_status()
+    elapsed = time.perf_counter() - started
+    await backend.close()
+    if "error" in status:
+        raise RuntimeError(status["error"])
+    return elapsed, backend.round_trips
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=20, help="cold starts per mode")
+    args = parser.parse_args()
+
+    # Make sure the schema exists before measuring warm-database cold starts
+    await cold_start(legacy=False)
+
+    print(f"{'bootstrap':>10} {'round trips':>12} {'p50 ms':>8} {'mean ms':>8}")
+    for label, legacy in (("legacy", True), ("versioned", False)):
+        timings = []
+        for _ in range(args.runs):
+            elapsed, round_trips = await cold_start(legacy)
+            timings.append(elapsed)
+        print(
+            f"{label:>10} {round_trips:>12} {statistics.median(timings) * 1000:>8.1f} "
+            f"{statistics.mean(timings) * 1000:>8.1f}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,89 @@
+# ABOUTME: Benchmark showing how /join, /poach and /status scale with parallel clients
+"""
+Drives the FastAPI app in-process (no uvicorn) with 1, 10 and 100 concurrent
+clients and reports throughput and latency for each level.
+
+Point it at a database reachable over the network so that request I/O can
+overlap, e.g. a local `turso dev` server or a scratch Turso database:
+
+    TURSO_DATABASE_URL=http://127.0.0.1:8080 uv run python benchmarks/concurrency.py
+
+The database is reset before every level.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from main import app, GameManager
+
+
+async def run_client(http: httpx.AsyncClient, client_no: int, rounds: int, latencies: list):
+    """One simulated player: join, check status, try to poach"""
+    for round_no in range(rounds):
+        name = f"bench-{client_no}-{round_no}"
+        calls = [
+            ("POST", "/join", {"player_name": name}),
+            ("GET", "/status", None),
+            ("POST", "/poach", {"target_player_name": "Seed2", "poacher_team_name": "SeedTeam"}),
+        ]
+        for method, path, body in calls:
+            started = time.perf_counter()
+            response = await http.request(method, path, json=body)
+            latencies.append(time.perf_counter() - started)
+            if response.status_code >= 500:
+                raise RuntimeError(f"{method} {path} failed: {response.text}")
+
+
+async def run_level(http: httpx.AsyncClient, clients: int, rounds: int) -> dict:
+    """Reset the game, seed one team and run all clients in parallel"""
+    await GameManager.reset_database()
+    await GameManager.join_game("Seed1")
+    await GameManager.join_game("Seed2")
+    await GameManager.create_team("SeedTeam", "Seed1")
+
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(run_client(http, n, rounds, latencies) for n in range(clients)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "seconds": elapsed,
+        "rps": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--levels", default="1,10,100", help="comma separated client counts")
+    parser.add_argument("--rounds", type=int, default=5, help="join/status/poach rounds per client")
+    args = parser.parse_args()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as http:
+        results = []
+        for clients in (int(level) for level in args.levels.split(",")):
+            results.append(await run_level(http, clients, args.rounds))
+
+    baseline = results[0]["rps"]
+    print(f"{'clients':>8} {'requests':>9} {'seconds':>8} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'speedup':>8}")
+    for r in results:
+        print(
+            f"{r['clients']:>8} {r['requests']:>9} {r['seconds']:>8.2f} {r['rps']:>8.1f} "
+            f"{r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['rps'] / baseline:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
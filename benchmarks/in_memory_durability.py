@@ -0,0 +1,97 @@
+# ABOUTME: Benchmark for the durable in-memory engine: journaled mutation rate and restart time
+"""
+Mutations: runs benchmarks/in_memory_engine.py's join/team/poach mix from C
+concurrent clients against a GameEngine without a journal and one opened on
+a game directory (write-ahead log with group-committed fsyncs), and reports
+mutations per second and latency.
+
+Restarts: builds games of N players (joined, half of them on teams), then
+times GameEngine.open() on the directory twice: replaying the whole log,
+and after take_snapshot() loading the snapshot.
+
+    uv run python benchmarks/in_memory_durability.py
+"""
+import argparse
+import asyncio
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from game_engine import GameEngine
+from in_memory_engine import client
+
+
+async def mutations(engine: GameEngine, clients: int, rounds: int) -> dict:
+    """Mutations per second and latency percentiles (ms)"""
+    async def call(method, *args):
+        return await getattr(engine, method)(*args)
+
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n, rounds, call, latencies) for n in range(clients)))
+    elapsed = time.perf_counter() - started
+    await engine.close()
+
+    latencies.sort()
+    return {
+        "ops": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+async def build(directory: str, size: int, snapshot: bool):
+    """A durable game of size players, half of them on two-player teams"""
+    engine = GameEngine.open(directory)
+    await asyncio.gather(*(engine.join_game(f"player-{n}") for n in range(size)))
+    await asyncio.gather(*(engine.create_team(f"team-{n}", f"player-{n}") for n in range(0, size // 2, 2)))
+    await asyncio.gather(*(engine.join_team(f"team-{n}", f"player-{n + 1}") for n in range(0, size // 2, 2)))
+    if snapshot:
+        await engine.take_snapshot()
+    await engine.close()
+
+
+def restart(directory: str) -> float:
+    """Seconds for GameEngine.open() to load the game"""
+    started = time.perf_counter()
+    GameEngine.open(directory)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", type=int, default=100, help="concurrent clients for the mutation mix")
+    parser.add_argument("--rounds", type=int, default=10, help="rounds of 10 mutations per client")
+    parser.add_argument("--sizes", default="10000,100000,1000000", help="comma separated player counts")
+    args = parser.parse_args()
+
+    print(f"{'setup':>8} {'ops/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    directory = tempfile.mkdtemp()
+    try:
+        for setup, engine in (("memory", GameEngine()), ("durable", GameEngine.open(directory))):
+            result = asyncio.run(mutations(engine, args.clients, args.rounds))
+            print(f"{setup:>8} {result['ops']:>9.0f} {result['p50']:>8.3f} {result['p99']:>8.3f}")
+    finally:
+        shutil.rmtree(directory)
+
+    print()
+    print(f"{'players':>8} {'log records':>12} {'replay s':>9} {'snapshot s':>11}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        directory = tempfile.mkdtemp()
+        try:
+            asyncio.run(build(directory, size, snapshot=False))
+            replay = restart(directory)
+            asyncio.run(build(os.path.join(directory, "snapshotted"), size, snapshot=True))
+            loaded = restart(os.path.join(directory, "snapshotted"))
+            print(f"{size:>8} {size + size // 2:>12} {replay:>9.2f} {loaded:>11.2f}")
+        finally:
+            shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
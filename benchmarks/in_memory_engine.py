@@ -0,0 +1,94 @@
+# ABOUTME: Benchmark comparing the asyncio GameEngine actor with the lock-based update_game_state path
+"""
+Runs the same mutation mix (join, create team, join team, poach) from C
+concurrent asyncio clients against three in-memory setups and reports
+mutations per second and per-mutation latency:
+
+    lock      game_state.GameManager called from worker threads (asyncio.to_thread),
+              i.e. what a handler does to keep a contended lock off the event loop
+    inline    game_state.GameManager called directly in the coroutine, holding the
+              event loop thread while it waits for the lock and publishes
+    engine    game_engine.GameEngine: commands queued to the actor, applied without
+              locks and published once per tick
+
+    uv run python benchmarks/in_memory_engine.py
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_state
+from game_engine import GameEngine
+from game_state import GameManager
+
+
+async def client(n: int, rounds: int, call, latencies: list):
+    """One client's mutations: join, start a team, add a teammate, then poach them back and forth"""
+    async def timed(method, *args):
+        started = time.perf_counter()
+        result = await call(method, *args)
+        latencies.append(time.perf_counter() - started)
+        if not result["success"]:
+            raise RuntimeError(result["message"])
+
+    for r in range(rounds):
+        a, b, c = f"a-{n}-{r}", f"b-{n}-{r}", f"c-{n}-{r}"
+        for name in (a, b, c):
+            await timed("join_game", name)
+        await timed("create_team", f"ta-{n}-{r}", a)
+        await timed("create_team", f"tb-{n}-{r}", b)
+        await timed("join_team", f"ta-{n}-{r}", c)
+        for p in range(4):
+            await timed("poach_player", c, f"tb-{n}-{r}" if p % 2 == 0 else f"ta-{n}-{r}")
+
+
+async def run(setup: str, clients: int, rounds: int) -> dict:
+    """Mutations per second and latency percentiles (ms) for one setup"""
+    game_state.reset_game_state()
+    engine = GameEngine()
+
+    if setup == "lock":
+        async def call(method, *args):
+            return await asyncio.to_thread(getattr(GameManager, method), *args)
+    elif setup == "inline":
+        async def call(method, *args):
+            return getattr(GameManager, method)(*args)
+    else:
+        async def call(method, *args):
+            return await getattr(engine, method)(*args)
+
+    latencies = []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(n, rounds, call, latencies) for n in range(clients)))
+    elapsed = time.perf_counter() - started
+    await engine.drain()
+
+    latencies.sort()
+    return {
+        "ops": len(latencies) / elapsed,
+        "p50": statistics.median(latencies) * 1000,
+        "p99": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--clients", default="1,10,100", help="comma separated concurrent client counts")
+    parser.add_argument("--rounds", type=int, default=50, help="rounds of 10 mutations per client")
+    args = parser.parse_args()
+
+    print(f"{'clients':>8} {'setup':>7} {'ops/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for clients in (int(c) for c in args.clients.split(",")):
+        rounds = max(1, args.rounds * 10 // clients) if clients > 10 else args.rounds
+        for setup in ("lock", "inline", "engine"):
+            result = asyncio.run(run(setup, clients, rounds))
+            print(f"{clients:>8} {setup:>7} {result['ops']:>9.0f} {result['p50']:>8.3f} {result['p99']:>8.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+# ABOUTME: Benchmark comparing memory and construction cost of pydantic models vs the slotted in-memory records
+"""
+Builds N players (and N/2 two-player teams) both as the pydantic API models
+(models.Player / models.Team with UUID ids and datetimes, the way the
+in-memory game used to keep them) and as records.PlayerRecord /
+records.TeamRecord with integer handles, then reports bytes per player
+and per team (tracemalloc) and how many of each can be created per second:
+
+    uv run python benchmarks/in_memory_footprint.py
+
+benchmarks/in_memory_scaling.py times the game operations themselves.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from models import Player, Team
+from records import PlayerRecord, TeamRecord
+
+
+def build_models(size: int):
+    players = {}
+    for n in range(size):
+        player = Player(name=f"player-{n}")
+        players[player.id] = player
+    teams = {}
+    ids = list(players)
+    for n in range(0, size - 1, 2):
+        team = Team(name=f"team-{n}", member_ids=[ids[n], ids[n + 1]])
+        teams[team.id] = team
+        players[ids[n]].team_id = players[ids[n + 1]].team_id = team.id
+    return players, teams
+
+
+def build_records(size: int):
+    players = {}
+    for n in range(size):
+        players[n + 1] = PlayerRecord(n + 1, f"player-{n}")
+    teams = {}
+    for n in range(0, size - 1, 2):
+        team_id = size + n + 1
+        teams[team_id] = TeamRecord(team_id, f"team-{n}", {n + 1, n + 2})
+        players[n + 1].team_id = players[n + 2].team_id = team_id
+    return players, teams
+
+
+def measure(build, size: int) -> dict:
+    """Bytes per player (teams included, as each player's share) and players built per second"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    state = build(size)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del state
+
+    started = time.perf_counter()
+    build(size)
+    elapsed = time.perf_counter() - started
+    return {"bytes": used / size, "per_second": size / elapsed}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1000,100000", help="comma separated player counts")
+    args = parser.parse_args()
+
+    print(f"{'players':>8} {'kind':>8} {'bytes/player':>13} {'players/s':>11}")
+    for size in (int(s) for s in args.sizes.split(",")):
+        for kind, build in (("pydantic", build_models), ("records", build_records)):
+            result = measure(build, size)
+            print(f"{size:>8} {kind:>8} {result['bytes']:>13.0f} {result['per_second']:>11.0f}")
+
+
+if __name__ == "__main__":
+    main()
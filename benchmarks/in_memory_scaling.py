@@ -0,0 +1,116 @@
+# ABOUTME: Benchmark showing the in-memory GameManager's per-operation cost as the game grows
+"""
+Fills the in-memory game (game_state.py) with N players, then times join,
+create team, join team and poach operations through game_state.GameManager
+and reports microseconds per operation for each N. It then times listing
+and auto-assigning FEW free agents.
+
+Name lookups go through GameState's name indexes and free agents and open
+teams are indexed too, so the cost per operation should stay flat from 10
+to 100,000 players:
+
+    uv run python benchmarks/in_memory_scaling.py
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import game_state
+from game_state import GameManager
+
+# Free agents left in the game when listing and auto-assigning them is timed
+FEW = 10
+
+
+def fill(size: int):
+    """A fresh game with size players, half of them on two-player teams"""
+    game_state.reset_game_state()
+    for n in range(size):
+        GameManager.join_game(f"player-{n}")
+    for n in range(0, size // 2 - 1, 2):
+        GameManager.create_team(f"team-{n}", f"player-{n}")
+        GameManager.join_team(f"team-{n}", f"player-{n + 1}")
+
+
+def measure(size: int, operations: int) -> dict:
+    """Microseconds per operation for each kind, on a game of size players"""
+    fill(size)
+    timings = {}
+
+    started = time.perf_counter()
+    for n in range(operations):
+        GameManager.join_game(f"new-{n}")
+    timings["join"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    for n in range(operations):
+        GameManager.create_team(f"new-team-{n}", f"new-{n}")
+    timings["create_team"] = time.perf_counter() - started
+
+    # Each new team has room for one more: fill it with a free agent joined for the purpose
+    for n in range(operations):
+        GameManager.join_game(f"extra-{n}")
+    started = time.perf_counter()
+    for n in range(operations):
+        GameManager.join_team(f"new-team-{n}", f"extra-{n}")
+    timings["join_team"] = time.perf_counter() - started
+
+    # Poach back and forth between two fresh teams that always have a free slot
+    GameManager.join_game("poacher-a")
+    GameManager.join_game("poacher-b")
+    GameManager.join_game("target")
+    GameManager.create_team("poachers-a", "poacher-a")
+    GameManager.create_team("poachers-b", "poacher-b")
+    GameManager.join_team("poachers-a", "target")
+    started = time.perf_counter()
+    for n in range(operations):
+        result = GameManager.poach_player("target", "poachers-b" if n % 2 == 0 else "poachers-a")
+        if not result["success"]:
+            raise RuntimeError(result["message"])
+    timings["poach"] = time.perf_counter() - started
+
+    # A handful of free agents in a big game: listing and assigning them should not
+    # depend on how many players are already on teams
+    GameManager.auto_assign_free_agents()
+    for n in range(FEW):
+        GameManager.join_game(f"late-{n}")
+    started = time.perf_counter()
+    for n in range(operations):
+        GameManager.get_free_agents()
+    timings["free_agents"] = time.perf_counter() - started
+
+    timings["auto_assign"] = 0.0
+    for n in range(operations):
+        started = time.perf_counter()
+        GameManager.auto_assign_free_agents()
+        timings["auto_assign"] += time.perf_counter() - started
+        for m in range(FEW):
+            GameManager.join_game(f"late-{n}-{m}")
+
+    return {kind: seconds / operations * 1_000_000 for kind, seconds in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10,100,1000,10000,100000", help="comma separated player counts")
+    parser.add_argument("--operations", type=int, default=1000, help="operations timed per kind and size")
+    args = parser.parse_args()
+
+    print(
+        f"{'players':>8} {'join us':>8} {'create us':>10} {'join team us':>13} {'poach us':>9} "
+        f"{'free agents us':>15} {'auto-assign us':>15}"
+    )
+    for size in (int(s) for s in args.sizes.split(",")):
+        per_op = measure(size, args.operations)
+        print(
+            f"{size:>8} {per_op['join']:>8.1f} {per_op['create_team']:>10.1f} "
+            f"{per_op['join_team']:>13.1f} {per_op['poach']:>9.1f} "
+            f"{per_op['free_agents']:>15.1f} {per_op['auto_assign']:>15.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# ABOUTME: WebSocket command channel: framed game actions with correlation ids plus pushed state changes
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import json
+from fastapi import WebSocket, WebSocketDisconnect
+from models import MAX_NAME_LENGTH
+
+# Commands a single connection may have running at once; further frames wait for a free slot
+MAX_IN_FLIGHT = 64
+
+# Frames waiting to be written; a client that stops reading slows its own commands down
+OUTBOX_SIZE = 256
+
+# op -> (TursoGameManager method, required fields in argument order)
+COMMANDS = {
+    "join": ("join_game", ("player_name",)),
+    "create_team": ("create_team", ("team_name", "creator_name")),
+    "join_team": ("join_team", ("team_name", "player_name")),
+    "poach": ("poach_player", ("target_player_name", "poacher_team_name")),
+    "leave": ("leave_team", ("player_name",)),
+}
+
+
+class CommandChannel:
+    """One WebSocket connection: runs commands concurrently and writes results and changes in order of completion"""
+
+    def __init__(self, websocket: WebSocket, manager, hub):
+        self.websocket = websocket
+        self.manager = manager
+        self.hub = hub
+        self.outbox: asyncio.Queue = asyncio.Queue(OUTBOX_SIZE)
+        self.in_flight = asyncio.Semaphore(MAX_IN_FLIGHT)
+        self.tasks = set()
+        self.changes_task = None
+
+    async def serve(self, since: Optional[int] = None, subscribe: bool = False):
+        """Accept the connection and process frames until the client disconnects"""
+        await self.websocket.accept()
+        writer = asyncio.create_task(self._write())
+        if subscribe:
+            self.changes_task = asyncio.create_task(self._forward_changes(since))
+
+        try:
+            while True:
+                frame = await self.websocket.receive_text()
+                await self.in_flight.acquire()
+                task = asyncio.create_task(self._handle(frame))
+                self.tasks.add(task)
+                task.add_done_callback(self._finished)
+        except WebSocketDisconnect:
+            pass
+        finally:
+            for task in [writer, self.changes_task, *self.tasks]:
+                if task:
+                    task.cancel()
+
+    def _finished(self, task: asyncio.Task):
+        self.tasks.discard(task)
+        self.in_flight.release()
+
+    async def _write(self):
+        while True:
+            frame = await self.outbox.get()
+            await self.websocket.send_text(json.dumps(frame))
+
+    async def _forward_changes(self, since: Optional[int]):
+        """Push every state change to the client as {"type": "change", ...}"""
+        while True:
+            async for change in self.hub.changes(since):
+                if change["event"] == "evicted":
+                    # The outbox already throttles this client; just resume from the log
+                    break
+                since = change["version"]
+                await self.outbox.put({"type": "change", **change})
+            else:
+                return
+
+    async def _handle(self, frame: str):
+        try:
+            request = json.loads(frame)
+        except ValueError:
+            await self.outbox.put(error_frame(None, 400, "Frame must be a JSON object"))
+            return
+        if not isinstance(request, dict):
+            await self.outbox.put(error_frame(None, 400, "Frame must be a JSON object"))
+            return
+
+        await self.outbox.put(await self.run_command(request))
+
+    async def run_command(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Execute one command frame and build its reply"""
+        request_id = request.get("id")
+        op = request.get("op")
+        try:
+            method, args = parse_command(request)
+        except ValueError as e:
+            return error_frame(request_id, 400, str(e))
+
+        try:
+            if op == "poach" and not await self.manager.get_poaching_enabled():
+                return error_frame(request_id, 403, "Poaching is currently disabled by the admin")
+
+            result = await getattr(self.manager, method)(*args)
+        except Exception as e:
+            return error_frame(request_id, 500, f"Internal server error: {str(e)}")
+
+        if not result["success"]:
+            return error_frame(request_id, 400, result["message"])
+
+        return {
+            "type": "result",
+            "id": request_id,
+            "ok": True,
+            "result": {key: value for key, value in result.items() if key != "success"}
+        }
+
+
+def parse_command(request: Dict[str, Any]) -> Tuple[str, List[str]]:
+    """Map a command object to its TursoGameManager method and arguments, raising ValueError if it is malformed"""
+    op = request.get("op")
+    if op not in COMMANDS:
+        raise ValueError(f"Unknown op '{op}'; expected one of: {', '.join(COMMANDS)}")
+
+    method, fields = COMMANDS[op]
+    args = []
+    for field in fields:
+        value = request.get(field)
+        if not isinstance(value, str) or not value:
+            raise ValueError(f"{field} is required for {op}")
+        if len(value) > MAX_NAME_LENGTH:
+            raise ValueError(f"{field} must be at most {MAX_NAME_LENGTH} characters")
+        args.append(value)
+    return method, args
+
+
+def error_frame(request_id: Any, status: int, message: str) -> Dict[str, Any]:
+    """Reply frame for a command that failed, with the HTTP status the same request would get"""
+    return {"type": "result", "id": request_id, "ok": False, "status": status, "error": message}
@@ -1,4 +1,6 @@
 -- ABOUTME: Database schema for team poaching game using Turso SQLite
+-- Reference copy; the applied schema is the MIGRATIONS list in turso_game_state.py,
+-- tracked by the 'schema_version' row in game_stats
 -- Players table - stores individual player information
 CREATE TABLE IF NOT EXISTS players (
     id TEXT PRIMARY KEY,
@@ -27,7 +29,9 @@ CREATE TABLE IF NOT EXISTS team_members (
 
 -- Indexes for better performance
 CREATE INDEX IF NOT EXISTS idx_players_name ON players(name);
-CREATE INDEX IF NOT EXISTS idx_players_team_id ON players(team_id);
+CREATE INDEX IF NOT EXISTS idx_players_joined_at ON players(joined_at, id);
+CREATE INDEX IF NOT EXISTS idx_players_team_joined_at ON players(team_id, joined_at, id);
+CREATE INDEX IF NOT EXISTS idx_teams_created_at ON teams(created_at, id);
 CREATE INDEX IF NOT EXISTS idx_teams_name ON teams(name);
 CREATE INDEX IF NOT EXISTS idx_team_members_team_id ON team_members(team_id);
 CREATE INDEX IF NOT EXISTS idx_team_members_player_id ON team_members(player_id);
@@ -40,4 +44,22 @@ CREATE TABLE IF NOT EXISTS game_stats (
 
 -- Initialize game statistics
 INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_players', 0);
-INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0);
\ No newline at end of file
+INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0);
+INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('settings_version', 0);
+INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('state_version', 0);
+
+-- Append-only change log, one row per state_version (see GET /status/changes)
+CREATE TABLE IF NOT EXISTS state_changes (
+    version INTEGER PRIMARY KEY,
+    event TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR IGNORE INTO state_changes (version, event, payload)
+SELECT stat_value, 'log_started', '{}' FROM game_stats WHERE stat_key = 'state_version';
+
+-- Never holds rows; an all-or-nothing POST /batch inserts 0 here to abort itself
+CREATE TABLE IF NOT EXISTS batch_guard (
+    ok INTEGER NOT NULL CONSTRAINT batch_operation_failed CHECK (ok)
+);
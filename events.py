@@ -0,0 +1,163 @@
+# ABOUTME: In-process broadcast hub that pushes change log entries to live Server-Sent Events subscribers
+from typing import Any, AsyncIterator, Dict, Optional, Set
+import asyncio
+import json
+
+# Changes buffered per subscriber; a subscriber that falls this far behind is evicted
+SUBSCRIBER_QUEUE_SIZE = 256
+
+# Seconds between change log polls when no local write woke the hub (picks up other workers' writes)
+POLL_SECONDS = 1.0
+
+# Seconds of silence before a keepalive comment is sent so proxies keep the stream open
+KEEPALIVE_SECONDS = 15.0
+
+
+class Subscriber:
+    """One live connection's bounded queue of changes waiting to be sent"""
+
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(queue_size)
+
+    def evict(self):
+        """Drop the backlog and leave only the end-of-stream marker"""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.queue.put_nowait(None)
+
+
+class ChangeHub:
+    """Reads the change log once per process and fans every change out to all subscribers"""
+
+    def __init__(self, manager, queue_size: int = SUBSCRIBER_QUEUE_SIZE, poll_seconds: float = POLL_SECONDS):
+        self.manager = manager
+        self.queue_size = queue_size
+        self.poll_seconds = poll_seconds
+        self.subscribers: Set[Subscriber] = set()
+        self._task = None
+        self._wakeup = None
+        self._notified_version = 0
+        # Local writes wake the hub at once instead of waiting for the next poll
+        manager.add_change_listener(self.notify)
+
+    def notify(self, state_version: int):
+        """Called after a local write with the state version it produced"""
+        self._notified_version = max(self._notified_version, state_version)
+        if self._wakeup:
+            self._wakeup.set()
+
+    def subscribe(self) -> Subscriber:
+        """Register a subscriber, starting the change log reader if it is not running"""
+        subscriber = Subscriber(self.queue_size)
+        self.subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._pump())
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """Forget a subscriber; the reader stops once nobody is listening"""
+        self.subscribers.discard(subscriber)
+
+    def _publish(self, change: Dict[str, Any]):
+        for subscriber in list(self.subscribers):
+            try:
+                subscriber.queue.put_nowait(change)
+            except asyncio.QueueFull:
+                # Slow consumer: cut it loose rather than buffer without bound or stall everyone
+                self.unsubscribe(subscriber)
+                subscriber.evict()
+
+    async def _pump(self):
+        """Poll the change log while anyone is subscribed and publish new entries in order"""
+        since = None
+        while self.subscribers:
+            self._wakeup.clear()
+            if since is None:
+                since = await self.manager.get_state_version()
+                if since is None:
+                    await asyncio.sleep(self.poll_seconds)
+                continue
+
+            page = await self.manager.get_changes(since, min_version=self._notified_version)
+            if page["success"]:
+                if page["resync_required"]:
+                    # Subscribers notice the gap in versions and resync themselves
+                    since = page["state_version"]
+                for change in page["changes"]:
+                    self._publish(change)
+                    since = change["version"]
+                if page["has_more"]:
+                    continue
+
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _replay(self, since: int) -> AsyncIterator[Dict[str, Any]]:
+        """Changes after since straight from the change log, or one resync marker if it is too old"""
+        while True:
+            page = await self.manager.get_changes(since)
+            if not page["success"]:
+                raise RuntimeError(page["message"])
+            if page["resync_required"]:
+                yield {"version": page["state_version"], "event": "resync"}
+                return
+            for change in page["changes"]:
+                since = change["version"]
+                yield change
+            if not page["has_more"]:
+                return
+
+    async def changes(self, since: Optional[int] = None,
+                      idle_seconds: Optional[float] = None) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Every change after since (or from now) in order, yielding None after idle_seconds of quiet"""
+        subscriber = self.subscribe()
+        try:
+            if since is None:
+                since = await self.manager.get_state_version() or 0
+
+            # Subscribed before replaying, so nothing published meanwhile is lost
+            async for change in self._replay(since):
+                since = change["version"]
+                yield change
+
+            while True:
+                try:
+                    change = await asyncio.wait_for(subscriber.queue.get(), idle_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+
+                if change is None:
+                    # Resuming after since picks up from the change log
+                    yield {"version": since, "event": "evicted"}
+                    return
+                if change["version"] <= since:
+                    continue
+                if change["version"] > since + 1:
+                    # Fill any gap between the replay and the live feed from the change log
+                    async for missed in self._replay(since):
+                        since = missed["version"]
+                        yield missed
+                    continue
+
+                since = change["version"]
+                yield change
+        finally:
+            self.unsubscribe(subscriber)
+
+    async def stream(self, since: Optional[int] = None) -> AsyncIterator[str]:
+        """Server-Sent Events for every change after since (or from now)"""
+        yield f"retry: {int(self.poll_seconds * 1000)}\n\n"
+        async for change in self.changes(since, idle_seconds=KEEPALIVE_SECONDS):
+            if change is None:
+                yield ": keepalive\n\n"
+            else:
+                yield format_event(change)
+
+
+def format_event(change: Dict[str, Any]) -> str:
+    """Encode a change log entry as an SSE message whose id is its state version"""
+    return f"id: {change['version']}\nevent: {change['event']}\ndata: {json.dumps(change)}\n\n"
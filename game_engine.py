@@ -0,0 +1,280 @@
+# ABOUTME: In-memory game engine run as an asyncio single-writer actor: queued commands, no locks
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+import asyncio
+import gc
+import time
+
+from game_state import (
+    Command, SnapshotPublisher, auto_assign_free_agents_command, create_team_command,
+    delete_player_command, delete_team_command, free_agents_command, join_game_command,
+    join_team_command, leave_team_command, poach_player_command, teams_with_space_command
+)
+from persistence import SNAPSHOT_EVERY, GameJournal, recover
+from records import GameState
+from snapshot import GameSnapshot
+
+# Commands applied back to back before the engine publishes a snapshot and resolves their futures
+MAX_COMMANDS_PER_TICK = 256
+
+# Turns a successful command's result into the (name, arguments) the journal records;
+# persistence.REPLAY says how each name is applied again
+JournalEntry = Callable[[Dict[str, Any]], Tuple[str, list]]
+
+
+def journal_as(name: str, *args) -> JournalEntry:
+    """Journal a command as name with the arguments it was called with"""
+    return lambda result: (name, list(args))
+
+
+class GameEngine:
+    """Owns one GameState and applies every mutation from a single task, in the order it was submitted
+
+    Callers await submit() (or the named operations); only the event loop's tick callback
+    touches the state, so commands run without locks. Each tick drains up to
+    MAX_COMMANDS_PER_TICK queued commands, publishes one snapshot for all of them and
+    only then resolves their futures, so a caller always sees its own write in get_status().
+    All callers must share one event loop at a time.
+
+    With a journal (see open()), each tick also logs its successful mutations and the
+    futures wait until an fsync covers them; one fsync runs at a time in a worker thread
+    and covers every tick since the previous one (group commit). Readers of the published
+    snapshot may see a write shortly before it is durable, its caller never does.
+    """
+
+    def __init__(self, state: Optional[GameState] = None, max_commands_per_tick: int = MAX_COMMANDS_PER_TICK,
+                 journal: Optional[GameJournal] = None, snapshot_every: int = SNAPSHOT_EVERY):
+        self.state = state or GameState()
+        self.max_commands_per_tick = max_commands_per_tick
+        self.publisher = SnapshotPublisher()
+        self.publisher.publish_all(self.state)
+        # (command, journal entry, future) triples waiting for the next tick
+        self.pending: Deque[Tuple[Command, Optional[JournalEntry], asyncio.Future]] = deque()
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.tick_scheduled = False
+
+        self.journal = journal
+        self.snapshot_every = snapshot_every
+        # Applied commands whose futures wait for the next fsync, and the fsync in flight
+        self.unsynced: List[Tuple[asyncio.Future, Optional[Dict[str, Any]], Optional[BaseException]]] = []
+        self.sync_task: Optional[asyncio.Future] = None
+        self.snapshot_task: Optional[asyncio.Future] = None
+        self.snapshot_error: Optional[BaseException] = None
+
+    @classmethod
+    def open(cls, directory: str, **kwargs) -> "GameEngine":
+        """Engine for the durable game in directory: loads its snapshot and replays its log"""
+        # Loading allocates millions of objects, which would set off a full garbage collection
+        # after every few thousand of them; pause it, then freeze what was loaded so later
+        # collections skip it (records hold no reference cycles, refcounting frees them)
+        was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            state, journal = recover(directory)
+            engine = cls(state, journal=journal, **kwargs)
+        finally:
+            if was_enabled:
+                gc.enable()
+        gc.freeze()
+        return engine
+
+    async def submit(self, command: Command, journal_entry: Optional[JournalEntry] = None) -> Dict[str, Any]:
+        """Queue a command and wait for its result
+
+        Commands that change the game must come with journal_entry when the engine has
+        a journal, or a restart will not replay them.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.pending.append((command, journal_entry, future))
+        if not self.tick_scheduled or self.loop is not loop:
+            # A new loop (e.g. a restarted server or test) picks the queue up; the state carries over
+            self.loop = loop
+            self.tick_scheduled = True
+            loop.call_soon(self._tick)
+        return await future
+
+    async def join_game(self, player_name: str) -> Dict[str, Any]:
+        """Add a new player to the game"""
+        return await self.submit(
+            join_game_command(player_name),
+            journal_as("join_game", player_name)
+        )
+
+    async def create_team(self, team_name: str, creator_name: str) -> Dict[str, Any]:
+        """Create a new team with the creator as first member"""
+        return await self.submit(
+            create_team_command(team_name, creator_name),
+            journal_as("create_team", team_name, creator_name)
+        )
+
+    async def join_team(self, team_name: str, player_name: str) -> Dict[str, Any]:
+        """Join an existing team"""
+        return await self.submit(
+            join_team_command(team_name, player_name),
+            journal_as("join_team", team_name, player_name)
+        )
+
+    async def poach_player(self, target_player_name: str, poacher_team_name: str) -> Dict[str, Any]:
+        """Poach a player from another team"""
+        return await self.submit(
+            poach_player_command(target_player_name, poacher_team_name),
+            journal_as("poach_player", target_player_name, poacher_team_name)
+        )
+
+    async def leave_team(self, player_name: str) -> Dict[str, Any]:
+        """Remove a player from their team and make them a free agent"""
+        return await self.submit(
+            leave_team_command(player_name),
+            journal_as("leave_team", player_name)
+        )
+
+    async def delete_player(self, player_name: str) -> Dict[str, Any]:
+        """Delete a player and remove them from their team"""
+        return await self.submit(
+            delete_player_command(player_name),
+            journal_as("delete_player", player_name)
+        )
+
+    async def delete_team(self, team_name: str) -> Dict[str, Any]:
+        """Delete a team and set all members as free agents"""
+        return await self.submit(
+            delete_team_command(team_name),
+            journal_as("delete_team", team_name)
+        )
+
+    async def auto_assign_free_agents(self) -> Dict[str, Any]:
+        """Put every free agent on a team, filling the emptiest teams first and creating teams as needed"""
+        return await self.submit(
+            auto_assign_free_agents_command(),
+            lambda result: ("assign_free_agents", [result["assignments"]])
+        )
+
+    async def get_free_agents(self) -> Dict[str, Any]:
+        """Players without a team, from the engine's index (cost grows with the result, not the game)"""
+        return await self.submit(free_agents_command())
+
+    async def get_teams_with_space(self) -> Dict[str, Any]:
+        """Teams that are not full, emptiest first, from the engine's index"""
+        return await self.submit(teams_with_space_command())
+
+    def get_snapshot(self) -> GameSnapshot:
+        """Latest published snapshot; safe to read from any task or thread"""
+        return self.publisher.snapshot
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get current game status"""
+        snapshot = self.get_snapshot()
+        players = list(snapshot.players)
+        free_agents = [player for player in players if player.team_id is None]
+        return {
+            "players": [player.to_model() for player in players],
+            "teams": [team.to_model() for team in snapshot.teams],
+            "free_agents": [player.to_model() for player in free_agents],
+            "total_players": len(players),
+            "total_teams": len(snapshot.teams),
+            "free_agents_count": len(free_agents)
+        }
+
+    async def drain(self):
+        """Wait until every command submitted so far has been applied (and, with a journal, made durable)"""
+        while self.pending or self.unsynced or self.sync_task:
+            if self.sync_task:
+                await asyncio.wait([self.sync_task])
+            else:
+                await asyncio.sleep(0)
+
+    async def take_snapshot(self):
+        """Write a snapshot of the game as it is now, e.g. before a planned restart"""
+        if self.journal is None:
+            raise RuntimeError("This engine has no game directory to snapshot into; open it with GameEngine.open()")
+        if self.snapshot_task:
+            await asyncio.wait([self.snapshot_task])
+        self._start_snapshot()
+        task = self.snapshot_task
+        await asyncio.wait([task])
+        if task.exception():
+            raise task.exception()
+
+    async def close(self):
+        """Drain, wait for a snapshot being written and close the journal"""
+        await self.drain()
+        if self.journal:
+            if self.snapshot_task:
+                await asyncio.wait([self.snapshot_task])
+            await asyncio.get_running_loop().run_in_executor(None, self.journal.close)
+
+    def _tick(self):
+        """Apply a batch of queued commands back to back, publish once, then resolve (or journal) them"""
+        pending = self.pending
+        batch = [pending.popleft() for _ in range(min(len(pending), self.max_commands_per_tick))]
+
+        # One timestamp per tick, journaled with each command so a replay stamps the same times
+        now = self.state.now = time.time()
+        outcomes = []
+        for command, journal_entry, future in batch:
+            result, error = self._apply(command)
+            if self.journal and journal_entry and error is None and result["success"]:
+                self.journal.append(now, *journal_entry(result))
+            outcomes.append((future, result, error))
+        self.publisher.publish(self.state)
+
+        if self.journal:
+            self.unsynced.extend(outcomes)
+            if self.sync_task is None:
+                self._start_sync()
+            if self.journal.since_snapshot >= self.snapshot_every and self.snapshot_task is None:
+                self._start_snapshot()
+        else:
+            self._resolve(outcomes)
+
+        # Commands that arrived meanwhile wait behind the callers just woken up
+        if pending:
+            self.loop.call_soon(self._tick)
+        else:
+            self.tick_scheduled = False
+
+    def _start_sync(self):
+        waiting, self.unsynced = self.unsynced, []
+        self.sync_task = self.loop.run_in_executor(None, self.journal.sync)
+        self.sync_task.add_done_callback(lambda task: self._synced(task, waiting))
+
+    def _synced(self, task: asyncio.Future, waiting: list):
+        self.sync_task = None
+        error = task.exception()
+        if error is not None:
+            waiting = [(future, None, error) for future, _, _ in waiting]
+        self._resolve(waiting)
+        # Everything applied while that fsync ran goes out in the next one
+        if self.unsynced:
+            self._start_sync()
+
+    def _start_snapshot(self):
+        # Taken between ticks: the published snapshot holds exactly the journaled records
+        snapshot, next_id, sequence = self.publisher.snapshot, self.state.next_id, self.journal.sequence
+        first_kept = self.journal.rotate()
+        self.snapshot_task = self.loop.run_in_executor(
+            None, self.journal.snapshot, snapshot, next_id, sequence, first_kept
+        )
+        self.snapshot_task.add_done_callback(self._snapshot_written)
+
+    def _snapshot_written(self, task: asyncio.Future):
+        self.snapshot_task = None
+        # The log still has everything; the next snapshot tries again
+        self.snapshot_error = task.exception()
+
+    @staticmethod
+    def _resolve(outcomes: list):
+        for future, result, error in outcomes:
+            # A caller that gave up (cancelled) still had its command applied
+            if not future.done():
+                if error is None:
+                    future.set_result(result)
+                else:
+                    future.set_exception(error)
+
+    def _apply(self, command: Command) -> Tuple[Optional[Dict[str, Any]], Optional[BaseException]]:
+        try:
+            return command(self.state), None
+        except Exception as e:
+            return None, e
@@ -1,189 +1,409 @@
 # ABOUTME: Global game state management for team poaching game
-from models import GameState
-from typing import Dict, Any
+from records import GameState, PlayerRecord, TeamRecord
+from snapshot import GameSnapshot, SharedListWriter
+from typing import Any, Callable, Dict
 import threading
 
-# Global game state instance
+# Global game state instance, only touched by writers holding state_lock
 game_state = GameState()
 state_lock = threading.Lock()
 
+# A command applies one change to a GameState and returns the operation's result dict
+Command = Callable[[GameState], Dict[str, Any]]
 
-def get_game_state() -> GameState:
-    """Get the current game state (thread-safe)"""
+
+class SnapshotPublisher:
+    """Turns a writer's GameState changes into new GameSnapshots; only that writer may call publish()"""
+
+    def __init__(self, version: int = 0):
+        self.snapshot = GameSnapshot(version)
+        self.player_versions = SharedListWriter()
+        self.team_versions = SharedListWriter()
+
+    def publish(self, state: GameState):
+        """Publish a snapshot holding copies of what changed, sharing everything else with the previous one"""
+        player_ids, team_ids = state.take_changes()
+        if not player_ids and not team_ids:
+            return
+
+        for player_id in player_ids:
+            player = state.players.get(player_id)
+            if player is None:
+                self.player_versions.delete(player_id)
+            else:
+                self.player_versions.set(player_id, player.copy())
+        for team_id in team_ids:
+            team = state.teams.get(team_id)
+            if team is None:
+                self.team_versions.delete(team_id)
+            else:
+                self.team_versions.set(team_id, team.copy())
+
+        # A single reference assignment: readers see the old version or the new one, never a mix
+        self.snapshot = GameSnapshot(
+            self.snapshot.version + 1, self.player_versions.current, self.team_versions.current
+        )
+
+    def publish_all(self, state: GameState):
+        """Publish a snapshot of the whole state at once, e.g. one just loaded from disk"""
+        state.take_changes()
+        self.player_versions.load(list(state.players), list(map(PlayerRecord.copy, state.players.values())))
+        self.team_versions.load(list(state.teams), list(map(TeamRecord.copy, state.teams.values())))
+        self.snapshot = GameSnapshot(
+            self.snapshot.version + 1, self.player_versions.current, self.team_versions.current
+        )
+
+
+# Latest published version of the game; readers take it without the lock
+_publisher = SnapshotPublisher()
+
+
+def get_game_state() -> GameSnapshot:
+    """Get the latest published snapshot of the game (no lock, no copy; it never changes afterwards)"""
+    return _publisher.snapshot
+
+
+def update_game_state(updater_func: Command) -> Dict[str, Any]:
+    """Update game state with provided function (thread-safe) and publish the result"""
     with state_lock:
-        return game_state.copy(deep=True)
+        result = updater_func(game_state)
+        _publisher.publish(game_state)
+        return result
 
 
-def update_game_state(updater_func) -> Dict[str, Any]:
-    """Update game state with provided function (thread-safe)"""
+def reset_game_state():
+    """Start a new empty game"""
+    global game_state, _publisher
     with state_lock:
-        return updater_func(game_state)
+        game_state = GameState()
+        _publisher = SnapshotPublisher(_publisher.snapshot.version + 1)
 
 
-class GameManager:
-    """Centralized game management with thread safety"""
+def join_game_command(player_name: str) -> Command:
+    """Command for GameManager.join_game / GameEngine.join_game: add a new player to the game"""
+    def update(state: GameState) -> Dict[str, Any]:
+        try:
+            player = state.add_player(player_name)
+            return {
+                "success": True,
+                "player": player.to_model(),
+                "message": f"Player '{player_name}' joined the game"
+            }
+        except ValueError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": f"Failed to join game: {str(e)}"
+            }
 
-    @staticmethod
-    def join_game(player_name: str) -> Dict[str, Any]:
-        """Add a new player to the game"""
-        def update(state: GameState) -> Dict[str, Any]:
-            try:
-                player = state.add_player(player_name)
+    return update
+
+
+def create_team_command(team_name: str, creator_name: str) -> Command:
+    """Command for GameManager.create_team / GameEngine.create_team: create a new team with the creator as first member"""
+    def update(state: GameState) -> Dict[str, Any]:
+        try:
+            creator = state.get_player_by_name(creator_name)
+            if not creator:
                 return {
-                    "success": True,
-                    "player": player,
-                    "message": f"Player '{player_name}' joined the game"
+                    "success": False,
+                    "error": f"Player '{creator_name}' not found",
+                    "message": "You must join the game before creating a team"
                 }
-            except ValueError as e:
+
+            if creator.team_id:
                 return {
                     "success": False,
-                    "error": str(e),
-                    "message": f"Failed to join game: {str(e)}"
+                    "error": "Player is already on a team",
+                    "message": "You must leave your current team before creating a new one"
                 }
 
-        return update_game_state(update)
+            team = state.create_team(team_name, creator.id)
+            return {
+                "success": True,
+                "team": team.to_model(),
+                "message": f"Team '{team_name}' created by '{creator_name}'"
+            }
+        except ValueError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": f"Failed to create team: {str(e)}"
+            }
 
-    @staticmethod
-    def create_team(team_name: str, creator_name: str) -> Dict[str, Any]:
-        """Create a new team with the creator as first member"""
-        def update(state: GameState) -> Dict[str, Any]:
-            try:
-                creator = state.get_player_by_name(creator_name)
-                if not creator:
-                    return {
-                        "success": False,
-                        "error": f"Player '{creator_name}' not found",
-                        "message": "You must join the game before creating a team"
-                    }
-
-                if creator.team_id:
-                    return {
-                        "success": False,
-                        "error": "Player is already on a team",
-                        "message": "You must leave your current team before creating a new one"
-                    }
-
-                team = state.create_team(team_name, creator.id)
+    return update
+
+
+def join_team_command(team_name: str, player_name: str) -> Command:
+    """Command for GameManager.join_team / GameEngine.join_team: join an existing team"""
+    def update(state: GameState) -> Dict[str, Any]:
+        try:
+            player = state.get_player_by_name(player_name)
+            if not player:
+                return {
+                    "success": False,
+                    "error": f"Player '{player_name}' not found",
+                    "message": "You must join the game before joining a team"
+                }
+
+            if player.team_id:
                 return {
-                    "success": True,
-                    "team": team,
-                    "message": f"Team '{team_name}' created by '{creator_name}'"
+                    "success": False,
+                    "error": "Player is already on a team",
+                    "message": "You must leave your current team before joining another one"
                 }
-            except ValueError as e:
+
+            team = state.join_team(team_name, player.id)
+            return {
+                "success": True,
+                "team": team.to_model(),
+                "message": f"Player '{player_name}' joined team '{team_name}'"
+            }
+        except ValueError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": f"Failed to join team: {str(e)}"
+            }
+
+    return update
+
+
+def poach_player_command(target_player_name: str, poacher_team_name: str) -> Command:
+    """Command for GameManager.poach_player / GameEngine.poach_player: poach a player from another team"""
+    def update(state: GameState) -> Dict[str, Any]:
+        try:
+            target_player = state.get_player_by_name(target_player_name)
+            if not target_player:
                 return {
                     "success": False,
-                    "error": str(e),
-                    "message": f"Failed to create team: {str(e)}"
+                    "error": f"Player '{target_player_name}' not found",
+                    "message": "Cannot poach non-existent player"
                 }
 
-        return update_game_state(update)
+            poacher_team = state.get_team_by_name(poacher_team_name)
+            if not poacher_team:
+                return {
+                    "success": False,
+                    "error": f"Team '{poacher_team_name}' not found",
+                    "message": "Cannot poach with non-existent team"
+                }
 
-    @staticmethod
-    def join_team(team_name: str, player_name: str) -> Dict[str, Any]:
-        """Join an existing team"""
-        def update(state: GameState) -> Dict[str, Any]:
-            try:
-                player = state.get_player_by_name(player_name)
-                if not player:
-                    return {
-                        "success": False,
-                        "error": f"Player '{player_name}' not found",
-                        "message": "You must join the game before joining a team"
-                    }
-
-                if player.team_id:
-                    return {
-                        "success": False,
-                        "error": "Player is already on a team",
-                        "message": "You must leave your current team before joining another one"
-                    }
-
-                team = state.join_team(team_name, player.id)
+            if not target_player.team_id:
                 return {
-                    "success": True,
-                    "team": team,
-                    "message": f"Player '{player_name}' joined team '{team_name}'"
+                    "success": False,
+                    "error": "Target player is not on a team",
+                    "message": "Cannot poach a free agent"
                 }
-            except ValueError as e:
+
+            if poacher_team.is_full:
                 return {
                     "success": False,
-                    "error": str(e),
-                    "message": f"Failed to join team: {str(e)}"
+                    "error": "Poacher team is already full",
+                    "message": "Cannot poach when your team is full"
                 }
 
-        return update_game_state(update)
+            # Check if poacher team is trying to poach from itself
+            if target_player.team_id == poacher_team.id:
+                return {
+                    "success": False,
+                    "error": "Cannot poach from your own team",
+                    "message": "Target player is already on your team"
+                }
 
-    @staticmethod
-    def poach_player(target_player_name: str, poacher_team_name: str) -> Dict[str, Any]:
-        """Poach a player from another team"""
-        def update(state: GameState) -> Dict[str, Any]:
-            try:
-                target_player = state.get_player_by_name(target_player_name)
-                if not target_player:
-                    return {
-                        "success": False,
-                        "error": f"Player '{target_player_name}' not found",
-                        "message": "Cannot poach non-existent player"
-                    }
-
-                poacher_team = state.get_team_by_name(poacher_team_name)
-                if not poacher_team:
-                    return {
-                        "success": False,
-                        "error": f"Team '{poacher_team_name}' not found",
-                        "message": "Cannot poach with non-existent team"
-                    }
-
-                if not target_player.team_id:
-                    return {
-                        "success": False,
-                        "error": "Target player is not on a team",
-                        "message": "Cannot poach a free agent"
-                    }
-
-                if poacher_team.is_full:
-                    return {
-                        "success": False,
-                        "error": "Poacher team is already full",
-                        "message": "Cannot poach when your team is full"
-                    }
-
-                # Check if poacher team is trying to poach from itself
-                if target_player.team_id == poacher_team.id:
-                    return {
-                        "success": False,
-                        "error": "Cannot poach from your own team",
-                        "message": "Target player is already on your team"
-                    }
-
-                result = state.poach_player(target_player.id, poacher_team.id)
-                old_team = result["old_team"]
-                new_team = result["new_team"]
+            result = state.poach_player(target_player.id, poacher_team.id)
+            old_team = result["old_team"]
+            new_team = result["new_team"]
+
+            return {
+                "success": True,
+                "message": f"Player '{target_player_name}' poached from team to team '{poacher_team_name}'",
+                "old_team": old_team.to_model() if not old_team.is_empty else None,
+                "new_team": new_team.to_model()
+            }
+        except ValueError as e:
+            return {
+                "success": False,
+                "error": str(e),
+                "message": f"Failed to poach player: {str(e)}"
+            }
+
+    return update
 
+
+def leave_team_command(player_name: str) -> Command:
+    """Command for GameManager.leave_team / GameEngine.leave_team: make a player a free agent"""
+    def update(state: GameState) -> Dict[str, Any]:
+        try:
+            player = state.get_player_by_name(player_name)
+            if not player:
                 return {
-                    "success": True,
-                    "message": f"Player '{target_player_name}' poached from team to team '{poacher_team_name}'",
-                    "old_team": old_team if not old_team.is_empty else None,
-                    "new_team": new_team
+                    "success": False,
+                    "message": f"Player '{player_name}' not found"
                 }
-            except ValueError as e:
+
+            if not player.team_id:
                 return {
                     "success": False,
-                    "error": str(e),
-                    "message": f"Failed to poach player: {str(e)}"
+                    "message": f"Player '{player_name}' is not on a team"
                 }
 
-        return update_game_state(update)
+            result = state.leave_team(player.id)
+            team_name = result["team"].name
+            return {
+                "success": True,
+                "message": f"Player '{player_name}' left team '{team_name}' and is now a free agent" +
+                          (f". Team '{team_name}' was dissolved." if result["team_dissolved"] else ""),
+                "player": player.to_model(),
+                "team_dissolved": result["team_dissolved"]
+            }
+        except ValueError as e:
+            return {
+                "success": False,
+                "message": f"Failed to leave team: {str(e)}"
+            }
+
+    return update
+
+
+def delete_player_command(player_name: str) -> Command:
+    """Command for GameManager.delete_player / GameEngine.delete_player: delete a player and remove them from their team"""
+    def update(state: GameState) -> Dict[str, Any]:
+        player = state.get_player_by_name(player_name)
+        if not player:
+            return {
+                "success": False,
+                "message": f"Player '{player_name}' not found"
+            }
+
+        state.remove_player(player.id)
+        return {
+            "success": True,
+            "message": f"Player '{player_name}' deleted successfully"
+        }
+
+    return update
+
+
+def delete_team_command(team_name: str) -> Command:
+    """Command for GameManager.delete_team / GameEngine.delete_team: delete a team and set all members as free agents"""
+    def update(state: GameState) -> Dict[str, Any]:
+        team = state.get_team_by_name(team_name)
+        if not team:
+            return {
+                "success": False,
+                "message": f"Team '{team_name}' not found"
+            }
+
+        state.remove_team(team.id)
+        return {
+            "success": True,
+            "message": f"Team '{team_name}' deleted successfully"
+        }
+
+    return update
+
+
+def auto_assign_free_agents_command() -> Command:
+    """Command for GameManager.auto_assign_free_agents / GameEngine.auto_assign_free_agents: put every free agent on a team"""
+    def update(state: GameState) -> Dict[str, Any]:
+        result = state.auto_assign_free_agents()
+        if result["assigned_count"] == 0:
+            return {
+                "success": False,
+                "message": "No free agents to assign"
+            }
+
+        message = f"Assigned {result['assigned_count']} free agents to teams"
+        if result["teams_created"]:
+            message += f" (created {result['teams_created']} new teams)"
+        return {"success": True, "message": message, **result}
+
+    return update
+
+
+def free_agents_command() -> Command:
+    """Command for GameManager.get_free_agents / GameEngine.get_free_agents: players without a team"""
+    def update(state: GameState) -> Dict[str, Any]:
+        free_agents = [player.to_model() for player in state.free_agents]
+        return {"success": True, "free_agents": free_agents, "count": len(free_agents)}
+
+    return update
+
+
+def teams_with_space_command() -> Command:
+    """Command for GameManager.get_teams_with_space / GameEngine.get_teams_with_space: teams that are not full, emptiest first"""
+    def update(state: GameState) -> Dict[str, Any]:
+        teams = [team.to_model() for team in state.teams_with_space()]
+        return {"success": True, "teams": teams, "count": len(teams)}
+
+    return update
+
+
+class GameManager:
+    """Centralized game management with thread safety"""
+
+    @staticmethod
+    def join_game(player_name: str) -> Dict[str, Any]:
+        """Add a new player to the game"""
+        return update_game_state(join_game_command(player_name))
+
+    @staticmethod
+    def create_team(team_name: str, creator_name: str) -> Dict[str, Any]:
+        """Create a new team with the creator as first member"""
+        return update_game_state(create_team_command(team_name, creator_name))
+
+    @staticmethod
+    def join_team(team_name: str, player_name: str) -> Dict[str, Any]:
+        """Join an existing team"""
+        return update_game_state(join_team_command(team_name, player_name))
+
+    @staticmethod
+    def poach_player(target_player_name: str, poacher_team_name: str) -> Dict[str, Any]:
+        """Poach a player from another team"""
+        return update_game_state(poach_player_command(target_player_name, poacher_team_name))
+
+    @staticmethod
+    def leave_team(player_name: str) -> Dict[str, Any]:
+        """Remove a player from their team and make them a free agent"""
+        return update_game_state(leave_team_command(player_name))
+
+    @staticmethod
+    def delete_player(player_name: str) -> Dict[str, Any]:
+        """Delete a player and remove them from their team"""
+        return update_game_state(delete_player_command(player_name))
+
+    @staticmethod
+    def delete_team(team_name: str) -> Dict[str, Any]:
+        """Delete a team and set all members as free agents"""
+        return update_game_state(delete_team_command(team_name))
+
+    @staticmethod
+    def auto_assign_free_agents() -> Dict[str, Any]:
+        """Put every free agent on a team, filling the emptiest teams first and creating teams as needed"""
+        return update_game_state(auto_assign_free_agents_command())
+
+    @staticmethod
+    def get_free_agents() -> Dict[str, Any]:
+        """Players without a team, from the writer's index (cost grows with the result, not the game)"""
+        return update_game_state(free_agents_command())
+
+    @staticmethod
+    def get_teams_with_space() -> Dict[str, Any]:
+        """Teams that are not full, emptiest first, from the writer's index"""
+        return update_game_state(teams_with_space_command())
 
     @staticmethod
     def get_status() -> Dict[str, Any]:
         """Get current game status"""
         state = get_game_state()
+        players = list(state.players)
+        free_agents = [player for player in players if player.team_id is None]
         return {
-            "players": list(state.players.values()),
-            "teams": list(state.teams.values()),
-            "free_agents": state.free_agents,
-            "total_players": len(state.players),
+            "players": [player.to_model() for player in players],
+            "teams": [team.to_model() for team in state.teams],
+            "free_agents": [player.to_model() for player in free_agents],
+            "total_players": len(players),
             "total_teams": len(state.teams),
-            "free_agents_count": len(state.free_agents)
-        }
\ No newline at end of file
+            "free_agents_count": len(free_agents)
+        }
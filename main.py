@@ -1,10 +1,14 @@
 # ABOUTME: FastAPI application for team poaching game
-from fastapi import FastAPI, HTTPException, Form, Query, Cookie, Response
-from fastapi.responses import JSONResponse, HTMLResponse, RedirectResponse
-from models import JoinRequest, TeamCreateRequest, TeamJoinRequest, PoachRequest, LeaveTeamRequest, StatusResponse
-from turso_game_state import TursoGameManager
-from admin_templates import get_admin_html, get_login_html
+from fastapi import FastAPI, HTTPException, Form, Query, Cookie, Header, Response, WebSocket
+from fastapi.responses import JSONResponse, HTMLResponse, RedirectResponse, StreamingResponse
+from models import JoinRequest, BulkJoinRequest, BatchRequest, TeamCreateRequest, TeamJoinRequest, PoachRequest, LeaveTeamRequest, StatusResponse
+from turso_game_state import TursoGameManager, STATUS_PAGE_SIZE, STATUS_SECTIONS
+from admin_templates import ADMIN_HEAD_HTML, get_admin_html, get_login_html
+from events import ChangeHub
+from commands import CommandChannel, parse_command
+from status_json import iter_status_json
 from typing import Dict, Any, Optional
+from html import escape
 import uvicorn
 import os
 from itsdangerous import URLSafeTimedSerializer, BadSignature
@@ -28,6 +32,41 @@ def verify_session_token(token: str) -> bool:
 # Initialize game manager with Turso
 GameManager = TursoGameManager()
 
+# Pushes change log entries to /events subscribers from a single reader per process
+change_hub = ChangeHub(GameManager)
+
+# Response header carrying the state version a write produced; pass it back as
+# ?min_version= to read your own write even from a lagging replica
+STATE_VERSION_HEADER = "X-State-Version"
+
+
+def version_headers(result: Dict[str, Any]) -> Dict[str, str]:
+    """Headers exposing the state version produced by a successful write"""
+    if "state_version" in result:
+        return {STATE_VERSION_HEADER: str(result["state_version"])}
+    return {}
+
+
+def state_etag(state_version: int) -> str:
+    """ETag for a game state version; any mutation produces a new one"""
+    return f'"{state_version}"'
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """Check an If-None-Match header (a list of possibly weak ETags, or *) against an ETag"""
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def admin_redirect(result: Optional[Dict[str, Any]] = None) -> RedirectResponse:
+    """Redirect back to the admin panel, pinned to the version an action produced"""
+    if result and result.get("state_version") is not None:
+        return RedirectResponse(url=f"/admin?min_version={result['state_version']}", status_code=303)
+    return RedirectResponse(url="/admin", status_code=303)
+
 app = FastAPI(
     title="Team Poaching Game",
     description="A multiplayer game where players can create teams and poach members",
@@ -48,6 +87,7 @@ async def join_game(request: JoinRequest) -> Dict[str, Any]:
             player = result["player"]
             return JSONResponse(
                 status_code=201,
+                headers=version_headers(result),
                 content={
                     "message": result["message"],
                     "player": player if isinstance(player, dict) else {
@@ -64,6 +104,82 @@ async def join_game(request: JoinRequest) -> Dict[str, Any]:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@app.post("/join/bulk")
+async def join_game_bulk(request: BulkJoinRequest) -> Dict[str, Any]:
+    """
+    Join the game with many players in one transaction
+
+    - **player_names**: Up to 500 player names; names already taken are reported in conflicts
+    """
+    try:
+        result = await GameManager.join_game_bulk(request.player_names)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    if not result["success"]:
+        raise HTTPException(status_code=500, detail=result["message"])
+
+    return JSONResponse(
+        status_code=201 if result["joined"] else 200,
+        headers=version_headers(result),
+        content={
+            "message": result["message"],
+            "joined": result["joined"],
+            "conflicts": result["conflicts"],
+            "results": result["results"]
+        }
+    )
+
+
+@app.post("/batch")
+async def run_batch(request: BatchRequest) -> Dict[str, Any]:
+    """
+    Run several game operations in order in one transaction
+
+    - **operations**: Up to 50 command objects with the same ops and fields as /ws frames:
+      join, create_team, join_team, poach, leave
+    - **atomic**: true (default) applies all operations or none; false keeps each one that succeeds
+    """
+    # Every operation is checked (op, fields, name lengths) before any of them runs
+    try:
+        operations = [parse_command(operation) for operation in request.operations]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    try:
+        if any(method == "poach_player" for method, _ in operations) and not await GameManager.get_poaching_enabled():
+            raise HTTPException(status_code=403, detail="Poaching is currently disabled by the admin")
+
+        result = await GameManager.run_batch(operations, atomic=request.atomic)
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+    if "results" not in result:
+        raise HTTPException(status_code=500, detail=result["message"])
+
+    if not result["success"]:
+        # 409 when nothing was rejected but the game moved on between the attempt and the replay
+        return JSONResponse(
+            status_code=400 if result["failed_index"] is not None else 409,
+            content={
+                "detail": result["message"],
+                "failed_index": result["failed_index"],
+                "results": result["results"]
+            }
+        )
+
+    return JSONResponse(
+        status_code=200,
+        headers=version_headers(result) if result["state_version"] else {},
+        content={
+            "applied": result["applied"],
+            "results": result["results"]
+        }
+    )
+
+
 @app.post("/team")
 async def manage_team(request: Dict[str, str]) -> Dict[str, Any]:
     """
@@ -112,6 +228,7 @@ async def manage_team(request: Dict[str, str]) -> Dict[str, Any]:
                 }
             return JSONResponse(
                 status_code=200,
+                headers=version_headers(result),
                 content={
                     "message": result["message"],
                     "team": team_data
@@ -127,68 +244,162 @@ async def manage_team(request: Dict[str, str]) -> Dict[str, Any]:
 
 
 @app.get("/status")
-async def get_status() -> Dict[str, Any]:
+async def get_status(
+    min_version: int = Query(0, ge=0),
+    limit: Optional[int] = Query(None, ge=1, le=500),
+    players_cursor: Optional[str] = Query(None),
+    teams_cursor: Optional[str] = Query(None),
+    free_agents_only: bool = Query(False),
+    has_space: bool = Query(False),
+    team: Optional[str] = Query(None),
+    include: Optional[str] = Query(None),
+    if_none_match: Optional[str] = Header(None)
+) -> Dict[str, Any]:
     """
     Get current game state including all players, teams, and free agents
+
+    - **min_version**: Optional X-State-Version from an earlier write that the state must include
+    - **If-None-Match**: ETag from an earlier response; answered with 304 if nothing changed since
+
+    Any of the following returns one page instead of the whole game:
+    - **limit**: Page size for players and teams (default 50, max 500)
+    - **players_cursor** / **teams_cursor**: next_players_cursor / next_teams_cursor from the previous page
+    - **free_agents_only**: Only players without a team
+    - **has_space**: Only teams that are not full
+    - **team**: Only this team and its roster
+    - **include**: Comma-separated sections to return: game_stats, players, teams, free_agents
     """
     try:
-        status = await GameManager.get_status()
+        if if_none_match:
+            # Most polls land between mutations: compare versions before loading anything
+            state_version = await GameManager.get_state_version(min_version=min_version)
+            if state_version is not None and etag_matches(if_none_match, state_etag(state_version)):
+                return Response(status_code=304, headers={"ETag": state_etag(state_version)})
+
+        paged = (limit is not None or players_cursor or teams_cursor or free_agents_only
+                 or has_space or team or include)
+        if paged:
+            sections = STATUS_SECTIONS
+            if include:
+                sections = tuple(section.strip() for section in include.split(",") if section.strip())
+                unknown = [section for section in sections if section not in STATUS_SECTIONS]
+                if unknown:
+                    raise HTTPException(
+                        status_code=400,
+                        detail=f"Unknown section(s) {', '.join(unknown)}; expected: {', '.join(STATUS_SECTIONS)}"
+                    )
+
+            try:
+                page = await GameManager.get_status_page(
+                    limit=limit or STATUS_PAGE_SIZE,
+                    players_cursor=players_cursor,
+                    teams_cursor=teams_cursor,
+                    free_agents_only=free_agents_only,
+                    team_name=team,
+                    has_space=has_space,
+                    sections=sections,
+                    min_version=min_version
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            if not page["success"]:
+                raise HTTPException(status_code=500, detail=page["message"])
+
+            content = {
+                key: page[key]
+                for key in ("game_stats", "players", "teams", "free_agents", "next_players_cursor", "next_teams_cursor")
+                if key in page
+            }
+            return JSONResponse(status_code=200, headers={"ETag": state_etag(page["state_version"])}, content=content)
 
-        players_data = []
-        for player in status["players"]:
-            if isinstance(player, dict):
-                players_data.append(player)
-            else:
-                players_data.append({
-                    "id": str(player.id),
-                    "name": player.name,
-                    "team_id": str(player.team_id) if player.team_id else None,
-                    "joined_at": player.joined_at.isoformat()
-                })
-
-        teams_data = []
-        for team in status["teams"]:
-            if isinstance(team, dict):
-                teams_data.append(team)
-            else:
-                teams_data.append({
-                    "id": str(team.id),
-                    "name": team.name,
-                    "member_ids": [str(member_id) for member_id in team.member_ids],
-                    "created_at": team.created_at.isoformat(),
-                    "is_full": team.is_full,
-                    "member_count": len(team.member_ids)
-                })
-
-        free_agents_data = []
-        for player in status["free_agents"]:
-            if isinstance(player, dict):
-                free_agents_data.append(player)
-            else:
-                free_agents_data.append({
-                    "id": str(player.id),
-                    "name": player.name,
-                    "joined_at": player.joined_at.isoformat()
-                })
+        snapshot = await GameManager.get_status_snapshot(min_version=min_version)
+        if not snapshot["success"]:
+            raise HTTPException(status_code=500, detail=snapshot["message"])
 
-        return JSONResponse(
-            status_code=200,
-            content={
-                "game_stats": {
-                    "total_players": status["total_players"],
-                    "total_teams": status["total_teams"],
-                    "free_agents_count": status["free_agents_count"]
-                },
-                "players": players_data,
-                "teams": teams_data,
-                "free_agents": free_agents_data
-            }
+        # Encoded straight from the rows as it is sent, instead of building the whole body first
+        return StreamingResponse(
+            iter_status_json(snapshot),
+            media_type="application/json",
+            headers={"ETag": state_etag(snapshot["state_version"])}
         )
 
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
+
+
+@app.get("/status/changes")
+async def get_status_changes(
+    since: int = Query(..., ge=0),
+    limit: int = Query(100, ge=1, le=1000),
+    min_version: int = Query(0, ge=0)
+) -> Dict[str, Any]:
+    """
+    Get the changes made after a state version, to update a local copy of /status
+
+    - **since**: state version the client already has (the ETag of /status, or the last change applied)
+    - **limit**: maximum number of changes to return; keep polling while has_more is true
+    - **min_version**: Optional X-State-Version from an earlier write that the changes must include
+    """
+    try:
+        result = await GameManager.get_changes(since, limit=limit, min_version=min_version)
+        if not result["success"]:
+            raise HTTPException(status_code=500, detail=result["message"])
+
+        content = {
+            "since": result["since"],
+            "state_version": result["state_version"],
+            "changes": result["changes"],
+            "has_more": result["has_more"],
+            "resync_required": result["resync_required"]
+        }
+        if result["resync_required"]:
+            content["message"] = result["message"]
+        return JSONResponse(status_code=200, content=content)
+
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
 
+@app.get("/events")
+async def stream_events(
+    since: Optional[int] = Query(None, ge=0),
+    last_event_id: Optional[str] = Header(None)
+) -> StreamingResponse:
+    """
+    Server-Sent Events stream of game changes, one event per state version
+
+    - **since**: Optional state version to resume after; defaults to now
+    - **Last-Event-ID**: Sent by browsers on reconnect; takes precedence over since
+    """
+    if last_event_id and last_event_id.isdigit():
+        since = int(last_event_id)
+
+    return StreamingResponse(
+        change_hub.stream(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.websocket("/ws")
+async def command_socket(
+    websocket: WebSocket,
+    subscribe: bool = Query(False),
+    since: Optional[int] = Query(None, ge=0)
+):
+    """
+    WebSocket command channel: send {"id", "op", ...fields} frames, receive results by id
+
+    - **subscribe**: Also push every state change as {"type": "change", ...} frames
+    - **since**: With subscribe, state version to resume after; defaults to now
+    """
+    await CommandChannel(websocket, GameManager, change_hub).serve(since, subscribe)
+
+
 @app.post("/poach")
 async def poach_player(request: PoachRequest) -> Dict[str, Any]:
     """
@@ -239,7 +450,7 @@ async def poach_player(request: PoachRequest) -> Dict[str, Any]:
                     "message": "Old team was dissolved (no members remaining)"
                 }
 
-            return JSONResponse(status_code=200, content=response_data)
+            return JSONResponse(status_code=200, headers=version_headers(result), content=response_data)
         else:
             raise HTTPException(status_code=400, detail=result["message"])
 
@@ -263,6 +474,7 @@ async def leave_team(request: LeaveTeamRequest) -> Dict[str, Any]:
             player = result["player"]
             return JSONResponse(
                 status_code=200,
+                headers=version_headers(result),
                 content={
                     "message": result["message"],
                     "player": player if isinstance(player, dict) else {
@@ -302,31 +514,77 @@ async def admin_login(password: str = Form(...)):
 
 
 @app.get("/admin", response_class=HTMLResponse)
-async def admin_panel(admin_session: Optional[str] = Cookie(None)):
-    """Admin panel for managing the game"""
+async def admin_panel(
+    min_version: int = Query(0, ge=0),
+    players_search: str = Query("", max_length=50),
+    players_filter: str = Query("all"),
+    players_sort: str = Query("joined_at"),
+    players_after: str = Query(""),
+    players_before: str = Query(""),
+    teams_search: str = Query("", max_length=50),
+    teams_filter: str = Query("all"),
+    teams_sort: str = Query("created_at"),
+    teams_after: str = Query(""),
+    teams_before: str = Query(""),
+    admin_session: Optional[str] = Cookie(None)
+):
+    """
+    Admin panel for managing the game, showing one page of players and one of teams
+
+    - **players_search** / **teams_search**: Only names containing this text
+    - **players_filter**: all, free_agents or on_team; **teams_filter**: all, open or full
+    - **players_sort**: name or joined_at; **teams_sort**: name or created_at; prefix with - to reverse
+    - **players_after** / **teams_after**: Next page cursor of the page before this one
+    - **players_before** / **teams_before**: Previous page cursor of the page after this one
+    """
     # Check if user is authenticated
     if not admin_session or not verify_session_token(admin_session):
         return HTMLResponse(content=get_login_html())
-    
+
+    view = {
+        "players_search": players_search,
+        "players_filter": players_filter,
+        "players_sort": players_sort,
+        "players_after": players_after,
+        "players_before": players_before,
+        "teams_search": teams_search,
+        "teams_filter": teams_filter,
+        "teams_sort": teams_sort,
+        "teams_after": teams_after,
+        "teams_before": teams_before,
+    }
+
     try:
-        status = await GameManager.get_status()
-        max_team_size = await GameManager.get_max_team_size()
-        poaching_enabled = await GameManager.get_poaching_enabled()
-        
-        html = get_admin_html(
-            players=status.get("players", []),
-            teams=status.get("teams", []),
-            stats={
-                "total_players": status.get("total_players", 0),
-                "total_teams": status.get("total_teams", 0),
-                "free_agents_count": status.get("free_agents_count", 0)
-            },
-            max_team_size=max_team_size,
-            poaching_enabled=poaching_enabled
-        )
-        return HTMLResponse(content=html)
-    except Exception as e:
-        return HTMLResponse(content=f"<h1>Error</h1><p>{str(e)}</p>")
+        GameManager.check_admin_view(players_filter, players_sort, teams_filter, teams_sort,
+                                     players_after, players_before, teams_after, teams_before)
+    except ValueError as e:
+        return HTMLResponse(status_code=400, content=f"<h1>Error</h1><p>{escape(str(e))}</p>")
+
+    async def render():
+        # The static head goes out before the database is queried
+        yield ADMIN_HEAD_HTML
+        try:
+            page = await GameManager.get_admin_page(**view, min_version=min_version)
+            if not page["success"]:
+                raise Exception(page["message"])
+        except Exception as e:
+            # The response has started, so the error becomes part of the page
+            yield f"<h2>Error</h2><p>{escape(str(e))}</p></body></html>"
+            return
+
+        for chunk in get_admin_html(
+            players=page["players"],
+            teams=page["teams"],
+            stats=page["stats"],
+            max_team_size=page["max_team_size"],
+            poaching_enabled=page["poaching_enabled"],
+            view=view,
+            players_cursors=(page["players_previous_cursor"], page["players_next_cursor"]),
+            teams_cursors=(page["teams_previous_cursor"], page["teams_next_cursor"])
+        ):
+            yield chunk
+
+    return StreamingResponse(render(), media_type="text/html")
 
 
 @app.post("/admin/reset")
@@ -336,7 +594,7 @@ async def admin_reset(admin_session: Optional[str] = Cookie(None)):
         raise HTTPException(status_code=403, detail="Not authenticated")
     
     result = await GameManager.reset_database()
-    return RedirectResponse(url="/admin", status_code=303)
+    return admin_redirect(result)
 
 
 @app.post("/admin/delete-player")
@@ -345,8 +603,8 @@ async def admin_delete_player(player_name: str = Form(...), admin_session: Optio
     if not admin_session or not verify_session_token(admin_session):
         raise HTTPException(status_code=403, detail="Not authenticated")
     
-    await GameManager.delete_player(player_name)
-    return RedirectResponse(url="/admin", status_code=303)
+    result = await GameManager.delete_player(player_name)
+    return admin_redirect(result)
 
 
 @app.post("/admin/delete-team")
@@ -355,8 +613,8 @@ async def admin_delete_team(team_name: str = Form(...), admin_session: Optional[
     if not admin_session or not verify_session_token(admin_session):
         raise HTTPException(status_code=403, detail="Not authenticated")
     
-    await GameManager.delete_team(team_name)
-    return RedirectResponse(url="/admin", status_code=303)
+    result = await GameManager.delete_team(team_name)
+    return admin_redirect(result)
 
 
 @app.post("/admin/create-test-data")
@@ -365,8 +623,8 @@ async def admin_create_test_data(admin_session: Optional[str] = Cookie(None)):
     if not admin_session or not verify_session_token(admin_session):
         raise HTTPException(status_code=403, detail="Not authenticated")
     
-    await GameManager.create_test_data()
-    return RedirectResponse(url="/admin", status_code=303)
+    result = await GameManager.create_test_data()
+    return admin_redirect(result)
 
 
 @app.post("/admin/set-team-size")
@@ -375,8 +633,8 @@ async def admin_set_team_size(team_size: int = Form(...), admin_session: Optiona
     if not admin_session or not verify_session_token(admin_session):
         raise HTTPException(status_code=403, detail="Not authenticated")
     
-    await GameManager.set_max_team_size(team_size)
-    return RedirectResponse(url="/admin", status_code=303)
+    result = await GameManager.set_max_team_size(team_size)
+    return admin_redirect(result)
 
 
 @app.post("/admin/auto-assign")
@@ -385,8 +643,8 @@ async def admin_auto_assign(admin_session: Optional[str] = Cookie(None)):
     if not admin_session or not verify_session_token(admin_session):
         raise HTTPException(status_code=403, detail="Not authenticated")
     
-    await GameManager.auto_assign_free_agents()
-    return RedirectResponse(url="/admin", status_code=303)
+    result = await GameManager.auto_assign_free_agents()
+    return admin_redirect(result)
 
 
 @app.post("/admin/toggle-poaching")
@@ -396,8 +654,8 @@ async def admin_toggle_poaching(enabled: str = Form(...), admin_session: Optiona
         raise HTTPException(status_code=403, detail="Not authenticated")
     
     poaching_enabled = enabled.lower() == "true"
-    await GameManager.set_poaching_enabled(poaching_enabled)
-    return RedirectResponse(url="/admin", status_code=303)
+    result = await GameManager.set_poaching_enabled(poaching_enabled)
+    return admin_redirect(result)
 
 
 @app.get("/admin/logout")
@@ -0,0 +1,263 @@
+# ABOUTME: Durable in-memory game: append-only write-ahead log of commands plus periodic JSON snapshots
+"""
+Layout of a game directory:
+
+    snapshot.bin                 latest snapshot: every player and team as of one log sequence number
+    wal-<first sequence>.log     log segments, each a run of framed records
+
+A log record is struct "<II" (payload length, crc32 of payload) followed by a JSON
+payload [sequence, timestamp, command name, arguments]; recovery stops reading a
+segment at the first short or corrupt record, which is how a torn write after a
+crash looks. A snapshot is SNAPSHOT_MAGIC and one record framed the same way, whose
+payload is JSON [sequence, next id, players, teams] (encoded with orjson) holding only
+plain rows, so loading one never runs code from the file. Snapshots are written to a
+temporary file, fsynced and renamed over snapshot.bin, so a crash leaves either the old
+one or the new one.
+"""
+from itertools import starmap
+from operator import itemgetter
+from typing import Any, Dict, List, Tuple
+import json
+import os
+import struct
+import threading
+import zlib
+
+import orjson
+
+from records import GameState, PlayerRecord, TeamRecord
+from snapshot import GameSnapshot
+
+SNAPSHOT_FILE = "snapshot.bin"
+SNAPSHOT_MAGIC = b"POACHSN2"
+SEGMENT_PREFIX = "wal-"
+SEGMENT_SUFFIX = ".log"
+
+RECORD_HEADER = struct.Struct("<II")
+DECODE_RECORD = json.JSONDecoder().decode
+
+# Log records written since the last snapshot before the engine takes a new one;
+# bounds how much of the log a restart has to replay
+SNAPSHOT_EVERY = 100_000
+
+
+# How each journaled command is applied again: straight to the state, since it succeeded
+# the first time, without the checks and the result its caller got
+REPLAY = {
+    "join_game": lambda state, player_name: state.add_player(player_name),
+    "create_team": lambda state, team_name, creator_name: state.create_team(
+        team_name, state.get_player_by_name(creator_name).id
+    ),
+    "join_team": lambda state, team_name, player_name: state.join_team(
+        team_name, state.get_player_by_name(player_name).id
+    ),
+    "poach_player": lambda state, target_player_name, poacher_team_name: state.poach_player(
+        state.get_player_by_name(target_player_name).id, state.get_team_by_name(poacher_team_name).id
+    ),
+    "leave_team": lambda state, player_name: state.leave_team(state.get_player_by_name(player_name).id),
+    "delete_player": lambda state, player_name: state.remove_player(state.get_player_by_name(player_name).id),
+    "delete_team": lambda state, team_name: state.remove_team(state.get_team_by_name(team_name).id),
+    "assign_free_agents": lambda state, assignments: state.assign_free_agents(assignments),
+}
+
+
+def segment_path(directory: str, first_sequence: int) -> str:
+    return os.path.join(directory, f"{SEGMENT_PREFIX}{first_sequence:020d}{SEGMENT_SUFFIX}")
+
+
+def list_segments(directory: str) -> List[Tuple[int, str]]:
+    """(first sequence, path) of every log segment, oldest first"""
+    segments = []
+    for name in os.listdir(directory):
+        if name.startswith(SEGMENT_PREFIX) and name.endswith(SEGMENT_SUFFIX):
+            first_sequence = int(name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)])
+            segments.append((first_sequence, os.path.join(directory, name)))
+    return sorted(segments)
+
+
+def read_segment(path: str) -> List[list]:
+    """Every intact record of a segment, up to the first torn or corrupt one"""
+    with open(path, "rb") as f:
+        data = f.read()
+
+    records, offset = [], 0
+    while offset + RECORD_HEADER.size <= len(data):
+        length, checksum = RECORD_HEADER.unpack_from(data, offset)
+        payload = data[offset + RECORD_HEADER.size:offset + RECORD_HEADER.size + length]
+        if len(payload) < length or zlib.crc32(payload) != checksum:
+            break
+        records.append(DECODE_RECORD(payload.decode()))
+        offset += RECORD_HEADER.size + length
+    return records
+
+
+def fsync_directory(directory: str):
+    """Make renames, creations and deletions in directory durable"""
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def write_snapshot(directory: str, snapshot: GameSnapshot, next_id: int, sequence: int):
+    """Atomically replace snapshot.bin with the game as of log sequence number sequence"""
+    payload = orjson.dumps([
+        sequence,
+        next_id,
+        [(p.id, p.name, p.team_id, p.joined_at) for p in snapshot.players],
+        [(t.id, t.name, list(t.member_ids), t.created_at) for t in snapshot.teams],
+    ])
+
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    temporary = path + ".tmp"
+    with open(temporary, "wb") as f:
+        f.write(SNAPSHOT_MAGIC + RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+    fsync_directory(directory)
+
+
+def read_snapshot(directory: str) -> Tuple[int, GameState]:
+    """(sequence it covers, game) from snapshot.bin, or (0, empty game) if there is none"""
+    path = os.path.join(directory, SNAPSHOT_FILE)
+    if not os.path.exists(path):
+        return 0, GameState()
+
+    with open(path, "rb") as f:
+        data = f.read()
+    header_end = len(SNAPSHOT_MAGIC) + RECORD_HEADER.size
+    # Older pickle snapshots have another magic and are refused rather than unpickled
+    if not data.startswith(SNAPSHOT_MAGIC) or len(data) < header_end:
+        raise ValueError(f"Snapshot {path} is not a {SNAPSHOT_MAGIC.decode()} snapshot")
+    length, checksum = RECORD_HEADER.unpack_from(data, len(SNAPSHOT_MAGIC))
+    payload = data[header_end:header_end + length]
+    if len(payload) != length or zlib.crc32(payload) != checksum:
+        raise ValueError(f"Snapshot {path} is corrupt")
+
+    sequence, next_id, players, teams = orjson.loads(payload)
+    state = GameState(
+        dict(zip(map(itemgetter(0), players), starmap(PlayerRecord, players))),
+        {row[0]: TeamRecord(row[0], row[1], set(row[2]), row[3]) for row in teams},
+        next_id
+    )
+    return sequence, state
+
+
+def recover(directory: str) -> Tuple[GameState, "GameJournal"]:
+    """Load the snapshot, replay the log after it and open a journal that continues from there"""
+    os.makedirs(directory, exist_ok=True)
+    snapshot_sequence, state = read_snapshot(directory)
+    sequence = snapshot_sequence
+
+    segments = list_segments(directory)
+    replaying = True
+    for first_sequence, path in segments:
+        # A segment that starts past the next record means the ones between were lost
+        if not replaying or first_sequence > sequence + 1:
+            break
+        for record_sequence, now, name, args in read_segment(path):
+            if record_sequence <= sequence:
+                continue
+            if record_sequence != sequence + 1:
+                replaying = False
+                break
+            state.now = now
+            REPLAY[name](state, *args)
+            sequence = record_sequence
+    state.now = None
+
+    # Records after a gap can't be applied, and the journal reuses their sequence numbers;
+    # a segment followed by one that starts within the snapshot is covered by it entirely
+    for index, (first_sequence, path) in enumerate(segments):
+        followed_within_snapshot = index + 1 < len(segments) and segments[index + 1][0] <= snapshot_sequence + 1
+        if first_sequence > sequence or followed_within_snapshot:
+            os.remove(path)
+
+    return state, GameJournal(directory, sequence)
+
+
+class GameJournal:
+    """Write-ahead log of one game's commands
+
+    The writer (the engine's event loop) calls append() and rotate(), which only touch
+    memory. sync() does the file work and is meant for a worker thread: it writes
+    everything appended so far and fsyncs once for all of it (group commit). Only one
+    sync() may run at a time.
+    """
+
+    def __init__(self, directory: str, sequence: int):
+        self.directory = directory
+        # Last sequence number handed out, and records since the segment a snapshot started
+        self.sequence = sequence
+        self.since_snapshot = 0
+        self.lock = threading.Lock()
+        # Appended but not yet written records, as [segment first sequence, bytearray] chunks;
+        # every restart and snapshot starts a new segment, so no file is ever appended to twice
+        self.pending: List[List[Any]] = [[sequence + 1, bytearray()]]
+        self.files: Dict[int, Any] = {}
+
+    def append(self, now: float, name: str, args: list) -> int:
+        """Add a command to the log; durable once a sync() started afterwards returns"""
+        self.sequence += 1
+        self.since_snapshot += 1
+        payload = json.dumps([self.sequence, now, name, args], separators=(",", ":")).encode()
+        with self.lock:
+            self.pending[-1][1] += RECORD_HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+        return self.sequence
+
+    def rotate(self) -> int:
+        """Send later records to a new segment; returns its first sequence number"""
+        self.since_snapshot = 0
+        with self.lock:
+            if self.pending[-1][0] != self.sequence + 1:
+                self.pending.append([self.sequence + 1, bytearray()])
+        return self.sequence + 1
+
+    def sync(self):
+        """Write and fsync everything appended so far (run in a worker thread)"""
+        with self.lock:
+            pending, self.pending = self.pending, [[self.pending[-1][0], bytearray()]]
+            created = [first_sequence for first_sequence, _ in pending if first_sequence not in self.files]
+            for first_sequence in created:
+                self.files[first_sequence] = open(segment_path(self.directory, first_sequence), "wb")
+            files = dict(self.files)
+
+        for first_sequence, data in pending:
+            if data:
+                files[first_sequence].write(data)
+        for f in files.values():
+            f.flush()
+            os.fsync(f.fileno())
+        if created:
+            fsync_directory(self.directory)
+
+        # Only the newest segment receives more records
+        with self.lock:
+            for first_sequence, f in files.items():
+                if first_sequence != pending[-1][0]:
+                    f.close()
+                    del self.files[first_sequence]
+
+    def snapshot(self, snapshot: GameSnapshot, next_id: int, sequence: int, first_kept: int):
+        """Write a snapshot as of sequence, then delete the segments it makes redundant (worker thread)
+
+        first_kept is what rotate() returned when the snapshot was taken: every older
+        segment only holds records up to sequence. May run alongside sync().
+        """
+        write_snapshot(self.directory, snapshot, next_id, sequence)
+        with self.lock:
+            # A segment still being written is left for the next snapshot to delete
+            busy = {first_sequence for first_sequence, _ in self.pending} | set(self.files)
+        for first_sequence, path in list_segments(self.directory):
+            if first_sequence < first_kept and first_sequence not in busy:
+                os.remove(path)
+        fsync_directory(self.directory)
+
+    def close(self):
+        """Write what is left and close the segment (no append() may follow)"""
+        self.sync()
+        for f in self.files.values():
+            f.close()
+        self.files.clear()
@@ -0,0 +1,365 @@
+# ABOUTME: Compact internal records for the in-memory game: slotted players and teams with integer handles
+from typing import Any, Dict, FrozenSet, Iterable, Iterator, List, Optional, Set, Tuple, Union
+from datetime import datetime
+from uuid import UUID
+from operator import attrgetter
+import heapq
+import time
+
+from models import Player, Team
+from team_names import TeamNamePool
+
+# Members a team may hold, same as models.Team.member_ids' max_length
+TEAM_SIZE = 2
+
+
+def handle_uuid(handle: int) -> UUID:
+    """The id an integer handle is shown as at the API boundary"""
+    return UUID(int=handle)
+
+
+class PlayerRecord:
+    __slots__ = ("id", "name", "team_id", "joined_at")
+
+    def __init__(self, id: int, name: str, team_id: Optional[int] = None, joined_at: Optional[float] = None):
+        self.id = id
+        self.name = name
+        self.team_id = team_id
+        self.joined_at = time.time() if joined_at is None else joined_at
+
+    def copy(self) -> "PlayerRecord":
+        return PlayerRecord(self.id, self.name, self.team_id, self.joined_at)
+
+    def to_model(self) -> Player:
+        """API view of the record, built without re-validating what the engine already checked"""
+        return Player.model_construct(
+            id=handle_uuid(self.id),
+            name=self.name,
+            team_id=None if self.team_id is None else handle_uuid(self.team_id),
+            joined_at=datetime.utcfromtimestamp(self.joined_at)
+        )
+
+
+class TeamRecord:
+    __slots__ = ("id", "name", "member_ids", "created_at")
+
+    def __init__(self, id: int, name: str, member_ids: Union[Set[int], FrozenSet[int], None] = None,
+                 created_at: Optional[float] = None):
+        self.id = id
+        self.name = name
+        # A set: membership checks and removals cost the same whatever the team size
+        self.member_ids = set() if member_ids is None else member_ids
+        self.created_at = time.time() if created_at is None else created_at
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.member_ids) >= TEAM_SIZE
+
+    @property
+    def is_empty(self) -> bool:
+        return len(self.member_ids) == 0
+
+    def add_member(self, player_id: int) -> bool:
+        if self.is_full:
+            return False
+        self.member_ids.add(player_id)
+        return True
+
+    def remove_member(self, player_id: int) -> bool:
+        if player_id in self.member_ids:
+            self.member_ids.remove(player_id)
+            return True
+        return False
+
+    def copy(self) -> "TeamRecord":
+        """Read-only copy for a snapshot: the members are frozen"""
+        return TeamRecord(self.id, self.name, frozenset(self.member_ids), self.created_at)
+
+    def to_model(self) -> Team:
+        """API view of the record, members ordered by handle"""
+        return Team.model_construct(
+            id=handle_uuid(self.id),
+            name=self.name,
+            member_ids=[handle_uuid(member_id) for member_id in sorted(self.member_ids)],
+            created_at=datetime.utcfromtimestamp(self.created_at)
+        )
+
+
+class IdIndex:
+    """Insertion-ordered set of ids whose iteration cost stays proportional to its size"""
+
+    __slots__ = ("ids", "removed")
+
+    def __init__(self, ids: Iterable[int] = ()):
+        self.ids: Dict[int, None] = dict.fromkeys(ids)
+        self.removed = 0
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.ids)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self.ids
+
+    def add(self, id: int):
+        self.ids[id] = None
+
+    def remove(self, id: int):
+        del self.ids[id]
+        self.removed += 1
+        # A dict keeps the slots of removed keys, which iteration still walks; once they
+        # outnumber the live ids, start over densely (amortized O(1) per removal)
+        if self.removed > max(len(self.ids), 32):
+            self.ids = dict(self.ids)
+            self.removed = 0
+
+
+class GameState:
+    """The in-memory game as plain records; only the single writer (lock holder or engine) touches it"""
+
+    __slots__ = (
+        "players", "teams", "next_id", "now", "team_names", "_player_ids_by_name", "_team_ids_by_name",
+        "_free_agent_ids", "_team_ids_by_open_slots", "_changed_player_ids", "_changed_team_ids"
+    )
+
+    def __init__(self, players: Optional[Dict[int, PlayerRecord]] = None,
+                 teams: Optional[Dict[int, TeamRecord]] = None, next_id: Optional[int] = None):
+        self.players: Dict[int, PlayerRecord] = players or {}
+        self.teams: Dict[int, TeamRecord] = teams or {}
+        # Handles are never reused, so a stale one can't point at somebody else
+        self.next_id = next_id or max([*self.players, *self.teams], default=0) + 1
+        # Timestamp for records created by the current command; None means the wall clock.
+        # A writer that journals its commands sets it so a replay stamps the same times
+        self.now: Optional[float] = None
+        self.team_names = TeamNamePool()
+
+        # Name -> id indexes kept in step by every mutation below, so lookups by name
+        # cost the same however many players and teams there are
+        self._player_ids_by_name = dict(zip(map(attrgetter("name"), self.players.values()), self.players))
+        self._team_ids_by_name = dict(zip(map(attrgetter("name"), self.teams.values()), self.teams))
+        # Free agents and teams by open slots, so listing them or assigning free agents
+        # costs O(result), not O(players)
+        self._free_agent_ids = IdIndex(
+            player_id for player_id, player in self.players.items() if player.team_id is None
+        )
+        self._team_ids_by_open_slots = [IdIndex() for _ in range(TEAM_SIZE + 1)]
+        for team in self.teams.values():
+            self._file_team(team)
+        # Ids of the players and teams changed since the last take_changes(); whatever
+        # the state was built with has not been published yet
+        self._changed_player_ids = set(self.players)
+        self._changed_team_ids = set(self.teams)
+
+    def take_changes(self) -> Tuple[Set[int], Set[int]]:
+        """Player and team ids changed (added, updated or removed) since the previous call"""
+        changes = (self._changed_player_ids, self._changed_team_ids)
+        self._changed_player_ids, self._changed_team_ids = set(), set()
+        return changes
+
+    @property
+    def free_agents(self) -> List[PlayerRecord]:
+        """Players without a team, in the order they became free agents"""
+        return [self.players[player_id] for player_id in self._free_agent_ids]
+
+    def teams_with_space(self) -> List[TeamRecord]:
+        """Teams that are not full, emptiest first"""
+        return [
+            self.teams[team_id]
+            for open_slots in range(TEAM_SIZE, 0, -1)
+            for team_id in self._team_ids_by_open_slots[open_slots]
+        ]
+
+    def get_player_by_name(self, name: str) -> Optional[PlayerRecord]:
+        player_id = self._player_ids_by_name.get(name)
+        return self.players.get(player_id) if player_id else None
+
+    def get_team_by_name(self, name: str) -> Optional[TeamRecord]:
+        team_id = self._team_ids_by_name.get(name)
+        return self.teams.get(team_id) if team_id else None
+
+    def _new_id(self) -> int:
+        handle = self.next_id
+        self.next_id += 1
+        return handle
+
+    def _file_team(self, team: TeamRecord, previous_open_slots: Optional[int] = None):
+        """Move a team to the bucket for its current number of open slots"""
+        if previous_open_slots is not None:
+            self._team_ids_by_open_slots[previous_open_slots].remove(team.id)
+        self._team_ids_by_open_slots[TEAM_SIZE - len(team.member_ids)].add(team.id)
+
+    def _add_member(self, team: TeamRecord, player: PlayerRecord):
+        """Put a free agent on a team that has space, keeping every index in step"""
+        open_slots = TEAM_SIZE - len(team.member_ids)
+        team.add_member(player.id)
+        self._file_team(team, open_slots)
+        player.team_id = team.id
+        self._free_agent_ids.remove(player.id)
+        self._changed_team_ids.add(team.id)
+        self._changed_player_ids.add(player.id)
+
+    def _remove_member(self, team: TeamRecord, player: PlayerRecord):
+        """Take a player off their team, making them a free agent"""
+        open_slots = TEAM_SIZE - len(team.member_ids)
+        team.remove_member(player.id)
+        self._file_team(team, open_slots)
+        player.team_id = None
+        self._free_agent_ids.add(player.id)
+        self._changed_team_ids.add(team.id)
+        self._changed_player_ids.add(player.id)
+
+    def _new_team(self, name: str) -> TeamRecord:
+        team = TeamRecord(self._new_id(), name, created_at=self.now)
+        self.teams[team.id] = team
+        self._team_ids_by_name[name] = team.id
+        self._file_team(team)
+        self._changed_team_ids.add(team.id)
+        return team
+
+    def add_player(self, name: str) -> PlayerRecord:
+        if self.get_player_by_name(name):
+            raise ValueError(f"Player with name '{name}' already exists")
+
+        player = PlayerRecord(self._new_id(), name, joined_at=self.now)
+        self.players[player.id] = player
+        self._player_ids_by_name[name] = player.id
+        self._free_agent_ids.add(player.id)
+        self._changed_player_ids.add(player.id)
+        return player
+
+    def create_team(self, name: str, creator_id: int) -> TeamRecord:
+        if self.get_team_by_name(name):
+            raise ValueError(f"Team with name '{name}' already exists")
+
+        creator = self.players.get(creator_id)
+        if not creator:
+            raise ValueError("Player not found")
+
+        if creator.team_id:
+            raise ValueError("Player is already on a team")
+
+        team = self._new_team(name)
+        self._add_member(team, creator)
+        return team
+
+    def join_team(self, team_name: str, player_id: int) -> TeamRecord:
+        team = self.get_team_by_name(team_name)
+        if not team:
+            raise ValueError(f"Team '{team_name}' not found")
+
+        if team.is_full:
+            raise ValueError(f"Team '{team_name}' is already full")
+
+        if player_id not in self.players:
+            raise ValueError("Player not found")
+
+        existing_player = self.players[player_id]
+        if existing_player.team_id:
+            raise ValueError("Player is already on a team")
+
+        self._add_member(team, existing_player)
+        return team
+
+    def poach_player(self, target_player_id: int, poacher_team_id: int) -> Dict[str, TeamRecord]:
+        if target_player_id not in self.players:
+            raise ValueError("Target player not found")
+
+        if poacher_team_id not in self.teams:
+            raise ValueError("Poacher team not found")
+
+        target_player = self.players[target_player_id]
+        poacher_team = self.teams[poacher_team_id]
+
+        if not target_player.team_id:
+            raise ValueError("Target player is not on a team")
+
+        if poacher_team.is_full:
+            raise ValueError("Poacher team is already full")
+
+        old_team = self.teams[target_player.team_id]
+        self._remove_member(old_team, target_player)
+
+        if old_team.is_empty:
+            self.remove_team(old_team.id)
+
+        self._add_member(poacher_team, target_player)
+
+        return {"old_team": old_team, "new_team": poacher_team}
+
+    def leave_team(self, player_id: int) -> Dict[str, Any]:
+        """Make a player a free agent, dissolving their team if it is left empty"""
+        player = self.players.get(player_id)
+        if not player:
+            raise ValueError("Player not found")
+
+        if not player.team_id:
+            raise ValueError("Player is not on a team")
+
+        team = self.teams[player.team_id]
+        self._remove_member(team, player)
+
+        team_dissolved = team.is_empty
+        if team_dissolved:
+            self.remove_team(team.id)
+        return {"team": team, "team_dissolved": team_dissolved}
+
+    def remove_player(self, player_id: int) -> PlayerRecord:
+        """Delete a player, dissolving their team if it is left empty"""
+        if self.players[player_id].team_id:
+            self.leave_team(player_id)
+
+        player = self.players.pop(player_id)
+        del self._player_ids_by_name[player.name]
+        self._free_agent_ids.remove(player_id)
+        self._changed_player_ids.add(player_id)
+        return player
+
+    def remove_team(self, team_id: int) -> TeamRecord:
+        """Delete a team, making its remaining members free agents"""
+        team = self.teams[team_id]
+        for member_id in list(team.member_ids):
+            self._remove_member(team, self.players[member_id])
+
+        del self.teams[team_id]
+        del self._team_ids_by_name[team.name]
+        self._team_ids_by_open_slots[TEAM_SIZE].remove(team_id)
+        self._changed_team_ids.add(team_id)
+        return team
+
+    def auto_assign_free_agents(self) -> Dict[str, Any]:
+        """Put every free agent on a team, filling the emptiest teams first and creating teams as needed"""
+        # Teams with space as (member count, order, name): the emptiest pops first
+        open_teams = [
+            (len(team.member_ids), order, team.name) for order, team in enumerate(self.teams_with_space())
+        ]
+        order = len(open_teams)
+        assignments = []
+
+        for player in self.free_agents:
+            if open_teams:
+                count, team_order, team_name = heapq.heappop(open_teams)
+            else:
+                team_name = self.team_names.take()
+                while team_name in self._team_ids_by_name:
+                    team_name = self.team_names.take()
+                count, team_order = 0, order
+                order += 1
+            assignments.append([player.name, team_name])
+            if count + 1 < TEAM_SIZE:
+                heapq.heappush(open_teams, (count + 1, team_order, team_name))
+
+        return self.assign_free_agents(assignments)
+
+    def assign_free_agents(self, assignments: List[List[str]]) -> Dict[str, Any]:
+        """Apply [player name, team name] placements, creating the teams that don't exist yet"""
+        teams_created = 0
+        for player_name, team_name in assignments:
+            team = self.get_team_by_name(team_name)
+            if team is None:
+                team = self._new_team(team_name)
+                teams_created += 1
+            self._add_member(team, self.get_player_by_name(player_name))
+
+        return {"assigned_count": len(assignments), "teams_created": teams_created, "assignments": assignments}
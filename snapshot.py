@@ -0,0 +1,106 @@
+# ABOUTME: Immutable, structurally shared snapshots of the in-memory game state for lock-free reads
+from typing import Any, Dict, Hashable, Iterator, List, Optional
+
+# Each node of the tree behind a SharedList holds up to 2**BITS children
+BITS = 5
+WIDTH = 1 << BITS
+MASK = WIDTH - 1
+
+
+class SharedList:
+    """Immutable sequence of values in insertion order, stored as a tree of small tuples
+
+    A write copies only the tuples on the path to one slot (a few dozen pointers per
+    level), everything else is shared with the previous version. Removed values leave
+    a None hole that iteration skips, so the positions of the others never move.
+    """
+
+    __slots__ = ("root", "shift", "count")
+
+    def __init__(self, root: tuple = (), shift: int = 0, count: int = 0):
+        self.root = root
+        self.shift = shift
+        self.count = count
+
+    def __iter__(self) -> Iterator[Any]:
+        return _values(self.root, self.shift)
+
+    def __len__(self) -> int:
+        return self.count
+
+
+def _values(node: tuple, shift: int) -> Iterator[Any]:
+    if shift == 0:
+        for value in node:
+            if value is not None:
+                yield value
+    else:
+        for child in node:
+            yield from _values(child, shift - BITS)
+
+
+def _assoc(node: tuple, shift: int, position: int, value: Any) -> tuple:
+    """Copy of node with the slot at position set, sharing every untouched subtree"""
+    index = (position >> shift) & MASK
+    if shift > 0:
+        value = _assoc(node[index] if index < len(node) else (), shift - BITS, position, value)
+    return node[:index] + (value,) + node[index + 1:]
+
+
+class SharedListWriter:
+    """Single writer producing new SharedList versions keyed by id; only the writer keeps the positions"""
+
+    def __init__(self):
+        self.current = SharedList()
+        self.positions: Dict[Hashable, int] = {}
+        self.slots = 0
+
+    def set(self, key: Hashable, value: Any):
+        """Insert or replace the value for key"""
+        position = self.positions.get(key)
+        count = self.current.count
+        if position is None:
+            position = self.positions[key] = self.slots
+            self.slots += 1
+            count += 1
+        self._write(position, value, count)
+
+    def delete(self, key: Hashable):
+        """Remove the value for key, if present"""
+        position = self.positions.pop(key, None)
+        if position is not None:
+            self._write(position, None, self.current.count - 1)
+            # Mostly holes: start over densely so iteration stays proportional to the live values
+            if self.current.count < self.slots // 2:
+                self._compact()
+
+    def load(self, keys: List[Hashable], values: List[Any]):
+        """Replace everything with values in order, keyed by keys, building the tree bottom up in one pass"""
+        self.positions = dict(zip(keys, range(len(keys))))
+        self.slots = len(values)
+
+        nodes, shift = [tuple(values[start:start + WIDTH]) for start in range(0, len(values), WIDTH)], 0
+        while len(nodes) > 1:
+            nodes, shift = [tuple(nodes[start:start + WIDTH]) for start in range(0, len(nodes), WIDTH)], shift + BITS
+        self.current = SharedList(nodes[0] if nodes else (), shift, len(values))
+
+    def _write(self, position: int, value: Any, count: int):
+        root, shift = self.current.root, self.current.shift
+        # Full tree: the old root becomes the first child of a new, taller one
+        if position >> shift >= WIDTH:
+            root, shift = (root,), shift + BITS
+        self.current = SharedList(_assoc(root, shift, position, value), shift, count)
+
+    def _compact(self):
+        self.load(sorted(self.positions, key=self.positions.get), list(self.current))
+
+
+class GameSnapshot:
+    """One published version of the game: read-only players and teams that no writer will touch again"""
+
+    __slots__ = ("version", "players", "teams")
+
+    def __init__(self, version: int = 0, players: Optional[SharedList] = None, teams: Optional[SharedList] = None):
+        self.version = version
+        self.players = players or SharedList()
+        self.teams = teams or SharedList()
@@ -0,0 +1,61 @@
+# ABOUTME: Streams the full /status JSON body straight from database rows with orjson
+from typing import Any, AsyncIterator, Dict, Iterable, List
+import orjson
+
+# Rows encoded per orjson call; bounds the transient dicts alive at once
+CHUNK_ROWS = 1000
+
+
+def _encode_rows(items: Iterable[Dict[str, Any]]) -> Iterable[bytes]:
+    """Comma-separated JSON objects for items, CHUNK_ROWS at a time"""
+    chunk: List[Dict[str, Any]] = []
+    first = True
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == CHUNK_ROWS:
+            yield (b"" if first else b",") + orjson.dumps(chunk)[1:-1]
+            chunk = []
+            first = False
+    if chunk:
+        yield (b"" if first else b",") + orjson.dumps(chunk)[1:-1]
+
+
+def _players(rows) -> Iterable[Dict[str, Any]]:
+    for row in rows:
+        yield {"id": row[0], "name": row[1], "team_id": row[2], "joined_at": row[3]}
+
+
+def _teams(rows, members_by_team: Dict[str, List[str]], max_team_size: int) -> Iterable[Dict[str, Any]]:
+    for row in rows:
+        member_ids = members_by_team.get(row[0], [])
+        yield {
+            "id": row[0],
+            "name": row[1],
+            "member_ids": member_ids,
+            "created_at": row[2],
+            "is_full": len(member_ids) >= max_team_size,
+            "member_count": len(member_ids)
+        }
+
+
+async def iter_status_json(snapshot: Dict[str, Any]) -> AsyncIterator[bytes]:
+    """Encode a get_status_snapshot as the /status body, byte for byte what JSONResponse produced"""
+    players = snapshot["players"]
+    free_agents = [row for row in players if row[2] is None]
+
+    yield b'{"game_stats":' + orjson.dumps({
+        "total_players": snapshot["stats"].get("total_players", 0),
+        "total_teams": snapshot["stats"].get("total_teams", 0),
+        "free_agents_count": len(free_agents)
+    }) + b',"players":['
+    for chunk in _encode_rows(_players(players)):
+        yield chunk
+
+    yield b'],"teams":['
+    for chunk in _encode_rows(_teams(snapshot["teams"], snapshot["members_by_team"], snapshot["max_team_size"])):
+        yield chunk
+
+    yield b'],"free_agents":['
+    for chunk in _encode_rows(_players(free_agents)):
+        yield chunk
+    yield b"]}"
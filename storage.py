@@ -0,0 +1,220 @@
+# ABOUTME: Storage backends that run the game's SQL against remote libsql or local SQLite
+from abc import ABC, abstractmethod
+from typing import Any, List, Optional, Sequence, Tuple
+import asyncio
+import sqlite3
+import threading
+import time
+from libsql_client import create_client
+
+# A statement plus its positional arguments, as accepted by StorageBackend.batch
+Statement = Tuple[str, Sequence[Any]]
+
+# URL prefix selecting the local SQLite backend, e.g. "sqlite:game.db" or "sqlite::memory:"
+SQLITE_URL_PREFIX = "sqlite:"
+
+# Seconds between background syncs of an embedded replica
+REPLICA_SYNC_SECONDS = 1.0
+
+
+class QueryResult:
+    """Rows and affected row count of one statement, shaped like a libsql ResultSet"""
+
+    __slots__ = ("rows", "rows_affected")
+
+    def __init__(self, rows: List[tuple], rows_affected: int):
+        self.rows = rows
+        self.rows_affected = rows_affected
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, index):
+        return self.rows[index]
+
+
+class StorageBackend(ABC):
+    """Executes SQL for TursoGameManager; batches always run as one transaction"""
+
+    @abstractmethod
+    async def execute(self, sql: str, args: Optional[Sequence[Any]] = None):
+        """Run a single statement and return its result"""
+
+    @abstractmethod
+    async def batch(self, statements: List[Statement]) -> list:
+        """Run statements in order inside one transaction and return one result per statement"""
+
+    @abstractmethod
+    async def close(self):
+        """Release the underlying connection"""
+
+    async def read_batch(self, statements: List[Statement]) -> list:
+        """Run read-only statements in one transaction; replicas may serve slightly stale data"""
+        return await self.batch(statements)
+
+    async def sync(self):
+        """Bring a local replica up to date with the primary (no-op without a replica)"""
+
+
+class LibsqlBackend(StorageBackend):
+    """Remote Turso/libsql database through the async libsql client"""
+
+    def __init__(self, url: str, auth_token: Optional[str] = None):
+        self.url = url
+        self.auth_token = auth_token
+        self.client = None
+        self._client_loop = None
+
+    def _get_client(self):
+        """Get or create the client for the running event loop"""
+        loop = asyncio.get_running_loop()
+        # The client's HTTP session is bound to the loop it was created on
+        if not self.client or self._client_loop is not loop:
+            self.client = create_client(
+                url=self.url,
+                auth_token=self.auth_token
+            )
+            self._client_loop = loop
+        return self.client
+
+    async def execute(self, sql: str, args: Optional[Sequence[Any]] = None):
+        return await self._get_client().execute(sql, list(args) if args else None)
+
+    async def batch(self, statements: List[Statement]) -> list:
+        return await self._get_client().batch([(sql, list(args)) for sql, args in statements])
+
+    async def close(self):
+        if self.client:
+            await self.client.close()
+            self.client = None
+
+
+class SqliteBackend(StorageBackend):
+    """Local SQLite file or in-memory database using the same SQL, with no network hop"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.connection = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+        if path != ":memory:":
+            self.connection.execute("PRAGMA journal_mode=WAL")
+        # Statements finish in microseconds, so they run inline; the lock only
+        # matters when several event loops share one backend
+        self._lock = threading.Lock()
+
+    def _run(self, sql: str, args: Optional[Sequence[Any]]) -> QueryResult:
+        cursor = self.connection.execute(sql, args or ())
+        try:
+            rows = cursor.fetchall()
+            return QueryResult(rows, max(cursor.rowcount, 0))
+        finally:
+            cursor.close()
+
+    async def execute(self, sql: str, args: Optional[Sequence[Any]] = None) -> QueryResult:
+        with self._lock:
+            return self._run(sql, args)
+
+    async def batch(self, statements: List[Statement]) -> List[QueryResult]:
+        with self._lock:
+            self.connection.execute("BEGIN")
+            try:
+                results = [self._run(sql, args) for sql, args in statements]
+                self.connection.execute("COMMIT")
+                return results
+            except Exception:
+                if self.connection.in_transaction:
+                    self.connection.execute("ROLLBACK")
+                raise
+
+    async def close(self):
+        self.connection.close()
+
+
+class ReplicaBackend(StorageBackend):
+    """Writes go to the primary; reads are served from an embedded libsql replica file synced from it
+
+    sync() and reads share the one replica connection and its lock, so reads that
+    arrive while a sync is pulling frames from the primary wait for it: roughly one
+    network round trip per sync_interval. Syncing on a second connection to the same
+    file would avoid that, but two libsql handles sharing one embedded replica file is
+    not a setup this backend relies on. Raise sync_interval if those stalls show up in
+    read latency.
+    """
+
+    def __init__(self, primary: StorageBackend, path: str, sync_url: str, auth_token: Optional[str] = None,
+                 sync_interval: float = REPLICA_SYNC_SECONDS):
+        # Optional dependency, only needed when replica mode is enabled
+        import libsql
+
+        self.primary = primary
+        self.path = path
+        self.sync_interval = sync_interval
+        self.connection = libsql.connect(
+            path,
+            sync_url=sync_url,
+            auth_token=auth_token or "",
+            isolation_level=None,
+            _check_same_thread=False
+        )
+        # sync() is blocking network I/O, so replica work runs in threads one at a time
+        self._lock = threading.Lock()
+        self._synced_at = None
+        self._sync_task = None
+
+    def _sync_blocking(self):
+        with self._lock:
+            started = time.monotonic()
+            self.connection.sync()
+            self._synced_at = started
+
+    def _read_blocking(self, statements: List[Statement]) -> List[QueryResult]:
+        with self._lock:
+            self.connection.execute("BEGIN")
+            try:
+                results = []
+                for sql, args in statements:
+                    cursor = self.connection.execute(sql, tuple(args or ()))
+                    results.append(QueryResult(cursor.fetchall(), 0))
+                return results
+            finally:
+                self.connection.execute("COMMIT")
+
+    async def _background_sync(self):
+        try:
+            await self.sync()
+        except Exception:
+            # Keep serving the last synced copy; the next read schedules another attempt
+            pass
+
+    async def sync(self):
+        await asyncio.to_thread(self._sync_blocking)
+
+    async def read_batch(self, statements: List[Statement]) -> List[QueryResult]:
+        if self._synced_at is None:
+            # Nothing to read from until the first sync has completed
+            await self.sync()
+        elif time.monotonic() - self._synced_at > self.sync_interval:
+            if self._sync_task is None or self._sync_task.done():
+                self._sync_task = asyncio.create_task(self._background_sync())
+        return await asyncio.to_thread(self._read_blocking, statements)
+
+    async def execute(self, sql: str, args: Optional[Sequence[Any]] = None):
+        return await self.primary.execute(sql, args)
+
+    async def batch(self, statements: List[Statement]) -> list:
+        return await self.primary.batch(statements)
+
+    async def close(self):
+        await self.primary.close()
+        self.connection.close()
+
+
+def create_backend(url: str, auth_token: Optional[str] = None, replica_path: Optional[str] = None) -> StorageBackend:
+    """Pick a backend from the database URL: "sqlite:<path>" is local, replica_path adds an embedded read replica"""
+    if url and url.startswith(SQLITE_URL_PREFIX):
+        return SqliteBackend(url[len(SQLITE_URL_PREFIX):] or ":memory:")
+    if replica_path:
+        return ReplicaBackend(LibsqlBackend(url, auth_token), replica_path, url, auth_token)
+    return LibsqlBackend(url, auth_token)
@@ -0,0 +1,52 @@
+# ABOUTME: Pool of unique generated team names handed out without database lookups
+from typing import Iterable, List, Optional
+import random
+
+ADJECTIVES = [
+    "Lucky", "Happy", "Brave", "Swift", "Mighty", "Clever", "Bold",
+    "Fierce", "Gentle", "Wise", "Quick", "Strong", "Bright", "Wild",
+    "Noble", "Proud", "Fearless", "Agile", "Cosmic", "Magic"
+]
+
+ANIMALS = [
+    "Parakeet", "Monkey", "Tiger", "Eagle", "Dragon", "Phoenix",
+    "Wolf", "Lion", "Falcon", "Panther", "Bear", "Fox", "Hawk",
+    "Leopard", "Dolphin", "Shark", "Cobra", "Jaguar", "Raven", "Owl"
+]
+
+
+class TeamNamePool:
+    """Adjective + animal names in random order, then the same pairs numbered 2, 3, ... once all are used
+
+    The pool only knows the names it was told about through sync() and the ones it
+    handed out itself, so callers still write new teams guarded by the UNIQUE name.
+    """
+
+    def __init__(self, adjectives: List[str] = ADJECTIVES, animals: List[str] = ANIMALS,
+                 rng: Optional[random.Random] = None):
+        self.pairs = [f"{adjective}{animal}" for adjective in adjectives for animal in animals]
+        self.rng = rng or random.Random()
+        self.taken = set()
+        self.round = 1
+        self.remaining: List[str] = []
+        self._refill(1)
+
+    def sync(self, taken: Iterable[str]):
+        """Replace the known team names with the teams table's, freeing the names of deleted teams"""
+        self.taken = set(taken)
+        self._refill(1)
+
+    def take(self) -> str:
+        """Hand out an unused name and mark it taken"""
+        while not self.remaining:
+            self._refill(self.round + 1)
+        name = self.remaining.pop()
+        self.taken.add(name)
+        return name
+
+    def _refill(self, number: int):
+        """Shuffle the untaken names of a round: bare pairs in round 1, pairs suffixed with the round number after"""
+        suffix = "" if number == 1 else str(number)
+        self.round = number
+        self.remaining = [name for name in (pair + suffix for pair in self.pairs) if name not in self.taken]
+        self.rng.shuffle(self.remaining)
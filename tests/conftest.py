@@ -0,0 +1,24 @@
+# ABOUTME: Shared pytest fixtures: the FastAPI app running against a throwaway local SQLite game
+import os
+import sys
+import tempfile
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# main builds its TursoGameManager at import time, so the database is chosen before it is imported
+os.environ["TURSO_DATABASE_URL"] = "sqlite:" + os.path.join(tempfile.mkdtemp(prefix="poachers-test-"), "game.db")
+
+
+@pytest.fixture
+def client():
+    from fastapi.testclient import TestClient
+    import main
+
+    with TestClient(main.app) as test_client:
+        yield test_client
+    # Each test starts from an empty game
+    with TestClient(main.app) as test_client:
+        test_client.cookies.set("admin_session", main.create_session_token(main.ADMIN_PASSWORD))
+        test_client.post("/admin/reset", follow_redirects=False)
@@ -0,0 +1,23 @@
+# ABOUTME: Tests for the admin auto-assign of free agents
+import asyncio
+
+from turso_game_state import TursoGameManager
+
+
+def test_auto_assign_fills_open_teams_then_creates_uniquely_named_ones():
+    async def scenario():
+        manager = TursoGameManager("sqlite::memory:")
+        for n in range(6):
+            await manager.join_game(f"player-{n}")
+        await manager.create_team("Existing", "player-0")
+
+        result = await manager.auto_assign_free_agents()
+        return result, await manager.get_status()
+
+    result, status = asyncio.run(scenario())
+
+    assert result["success"] and result["assigned_count"] == 5
+    assert status["free_agents"] == []
+    names = [team["name"] for team in status["teams"]]
+    assert len(names) == len(set(names)) == 3
+    assert all(team["member_count"] == 2 for team in status["teams"])
@@ -0,0 +1,27 @@
+# ABOUTME: Tests for POST /batch request validation
+import pytest
+
+from models import MAX_NAME_LENGTH
+
+
+@pytest.mark.parametrize("atomic", [True, False])
+def test_batch_with_an_oversized_name_is_rejected_and_applies_nothing(client, atomic):
+    response = client.post("/batch", json={
+        "operations": [
+            {"op": "join", "player_name": "Alice"},
+            {"op": "join", "player_name": "x" * (MAX_NAME_LENGTH + 1)},
+        ],
+        "atomic": atomic,
+    })
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == f"player_name must be at most {MAX_NAME_LENGTH} characters"
+    assert client.get("/status").json()["players"] == []
+
+
+def test_batch_applies_names_at_the_limit(client):
+    name = "x" * MAX_NAME_LENGTH
+    response = client.post("/batch", json={"operations": [{"op": "join", "player_name": name}]})
+
+    assert response.status_code == 200
+    assert [player["name"] for player in client.get("/status").json()["players"]] == [name]
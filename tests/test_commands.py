@@ -0,0 +1,27 @@
+# ABOUTME: Tests for the /ws command channel's frame validation
+from models import MAX_NAME_LENGTH
+
+
+def test_ws_rejects_a_name_longer_than_the_rest_limit(client):
+    with client.websocket_connect("/ws") as socket:
+        socket.send_json({"id": 1, "op": "join", "player_name": "x" * (MAX_NAME_LENGTH + 1)})
+        reply = socket.receive_json()
+
+    assert reply == {
+        "type": "result",
+        "id": 1,
+        "ok": False,
+        "status": 400,
+        "error": f"player_name must be at most {MAX_NAME_LENGTH} characters",
+    }
+    assert client.get("/status").json()["players"] == []
+
+
+def test_ws_accepts_a_name_at_the_limit(client):
+    name = "x" * MAX_NAME_LENGTH
+    with client.websocket_connect("/ws") as socket:
+        socket.send_json({"id": 2, "op": "join", "player_name": name})
+        reply = socket.receive_json()
+
+    assert reply["ok"] is True
+    assert [player["name"] for player in client.get("/status").json()["players"]] == [name]
@@ -0,0 +1,79 @@
+# ABOUTME: Tests for the durable in-memory engine: recovery from the write-ahead log and snapshots
+import asyncio
+import os
+import pickle
+import struct
+import zlib
+
+import pytest
+
+from game_engine import GameEngine
+from persistence import RECORD_HEADER, SNAPSHOT_FILE, read_snapshot
+
+
+def rows(state):
+    """Everything recovery must restore, as plain comparable values"""
+    return (
+        sorted((p.id, p.name, p.team_id, p.joined_at) for p in state.players.values()),
+        sorted((t.id, t.name, sorted(t.member_ids), t.created_at) for t in state.teams.values()),
+        state.next_id,
+    )
+
+
+async def play(engine, first, count):
+    for n in range(first, first + count):
+        await engine.join_game(f"player-{n}")
+        if n % 3 == 0:
+            await engine.create_team(f"team-{n}", f"player-{n}")
+        elif n % 3 == 1:
+            await engine.join_team(f"team-{n - 1}", f"player-{n}")
+    await engine.poach_player(f"player-{first + 1}", f"team-{first + 3}")
+    await engine.leave_team(f"player-{first + 4}")
+    await engine.delete_player(f"player-{first + 2}")
+
+
+def test_restart_restores_the_same_game_from_snapshot_and_log(tmp_path):
+    async def scenario():
+        engine = GameEngine.open(str(tmp_path))
+        await play(engine, 0, 30)
+        await engine.take_snapshot()
+        # Recorded after the snapshot, so only the log has them
+        await play(engine, 30, 30)
+        await engine.auto_assign_free_agents()
+        expected = rows(engine.state)
+        await engine.close()
+
+        restarted = GameEngine.open(str(tmp_path))
+        recovered = rows(restarted.state)
+        await restarted.close()
+        return expected, recovered
+
+    expected, recovered = asyncio.run(scenario())
+    assert recovered == expected
+
+
+def test_snapshot_is_plain_json(tmp_path):
+    async def scenario():
+        engine = GameEngine.open(str(tmp_path))
+        await play(engine, 0, 9)
+        await engine.take_snapshot()
+        await engine.close()
+
+    asyncio.run(scenario())
+    with open(os.path.join(tmp_path, SNAPSHOT_FILE), "rb") as f:
+        data = f.read()
+    assert data[8 + RECORD_HEADER.size:].startswith(b"[")
+
+
+def test_pickled_snapshot_is_refused_without_being_loaded(tmp_path):
+    class Payload:
+        def __reduce__(self):
+            return (os.mkdir, (os.path.join(tmp_path, "pwned"),))
+
+    payload = pickle.dumps(Payload())
+    with open(os.path.join(tmp_path, SNAPSHOT_FILE), "wb") as f:
+        f.write(b"POACHSN1" + struct.pack("<II", len(payload), zlib.crc32(payload)) + payload)
+
+    with pytest.raises(ValueError):
+        read_snapshot(str(tmp_path))
+    assert not os.path.exists(os.path.join(tmp_path, "pwned"))
@@ -0,0 +1,27 @@
+# ABOUTME: Tests for schema version detection at startup
+import asyncio
+
+import pytest
+
+from storage import SqliteBackend
+from turso_game_state import SCHEMA_VERSION, TursoGameManager
+
+
+def test_new_database_is_at_schema_version_zero():
+    backend = SqliteBackend(":memory:")
+    assert asyncio.run(TursoGameManager._get_schema_version(backend)) == 0
+
+
+def test_migrated_database_reports_current_version():
+    manager = TursoGameManager("sqlite::memory:")
+    asyncio.run(manager.get_state_version())
+    assert asyncio.run(TursoGameManager._get_schema_version(manager.backend)) == SCHEMA_VERSION
+
+
+def test_read_failure_is_not_mistaken_for_a_new_database():
+    class UnreachableBackend(SqliteBackend):
+        async def execute(self, sql, args=None):
+            raise ConnectionError("primary unreachable")
+
+    with pytest.raises(ConnectionError):
+        asyncio.run(TursoGameManager._get_schema_version(UnreachableBackend(":memory:")))
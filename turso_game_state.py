@@ -1,45 +1,31 @@
 # ABOUTME: Simple Turso SQL database game state management for team poaching game
-from typing import Dict, Any
+from typing import Callable, Dict, Any, List, NamedTuple, Optional, Tuple
+import asyncio
+import base64
+import heapq
+import json
+import time
 import uuid
 import os
-from datetime import datetime
-from libsql_client import create_client_sync
+from datetime import datetime, timedelta
+from storage import StorageBackend, create_backend
+from team_names import TeamNamePool
 
+# Team size limit read inside the same statement/transaction as the write it guards
+MAX_TEAM_SIZE_SQL = "COALESCE((SELECT stat_value FROM game_stats WHERE stat_key = 'max_team_size'), 2)"
 
-class TursoGameManager:
-    """Game management using Turso SQL database"""
-
-    def __init__(self, db_url: str = None, auth_token: str = None):
-        if not db_url:
-            db_url = os.getenv("TURSO_DATABASE_URL")
-        if not auth_token:
-            auth_token = os.getenv("TURSO_AUTH_TOKEN")
-
-        self.db_url = db_url
-        self.auth_token = auth_token
-        self.client = None
-        self._initialized = False
-
-    def _get_client(self):
-        """Get or create Turso client"""
-        if not self.client:
-            self.client = create_client_sync(
-                url=self.db_url,
-                auth_token=self.auth_token
-            )
-            self._initialize_database()
-        return self.client
-
-    def _initialize_database(self):
-        """Initialize database schema if not exists"""
-        if self._initialized:
-            return
+# Settings assumed when game_stats has no row for them
+DEFAULT_SETTINGS = {"max_team_size": 2, "poaching_enabled": 1}
 
-        try:
-            client = self._get_client()
+# Seconds a worker trusts its cached settings before re-checking settings_version
+SETTINGS_REFRESH_SECONDS = 2.0
 
-            # Embed schema SQL directly to avoid file system issues in serverless
-            schema_sql = """
+# Ordered schema migrations: MIGRATIONS[n] upgrades a database at version n to n + 1.
+# Embedded directly to avoid file system issues in serverless. Append new entries,
+# never edit released ones.
+MIGRATIONS = [
+    # 1: initial schema (IF NOT EXISTS so databases created before versioning adopt it)
+    """
 -- Players table - stores individual player information
 CREATE TABLE IF NOT EXISTS players (
     id TEXT PRIMARY KEY,
@@ -82,58 +68,419 @@ CREATE TABLE IF NOT EXISTS game_stats (
 -- Initialize game statistics
 INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_players', 0);
 INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0);
+INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('settings_version', 0);
+""",
+    # 2: global state version, bumped by every mutation that changes the game
+    """
+INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('state_version', 0);
+""",
+    # 3: append-only change log, one row per state_version. The baseline row marks
+    # where the log starts, so older versions are known to need a full resync.
+    """
+CREATE TABLE IF NOT EXISTS state_changes (
+    version INTEGER PRIMARY KEY,
+    event TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP
+);
+
+INSERT OR IGNORE INTO state_changes (version, event, payload)
+SELECT stat_value, 'log_started', '{}' FROM game_stats WHERE stat_key = 'state_version';
+""",
+    # 4: keyset pagination for get_status_page; (team_id, joined_at, id) supersedes idx_players_team_id
+    """
+CREATE INDEX IF NOT EXISTS idx_players_joined_at ON players(joined_at, id);
+CREATE INDEX IF NOT EXISTS idx_players_team_joined_at ON players(team_id, joined_at, id);
+CREATE INDEX IF NOT EXISTS idx_teams_created_at ON teams(created_at, id);
+DROP INDEX IF EXISTS idx_players_team_id;
+""",
+    # 5: never holds rows; an all-or-nothing batch inserts 0 here to abort itself
+    """
+CREATE TABLE IF NOT EXISTS batch_guard (
+    ok INTEGER NOT NULL CONSTRAINT batch_operation_failed CHECK (ok)
+);
+""",
+]
+
+SCHEMA_VERSION = len(MIGRATIONS)
+
+# Appended to every write batch so the caller learns the version its write produced
+STATE_VERSION_STATEMENT = ("SELECT stat_value FROM game_stats WHERE stat_key = 'state_version'", [])
+
+# Most change log entries returned by one get_changes call
+CHANGES_PAGE_SIZE = 100
+
+# State versions the change log keeps; clients further behind resync from /status
+CHANGE_LOG_RETAINED = 10_000
+
+# Default page size and the sections get_status_page can return
+STATUS_PAGE_SIZE = 50
+STATUS_SECTIONS = ("game_stats", "players", "teams", "free_agents")
+
+# Rows per table on one admin panel page, and the filters and sort columns it accepts;
+# sorts are indexed columns so a page costs the same however big the game is
+ADMIN_PAGE_SIZE = 50
+ADMIN_PLAYER_FILTERS = {"all": "", "free_agents": "p.team_id IS NULL", "on_team": "p.team_id IS NOT NULL"}
+ADMIN_PLAYER_SORTS = {"joined_at": "p.joined_at", "name": "p.name"}
+ADMIN_TEAM_FILTERS = {
+    "all": "",
+    "open": f"(SELECT COUNT(*) FROM team_members WHERE team_id = t.id) < {MAX_TEAM_SIZE_SQL}",
+    "full": f"(SELECT COUNT(*) FROM team_members WHERE team_id = t.id) >= {MAX_TEAM_SIZE_SQL}",
+}
+ADMIN_TEAM_SORTS = {"created_at": "t.created_at", "name": "t.name"}
+
+# Rows a change log entry describes: the named players and teams, the named players'
+# teams and those teams' members. Params: ?1 player names (JSON), ?2 team names (JSON),
+# ?3 the max team size being set, or NULL (adds the teams whose is_full it flips)
+CHANGE_TARGETS_SQL = f"""
+WITH named_players AS (
+    SELECT id, team_id FROM players WHERE name IN (SELECT value FROM json_each(?1))
+), touched_teams AS (
+    SELECT id FROM teams WHERE name IN (SELECT value FROM json_each(?2))
+    UNION SELECT team_id FROM named_players WHERE team_id IS NOT NULL
+    UNION SELECT team_id FROM team_members WHERE ?3 IS NOT NULL
+    GROUP BY team_id HAVING (COUNT(*) >= {MAX_TEAM_SIZE_SQL}) != (COUNT(*) >= ?3)
+), touched_players AS (
+    SELECT id FROM named_players
+    UNION SELECT player_id FROM team_members WHERE team_id IN (SELECT id FROM touched_teams)
+)
+"""
+
+# Written before a mutation, at the version it will produce, holding the ids it is about to touch
+CHANGE_BEGIN_SQL = CHANGE_TARGETS_SQL + """
+INSERT OR REPLACE INTO state_changes (version, event, payload)
+SELECT stat_value + 1, ?4, json_object(
+    'pending', 1,
+    'player_ids', json((SELECT json_group_array(id) FROM touched_players)),
+    'team_ids', json((SELECT json_group_array(id) FROM touched_teams))
+)
+FROM game_stats WHERE stat_key = 'state_version'
+"""
+
+# A rejected mutation leaves state_version alone, so its pending entry is dropped
+CHANGE_DISCARD_SQL = """
+DELETE FROM state_changes
+WHERE version > (SELECT stat_value FROM game_stats WHERE stat_key = 'state_version')
+"""
+
+# Replaces the pending ids with the current rows (shaped like get_status) and the ids that are gone
+CHANGE_FINISH_SQL = CHANGE_TARGETS_SQL + f"""
+UPDATE state_changes SET payload = json_object(
+    'players', json((
+        SELECT json_group_array(json_object('id', id, 'name', name, 'team_id', team_id, 'joined_at', joined_at))
+        FROM players
+        WHERE id IN (SELECT value FROM json_each(state_changes.payload, '$.player_ids')
+                     UNION SELECT id FROM touched_players)
+    )),
+    'teams', json((
+        SELECT json_group_array(json_object(
+            'id', t.id,
+            'name', t.name,
+            'member_ids', json((SELECT json_group_array(player_id) FROM
+                                (SELECT player_id FROM team_members WHERE team_id = t.id ORDER BY rowid))),
+            'created_at', t.created_at,
+            'is_full', json(CASE WHEN (SELECT COUNT(*) FROM team_members WHERE team_id = t.id)
+                                      >= {MAX_TEAM_SIZE_SQL} THEN 'true' ELSE 'false' END),
+            'member_count', (SELECT COUNT(*) FROM team_members WHERE team_id = t.id)
+        ))
+        FROM teams t
+        WHERE t.id IN (SELECT value FROM json_each(state_changes.payload, '$.team_ids')
+                       UNION SELECT id FROM touched_teams)
+    )),
+    'removed_player_ids', json((
+        SELECT json_group_array(value) FROM json_each(state_changes.payload, '$.player_ids')
+        WHERE value NOT IN (SELECT id FROM players)
+    )),
+    'removed_team_ids', json((
+        SELECT json_group_array(value) FROM json_each(state_changes.payload, '$.team_ids')
+        WHERE value NOT IN (SELECT id FROM teams)
+    ))
+)
+WHERE version = (SELECT stat_value FROM game_stats WHERE stat_key = 'state_version')
+  AND json_extract(payload, '$.pending') = 1
+"""
+
+# Drops entries that fell out of the retained window (?1 CHANGE_LOG_RETAINED)
+CHANGE_PRUNE_SQL = """
+DELETE FROM state_changes
+WHERE version <= (SELECT stat_value FROM game_stats WHERE stat_key = 'state_version') - ?1
+"""
+
+# Placed after an operation's statements in an all-or-nothing batch: an operation that
+# changed the game left a pending change log entry at the current state_version; one
+# that was rejected did not, and the failing insert rolls back the whole batch
+BATCH_GUARD_SQL = """
+INSERT INTO batch_guard (ok)
+SELECT 0 WHERE NOT EXISTS (
+    SELECT 1 FROM state_changes
+    WHERE version = (SELECT stat_value FROM game_stats WHERE stat_key = 'state_version')
+      AND json_extract(payload, '$.pending') = 1
+)
+"""
+
+# Methods run_batch can combine, each built by a matching _<method>_operation
+BATCH_METHODS = ("join_game", "create_team", "join_team", "poach_player", "leave_team")
+
+# Times auto-assign re-plans when the game changed between reading it and writing the plan
+AUTO_ASSIGN_ATTEMPTS = 3
+
+# Aborts an auto-assign plan (?1 assignments [[player_id, team_id], ...], ?2 new teams
+# [[team_id, name, created_at], ...]) unless every player is still a free agent, every
+# target team still exists or is new, no new name is taken and no team ends up over the limit
+AUTO_ASSIGN_GUARD_SQL = f"""
+WITH plan AS (
+    SELECT json_extract(value, '$[0]') AS player_id, json_extract(value, '$[1]') AS team_id FROM json_each(?1)
+), new_teams AS (
+    SELECT json_extract(value, '$[0]') AS id, json_extract(value, '$[1]') AS name FROM json_each(?2)
+)
+INSERT INTO batch_guard (ok)
+SELECT 0 WHERE
+    (SELECT COUNT(*) FROM players WHERE id IN (SELECT player_id FROM plan) AND team_id IS NULL)
+        != (SELECT COUNT(*) FROM plan)
+    OR EXISTS (SELECT 1 FROM teams WHERE name IN (SELECT name FROM new_teams))
+    OR EXISTS (SELECT 1 FROM plan WHERE team_id NOT IN (SELECT id FROM teams UNION ALL SELECT id FROM new_teams))
+    OR EXISTS (
+        SELECT 1 FROM (SELECT team_id, COUNT(*) AS added FROM plan GROUP BY team_id) AS planned
+        WHERE added + (SELECT COUNT(*) FROM team_members WHERE team_id = planned.team_id) > {MAX_TEAM_SIZE_SQL}
+    )
 """
 
-            # Execute schema statements
-            statements = [stmt.strip() for stmt in schema_sql.split(';') if stmt.strip()]
-            for statement in statements:
-                if statement:
-                    try:
-                        client.execute(statement)
-                    except Exception as e:
-                        # Ignore errors for statements that might already exist
-                        if "already exists" not in str(e):
-                            raise e
+
+class Operation(NamedTuple):
+    """A game mutation ready to run alone or inside a batch"""
+    event: str
+    statements: List[Tuple[str, list]]
+    players: List[str]
+    teams: List[str]
+    # Builds the method's result from the statements' results plus the state_version row
+    finish: Callable[[list], Dict[str, Any]]
+
+
+class TursoGameManager:
+    """Game management using Turso SQL database"""
+
+    def __init__(self, db_url: str = None, auth_token: str = None, backend: StorageBackend = None,
+                 replica_path: str = None):
+        if not db_url:
+            db_url = os.getenv("TURSO_DATABASE_URL")
+        if not auth_token:
+            auth_token = os.getenv("TURSO_AUTH_TOKEN")
+        if not replica_path:
+            replica_path = os.getenv("TURSO_REPLICA_PATH")
+
+        self.db_url = db_url
+        self.auth_token = auth_token
+        # "sqlite:<path>" URLs run locally; everything else goes to libsql/Turso,
+        # with reads from an embedded replica file when replica_path is set
+        self.backend = backend or create_backend(db_url, auth_token, replica_path)
+        self._init_lock = None
+        self._init_loop = None
+        self._initialized = False
+        self._settings = None
+        self._settings_version = None
+        self._settings_checked_at = 0.0
+        self._settings_write_version = 0
+        self._change_listeners: List[Callable[[int], None]] = []
+        self._team_names = TeamNamePool()
+
+    async def _get_backend(self) -> StorageBackend:
+        """Get the storage backend, bootstrapping the schema on first use"""
+        if not self._initialized:
+            loop = asyncio.get_running_loop()
+            if self._init_loop is not loop:
+                self._init_lock = asyncio.Lock()
+                self._init_loop = loop
+            # Concurrent first requests wait for a single schema bootstrap
+            async with self._init_lock:
+                await self._initialize_database()
+        return self.backend
+
+    async def _initialize_database(self):
+        """Bring the schema up to SCHEMA_VERSION, skipping all DDL when it is current"""
+        if self._initialized:
+            return
+
+        try:
+            backend = self.backend
+
+            version = await self._get_schema_version(backend)
+            if version < SCHEMA_VERSION:
+                await self._migrate(backend, version)
 
             self._initialized = True
 
         except Exception as e:
             raise Exception(f"Failed to initialize database: {str(e)}")
 
+    @staticmethod
+    async def _get_schema_version(backend: StorageBackend) -> int:
+        """Read the stored schema version in one query (0 for a new database)"""
+        try:
+            result = await backend.execute(
+                "SELECT stat_value FROM game_stats WHERE stat_key = 'schema_version'"
+            )
+        except Exception as e:
+            # Only a database without game_stats is new; a network, auth or locking error
+            # must not look like one, or startup would re-run every migration
+            if "no such table" in str(e).lower():
+                return 0
+            raise
+        return result[0][0] if len(result) > 0 else 0
+
+    async def _migrate(self, backend: StorageBackend, version: int):
+        """Apply pending migrations and record the new version in one transaction"""
+        statements = [
+            (stmt.strip(), [])
+            for migration in MIGRATIONS[version:]
+            for stmt in migration.split(';')
+            if stmt.strip()
+        ]
+        statements.append((
+            "INSERT OR REPLACE INTO game_stats (stat_key, stat_value) VALUES ('schema_version', ?)",
+            [SCHEMA_VERSION]
+        ))
+
+        try:
+            await backend.batch(statements)
+        except Exception:
+            # Another worker may have migrated first; that is only fine if it got us current
+            if await self._get_schema_version(backend) < SCHEMA_VERSION:
+                raise
+
     async def get_next_id(self) -> str:
         """Generate a new UUID for players/teams"""
         return str(uuid.uuid4())
 
+    async def _batch(self, statements: List[Tuple[str, list]]) -> list:
+        """Run statements as one transaction in a single round trip"""
+        backend = await self._get_backend()
+        return await backend.batch(statements)
+
+    @staticmethod
+    def _logged(event: str, statements: List[Tuple[str, list]], players: List[str] = (),
+                teams: List[str] = (), max_team_size: Optional[int] = None,
+                guard: bool = False) -> List[Tuple[str, list]]:
+        """Wrap a mutation's statements so it appends to the change log if it bumped state_version"""
+        # The statements keep their positions after the first one and the state_version row comes last
+        targets = [json.dumps(list(players)), json.dumps(list(teams)), max_team_size]
+        return [
+            (CHANGE_BEGIN_SQL, targets + [event]),
+            *statements,
+            *([(BATCH_GUARD_SQL, [])] if guard else []),
+            (CHANGE_DISCARD_SQL, []),
+            (CHANGE_FINISH_SQL, targets),
+            (CHANGE_PRUNE_SQL, [CHANGE_LOG_RETAINED]),
+            STATE_VERSION_STATEMENT,
+        ]
+
+    async def _mutate(self, event: str, statements: List[Tuple[str, list]], players: List[str] = (),
+                      teams: List[str] = (), max_team_size: Optional[int] = None) -> list:
+        """Run a mutation batch and append it to the change log if it bumped state_version"""
+        # Results line up with statements, followed by the state_version row
+        results = await self._batch(self._logged(event, statements, players, teams, max_team_size))
+        self._notify_change(results[-1][0][0])
+        return results[1:len(statements) + 1] + [results[-1]]
+
+    async def _run_operations(self, operations: List[Operation], atomic: bool = False,
+                              dry_run: bool = False) -> List[Dict[str, Any]]:
+        """Run operations in order in one transaction and return each one's result
+
+        Each operation re-checks the rules in SQL, so it sees the writes of the ones
+        before it. atomic aborts the whole transaction at the first rejected operation;
+        dry_run rolls everything back after collecting the results.
+        """
+        statements, spans = [], []
+        for operation in operations:
+            logged = self._logged(operation.event, operation.statements, operation.players, operation.teams,
+                                  guard=atomic)
+            spans.append((len(statements), len(statements) + len(logged)))
+            statements += logged
+
+        if dry_run:
+            results = (await self._batch([("SAVEPOINT dry_run", []), *statements,
+                                          ("ROLLBACK TO dry_run", []), ("RELEASE dry_run", [])]))[1:-2]
+        else:
+            results = await self._batch(statements)
+            self._notify_change(results[-1][0][0])
+
+        return [
+            operation.finish(results[start + 1:start + 1 + len(operation.statements)] + [results[end - 1]])
+            for operation, (start, end) in zip(operations, spans)
+        ]
+
+    def _notify_change(self, state_version: int):
+        for listener in self._change_listeners:
+            listener(state_version)
+
+    def add_change_listener(self, listener: Callable[[int], None]):
+        """Call listener with the resulting state version after every write made through this manager"""
+        self._change_listeners.append(listener)
+
+    async def _read(self, statements: List[Tuple[str, list]], min_version: int = 0) -> list:
+        """Run read-only statements in one transaction, from a replica once it has reached min_version"""
+        # The first result is always the state_version row, then one result per statement
+        backend = await self._get_backend()
+        statements = [STATE_VERSION_STATEMENT] + statements
+
+        results = await backend.read_batch(statements)
+        if results[0][0][0] < min_version:
+            # The replica has not seen the caller's write yet: catch up, else ask the primary
+            await backend.sync()
+            results = await backend.read_batch(statements)
+            if results[0][0][0] < min_version:
+                results = await backend.batch(statements)
+        return results
+
+    @staticmethod
+    def _dissolve_team_statements(team_id_sql: str, args: list) -> List[Tuple[str, list]]:
+        """Statements that delete a team left without members and decrement the team counter"""
+        return [
+            (
+                f"""
+                DELETE FROM teams
+                WHERE id = ({team_id_sql})
+                  AND NOT EXISTS (SELECT 1 FROM team_members WHERE team_id = teams.id)
+                """,
+                args
+            ),
+            # changes() is the row count of the DELETE above: 1 if the team was dissolved
+            TursoGameManager._count_changes(total_teams=-1),
+        ]
+
+    @staticmethod
+    def _count_changes(**factors: int) -> Tuple[str, list]:
+        """Statement adding changes() of the previous statement, times a factor, to game_stats counters"""
+        # Bumping state_version here too means rejected (no-op) mutations never produce a new version
+        cases = " ".join(f"WHEN '{key}' THEN {factor}" for key, factor in factors.items())
+        keys = ", ".join(f"'{key}'" for key in factors)
+        return (
+            f"UPDATE game_stats SET stat_value = stat_value + changes() * CASE stat_key {cases} END "
+            f"WHERE stat_key IN ({keys})",
+            []
+        )
+
     async def join_game(self, player_name: str) -> Dict[str, Any]:
         """Add a new player to the game"""
         try:
-            client = self._get_client()
+            return (await self._run_operations([await self._join_game_operation(player_name)]))[0]
 
-            # Check if player already exists
-            existing = client.execute(
-                "SELECT id FROM players WHERE name = ?",
-                [player_name]
-            )
-            if len(existing) > 0:
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Failed to join game: {str(e)}"
+            }
+
+    async def _join_game_operation(self, player_name: str) -> Operation:
+        player_id = await self.get_next_id()
+        joined_at = datetime.utcnow().isoformat()
+
+        def finish(results: list) -> Dict[str, Any]:
+            if results[0].rows_affected == 0:
                 return {
                     "success": False,
                     "message": f"Player '{player_name}' already exists"
                 }
 
-            player_id = await self.get_next_id()
-            joined_at = datetime.utcnow().isoformat()
-
-            # Insert player
-            client.execute(
-                "INSERT INTO players (id, name, team_id, joined_at) VALUES (?, ?, ?, ?)",
-                [player_id, player_name, None, joined_at]
-            )
-
-            # Update stats
-            client.execute(
-                "UPDATE game_stats SET stat_value = stat_value + 1 WHERE stat_key = 'total_players'"
-            )
-
             return {
                 "success": True,
                 "player": {
@@ -142,7 +489,84 @@ INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0
                     "team_id": None,
                     "joined_at": joined_at
                 },
-                "message": f"Player '{player_name}' joined the game"
+                "message": f"Player '{player_name}' joined the game",
+                "state_version": results[-1][0][0]
+            }
+
+        # Insert player and update stats; the UNIQUE name turns a duplicate into a no-op
+        return Operation("player_joined", [
+            (
+                "INSERT OR IGNORE INTO players (id, name, team_id, joined_at) VALUES (?, ?, ?, ?)",
+                [player_id, player_name, None, joined_at]
+            ),
+            self._count_changes(total_players=1, state_version=1),
+        ], [player_name], [], finish)
+
+    async def join_game_bulk(self, player_names: List[str]) -> Dict[str, Any]:
+        """Add many players in one transaction, reporting which names were taken"""
+        try:
+            # Consecutive timestamps keep the request's order in joined_at
+            started_at = datetime.utcnow()
+            players = {}
+            for offset, name in enumerate(player_names):
+                if name not in players:
+                    players[name] = {
+                        "id": await self.get_next_id(),
+                        "name": name,
+                        "team_id": None,
+                        "joined_at": (started_at + timedelta(microseconds=offset)).isoformat()
+                    }
+            rows = json.dumps([[p["id"], p["name"], p["joined_at"]] for p in players.values()])
+
+            # One INSERT for every name; the UNIQUE name skips the taken ones, and
+            # the hot counter row is updated once for all of them
+            results = await self._mutate("players_joined", [
+                (
+                    """
+                    INSERT OR IGNORE INTO players (id, name, team_id, joined_at)
+                    SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), NULL, json_extract(value, '$[2]')
+                    FROM json_each(?) ORDER BY key
+                    """,
+                    [rows]
+                ),
+                (
+                    "UPDATE game_stats SET stat_value = stat_value + "
+                    "CASE stat_key WHEN 'total_players' THEN changes() ELSE MIN(changes(), 1) END "
+                    "WHERE stat_key IN ('total_players', 'state_version')",
+                    []
+                ),
+                ("SELECT id FROM players WHERE id IN (SELECT json_extract(value, '$[0]') FROM json_each(?))", [rows]),
+            ], players=list(players))
+
+            inserted = {row[0] for row in results[2]}
+            joined, conflicts, name_results = [], [], []
+            for name in player_names:
+                player = players[name]
+                # A name repeated within the request conflicts with its first occurrence
+                if player["id"] in inserted:
+                    inserted.discard(player["id"])
+                    joined.append(player)
+                    name_results.append({
+                        "player_name": name,
+                        "success": True,
+                        "message": f"Player '{name}' joined the game",
+                        "player": player
+                    })
+                else:
+                    conflicts.append(name)
+                    name_results.append({
+                        "player_name": name,
+                        "success": False,
+                        "message": f"Player '{name}' already exists"
+                    })
+
+            return {
+                "success": True,
+                "message": f"{len(joined)} of {len(player_names)} players joined the game",
+                "joined": joined,
+                "conflicts": conflicts,
+                "results": name_results,
+                "state_version": results[-1][0][0]
             }
 
         except Exception as e:
@@ -154,147 +578,129 @@ INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0
     async def create_team(self, team_name: str, creator_name: str) -> Dict[str, Any]:
         """Create a new team with the creator as first member"""
         try:
-            client = self._get_client()
+            return (await self._run_operations([await self._create_team_operation(team_name, creator_name)]))[0]
 
-            # Check if team already exists
-            existing = client.execute(
-                "SELECT id FROM teams WHERE name = ?",
-                [team_name]
-            )
-            if len(existing) > 0:
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Failed to create team: {str(e)}"
+            }
+
+    async def _create_team_operation(self, team_name: str, creator_name: str) -> Operation:
+        team_id = await self.get_next_id()
+        created_at = datetime.utcnow().isoformat()
+
+        def finish(results: list) -> Dict[str, Any]:
+            existing_team_id, creator_id, creator_team_id = results[0][0]
+            if existing_team_id:
                 return {
                     "success": False,
                     "message": f"Team '{team_name}' already exists"
                 }
 
-            # Get creator
-            creator = client.execute(
-                "SELECT id, team_id FROM players WHERE name = ?",
-                [creator_name]
-            )
-            if len(creator) == 0:
+            if creator_id is None:
                 return {
                     "success": False,
                     "message": "You must join the game before creating a team"
                 }
 
-            creator_data = creator[0]
-            if creator_data[1]:  # team_id is not None
+            if creator_team_id:
                 return {
                     "success": False,
                     "message": "You must leave your current team before creating a new one"
                 }
 
-            # Create team
-            team_id = await self.get_next_id()
-            created_at = datetime.utcnow().isoformat()
-
-            client.execute(
-                "INSERT INTO teams (id, name, created_at) VALUES (?, ?, ?)",
-                [team_id, team_name, created_at]
-            )
-
-            # Update creator's team
-            client.execute(
-                "UPDATE players SET team_id = ? WHERE id = ?",
-                [team_id, creator_data[0]]
-            )
-
-            # Add to team members
-            client.execute(
-                "INSERT INTO team_members (team_id, player_id, joined_at) VALUES (?, ?, ?)",
-                [team_id, creator_data[0], created_at]
-            )
-
-            # Update stats
-            client.execute(
-                "UPDATE game_stats SET stat_value = stat_value + 1 WHERE stat_key = 'total_teams'"
-            )
-
             return {
                 "success": True,
                 "team": {
                     "id": team_id,
                     "name": team_name,
-                    "member_ids": [creator_data[0]],
+                    "member_ids": [creator_id],
                     "created_at": created_at
                 },
-                "message": f"Team '{team_name}' created by '{creator_name}'"
+                "message": f"Team '{team_name}' created by '{creator_name}'",
+                "state_version": results[-1][0][0]
             }
 
+        # Every write re-checks the rules in SQL, so the snapshot read first
+        # describes exactly what the writes saw
+        return Operation("team_created", [
+            (
+                """
+                SELECT (SELECT id FROM teams WHERE name = ?1), p.id, p.team_id
+                FROM (SELECT ?2 AS creator_name) AS args
+                LEFT JOIN players p ON p.name = args.creator_name
+                """,
+                [team_name, creator_name]
+            ),
+            (
+                """
+                INSERT INTO teams (id, name, created_at)
+                SELECT ?1, ?2, ?3
+                WHERE NOT EXISTS (SELECT 1 FROM teams WHERE name = ?2)
+                  AND EXISTS (SELECT 1 FROM players WHERE name = ?4 AND team_id IS NULL)
+                """,
+                [team_id, team_name, created_at, creator_name]
+            ),
+            (
+                """
+                UPDATE players SET team_id = ?1
+                WHERE name = ?2 AND team_id IS NULL
+                  AND EXISTS (SELECT 1 FROM teams WHERE id = ?1)
+                """,
+                [team_id, creator_name]
+            ),
+            (
+                """
+                INSERT INTO team_members (team_id, player_id, joined_at)
+                SELECT team_id, id, ?2 FROM players WHERE name = ?3 AND team_id = ?1
+                """,
+                [team_id, created_at, creator_name]
+            ),
+            self._count_changes(total_teams=1, state_version=1),
+        ], [creator_name], [team_name], finish)
+
+    async def join_team(self, team_name: str, player_name: str) -> Dict[str, Any]:
+        """Join an existing team"""
+        try:
+            return (await self._run_operations([await self._join_team_operation(team_name, player_name)]))[0]
+
         except Exception as e:
             return {
                 "success": False,
-                "message": f"Failed to create team: {str(e)}"
+                "message": f"Failed to join team: {str(e)}"
             }
 
-    async def join_team(self, team_name: str, player_name: str) -> Dict[str, Any]:
-        """Join an existing team"""
-        try:
-            client = self._get_client()
-            max_team_size = await self.get_max_team_size()
+    async def _join_team_operation(self, team_name: str, player_name: str) -> Operation:
+        joined_at = datetime.utcnow().isoformat()
 
-            # Get player
-            player = client.execute(
-                "SELECT id, team_id FROM players WHERE name = ?",
-                [player_name]
-            )
-            if len(player) == 0:
+        def finish(results: list) -> Dict[str, Any]:
+            player_id, player_team_id, team_id, member_count, max_team_size = results[0][0]
+            if player_id is None:
                 return {
                     "success": False,
                     "message": "You must join the game before joining a team"
                 }
 
-            player_data = player[0]
-            if player_data[1]:  # team_id is not None
+            if player_team_id:
                 return {
                     "success": False,
                     "message": "You must leave your current team before joining another one"
                 }
 
-            # Get team
-            team = client.execute(
-                "SELECT id FROM teams WHERE name = ?",
-                [team_name]
-            )
-            if len(team) == 0:
+            if team_id is None:
                 return {
                     "success": False,
                     "message": f"Team '{team_name}' not found"
                 }
 
-            team_id = team[0][0]
-
-            # Check team size
-            members = client.execute(
-                "SELECT COUNT(*) FROM team_members WHERE team_id = ?",
-                [team_id]
-            )
-            if members[0][0] >= max_team_size:
+            if member_count >= max_team_size:
                 return {
                     "success": False,
                     "message": f"Team '{team_name}' is already full (max {max_team_size})"
                 }
 
-            # Update player's team
-            client.execute(
-                "UPDATE players SET team_id = ? WHERE id = ?",
-                [team_id, player_data[0]]
-            )
-
-            # Add to team members
-            joined_at = datetime.utcnow().isoformat()
-            client.execute(
-                "INSERT INTO team_members (team_id, player_id, joined_at) VALUES (?, ?, ?)",
-                [team_id, player_data[0], joined_at]
-            )
-
-            # Get team members for response
-            team_members = client.execute(
-                "SELECT player_id FROM team_members WHERE team_id = ?",
-                [team_id]
-            )
-            member_ids = [row[0] for row in team_members]
+            member_ids = [row[0] for row in results[4]]
 
             return {
                 "success": True,
@@ -304,210 +710,207 @@ INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0
                     "member_ids": member_ids,
                     "created_at": joined_at
                 },
-                "message": f"Player '{player_name}' joined team '{team_name}'"
+                "message": f"Player '{player_name}' joined team '{team_name}'",
+                "state_version": results[-1][0][0]
             }
 
+        return Operation("team_joined", [
+            (
+                f"""
+                SELECT p.id, p.team_id, t.id,
+                       (SELECT COUNT(*) FROM team_members WHERE team_id = t.id),
+                       {MAX_TEAM_SIZE_SQL}
+                FROM (SELECT ?1 AS player_name, ?2 AS team_name) AS args
+                LEFT JOIN players p ON p.name = args.player_name
+                LEFT JOIN teams t ON t.name = args.team_name
+                """,
+                [player_name, team_name]
+            ),
+            (
+                f"""
+                UPDATE players SET team_id = (SELECT id FROM teams WHERE name = ?2)
+                WHERE name = ?1 AND team_id IS NULL
+                  AND EXISTS (SELECT 1 FROM teams WHERE name = ?2)
+                  AND (SELECT COUNT(*) FROM team_members
+                       WHERE team_id = (SELECT id FROM teams WHERE name = ?2)) < {MAX_TEAM_SIZE_SQL}
+                """,
+                [player_name, team_name]
+            ),
+            (
+                """
+                INSERT INTO team_members (team_id, player_id, joined_at)
+                SELECT team_id, id, ?3 FROM players
+                WHERE name = ?1 AND team_id = (SELECT id FROM teams WHERE name = ?2)
+                  AND NOT EXISTS (SELECT 1 FROM team_members WHERE player_id = players.id)
+                """,
+                [player_name, team_name, joined_at]
+            ),
+            self._count_changes(state_version=1),
+            (
+                "SELECT player_id FROM team_members WHERE team_id = (SELECT id FROM teams WHERE name = ?)",
+                [team_name]
+            ),
+        ], [player_name], [team_name], finish)
+
+    async def poach_player(self, target_player_name: str, poacher_team_name: str) -> Dict[str, Any]:
+        """Poach a player from another team"""
+        try:
+            operation = await self._poach_player_operation(target_player_name, poacher_team_name)
+            return (await self._run_operations([operation]))[0]
+
         except Exception as e:
             return {
                 "success": False,
-                "message": f"Failed to join team: {str(e)}"
+                "message": f"Failed to poach player: {str(e)}"
             }
 
-    async def poach_player(self, target_player_name: str, poacher_team_name: str) -> Dict[str, Any]:
-        """Poach a player from another team"""
-        try:
-            client = self._get_client()
+    async def _poach_player_operation(self, target_player_name: str, poacher_team_name: str) -> Operation:
+        poached_at = datetime.utcnow().isoformat()
+        target_team_sql = "SELECT team_id FROM players WHERE name = ?1"
 
-            # Get target player
-            target = client.execute(
-                "SELECT id, team_id FROM players WHERE name = ?",
-                [target_player_name]
-            )
-            if len(target) == 0:
+        def finish(results: list) -> Dict[str, Any]:
+            target_id, old_team_id, old_team_name, poacher_team_id, poacher_count, max_team_size = results[0][0]
+            if target_id is None:
                 return {
                     "success": False,
                     "message": f"Player '{target_player_name}' not found"
                 }
 
-            target_data = target[0]
-            if not target_data[1]:  # team_id is None
+            if not old_team_id:
                 return {
                     "success": False,
                     "message": "Cannot poach a free agent"
                 }
 
-            # Get poacher team
-            poacher = client.execute(
-                "SELECT id FROM teams WHERE name = ?",
-                [poacher_team_name]
-            )
-            if len(poacher) == 0:
+            if poacher_team_id is None:
                 return {
                     "success": False,
                     "message": f"Team '{poacher_team_name}' not found"
                 }
 
-            poacher_team_id = poacher[0][0]
-
-            # Check if poacher team is full
-            max_team_size = await self.get_max_team_size()
-            poacher_members = client.execute(
-                "SELECT COUNT(*) FROM team_members WHERE team_id = ?",
-                [poacher_team_id]
-            )
-            if poacher_members[0][0] >= max_team_size:
+            if poacher_count >= max_team_size:
                 return {
                     "success": False,
                     "message": f"Cannot poach when your team is full (max {max_team_size})"
                 }
 
             # Don't poach from own team
-            if target_data[1] == poacher_team_id:
+            if old_team_id == poacher_team_id:
                 return {
                     "success": False,
                     "message": "Target player is already on your team"
                 }
 
-            # Get old team
-            old_team = client.execute(
-                "SELECT name FROM teams WHERE id = ?",
-                [target_data[1]]
-            )
-            old_team_name = old_team[0][0]
-
-            # Remove from old team members
-            client.execute(
-                "DELETE FROM team_members WHERE player_id = ?",
-                [target_data[0]]
-            )
-
-            # Add to new team members
-            poached_at = datetime.utcnow().isoformat()
-            client.execute(
-                "INSERT INTO team_members (team_id, player_id, joined_at) VALUES (?, ?, ?)",
-                [poacher_team_id, target_data[0], poached_at]
-            )
-
-            # Update player's team
-            client.execute(
-                "UPDATE players SET team_id = ? WHERE id = ?",
-                [poacher_team_id, target_data[0]]
-            )
-
-            # Check if old team is empty
-            old_team_members = client.execute(
-                "SELECT COUNT(*) FROM team_members WHERE team_id = ?",
-                [target_data[1]]
-            )
-
             old_team_response = None
-            if old_team_members[0][0] == 0:
-                # Delete empty team
-                client.execute("DELETE FROM teams WHERE id = ?", [target_data[1]])
-                client.execute(
-                    "UPDATE game_stats SET stat_value = stat_value - 1 WHERE stat_key = 'total_teams'"
-                )
-                old_team_response = None
-            else:
-                # Get remaining members
-                remaining = client.execute(
-                    "SELECT player_id FROM team_members WHERE team_id = ?",
-                    [target_data[1]]
-                )
+            if results[2].rows_affected == 0:
                 old_team_response = {
-                    "id": target_data[1],
+                    "id": old_team_id,
                     "name": old_team_name,
-                    "member_ids": [row[0] for row in remaining]
+                    "member_ids": [row[0] for row in results[4]]
                 }
 
-            # Get new team members
-            new_team_members = client.execute(
-                "SELECT player_id FROM team_members WHERE team_id = ?",
-                [poacher_team_id]
-            )
             new_team_response = {
                 "id": poacher_team_id,
                 "name": poacher_team_name,
-                "member_ids": [row[0] for row in new_team_members]
+                "member_ids": [row[0] for row in results[8]]
             }
 
             return {
                 "success": True,
                 "message": f"Player '{target_player_name}' poached to team '{poacher_team_name}'",
                 "old_team": old_team_response,
-                "new_team": new_team_response
+                "new_team": new_team_response,
+                "state_version": results[-1][0][0]
             }
 
+        # Removing the old membership is the guarded step; until players.team_id
+        # is switched at the end it still points at the old team
+        return Operation("player_poached", [
+            (
+                f"""
+                SELECT p.id, p.team_id, ot.name, t.id,
+                       (SELECT COUNT(*) FROM team_members WHERE team_id = t.id),
+                       {MAX_TEAM_SIZE_SQL}
+                FROM (SELECT ?1 AS player_name, ?2 AS team_name) AS args
+                LEFT JOIN players p ON p.name = args.player_name
+                LEFT JOIN teams ot ON ot.id = p.team_id
+                LEFT JOIN teams t ON t.name = args.team_name
+                """,
+                [target_player_name, poacher_team_name]
+            ),
+            (
+                f"""
+                DELETE FROM team_members
+                WHERE player_id = (SELECT id FROM players WHERE name = ?1)
+                  AND team_id = ({target_team_sql})
+                  AND team_id != (SELECT id FROM teams WHERE name = ?2)
+                  AND (SELECT COUNT(*) FROM team_members
+                       WHERE team_id = (SELECT id FROM teams WHERE name = ?2)) < {MAX_TEAM_SIZE_SQL}
+                """,
+                [target_player_name, poacher_team_name]
+            ),
+            *self._dissolve_team_statements(target_team_sql, [target_player_name]),
+            (
+                f"SELECT player_id FROM team_members WHERE team_id = ({target_team_sql})",
+                [target_player_name]
+            ),
+            (
+                """
+                INSERT INTO team_members (team_id, player_id, joined_at)
+                SELECT (SELECT id FROM teams WHERE name = ?2), id, ?3 FROM players
+                WHERE name = ?1 AND team_id IS NOT NULL
+                  AND NOT EXISTS (SELECT 1 FROM team_members WHERE player_id = players.id)
+                """,
+                [target_player_name, poacher_team_name, poached_at]
+            ),
+            self._count_changes(state_version=1),
+            (
+                """
+                UPDATE players SET team_id = (SELECT id FROM teams WHERE name = ?2)
+                WHERE name = ?1
+                  AND EXISTS (SELECT 1 FROM team_members
+                              WHERE player_id = players.id
+                                AND team_id = (SELECT id FROM teams WHERE name = ?2))
+                """,
+                [target_player_name, poacher_team_name]
+            ),
+            (
+                "SELECT player_id FROM team_members WHERE team_id = (SELECT id FROM teams WHERE name = ?)",
+                [poacher_team_name]
+            ),
+        ], [target_player_name], [poacher_team_name], finish)
+
+    async def leave_team(self, player_name: str) -> Dict[str, Any]:
+        """Remove a player from their team and make them a free agent"""
+        try:
+            return (await self._run_operations([await self._leave_team_operation(player_name)]))[0]
+
         except Exception as e:
             return {
                 "success": False,
-                "message": f"Failed to poach player: {str(e)}"
+                "message": f"Failed to leave team: {str(e)}"
             }
 
-    async def leave_team(self, player_name: str) -> Dict[str, Any]:
-        """Remove a player from their team and make them a free agent"""
-        try:
-            client = self._get_client()
+    async def _leave_team_operation(self, player_name: str) -> Operation:
+        team_id_sql = "SELECT team_id FROM players WHERE name = ?1"
 
-            # Get player
-            player_data = client.execute(
-                "SELECT id, team_id FROM players WHERE name = ?",
-                [player_name]
-            )
-            if len(player_data) == 0:
+        def finish(results: list) -> Dict[str, Any]:
+            if len(results[0]) == 0:
                 return {
                     "success": False,
                     "message": f"Player '{player_name}' not found"
                 }
 
-            player_id = player_data[0][0]
-            team_id = player_data[0][1]
-
+            team_id = results[0][0][1]
             if not team_id:
                 return {
                     "success": False,
                     "message": f"Player '{player_name}' is not on a team"
                 }
 
-            # Get team name before removal
-            team_info = client.execute(
-                "SELECT name FROM teams WHERE id = ?",
-                [team_id]
-            )
-            team_name = team_info[0][0] if team_info else "Unknown"
-
-            # Remove from team_members
-            client.execute(
-                "DELETE FROM team_members WHERE team_id = ? AND player_id = ?",
-                [team_id, player_id]
-            )
-
-            # Update player's team_id to NULL
-            client.execute(
-                "UPDATE players SET team_id = NULL WHERE id = ?",
-                [player_id]
-            )
-
-            # Check if team is now empty
-            remaining_members = client.execute(
-                "SELECT COUNT(*) FROM team_members WHERE team_id = ?",
-                [team_id]
-            )
-
-            team_dissolved = False
-            if remaining_members[0][0] == 0:
-                # Delete empty team
-                client.execute("DELETE FROM teams WHERE id = ?", [team_id])
-                client.execute(
-                    "UPDATE game_stats SET stat_value = stat_value - 1 WHERE stat_key = 'total_teams'"
-                )
-                team_dissolved = True
-
-            # Get updated player info
-            player_updated = client.execute(
-                "SELECT id, name, team_id, joined_at FROM players WHERE id = ?",
-                [player_id]
-            )
+            team_name = results[0][0][2] or "Unknown"
+            team_dissolved = results[2].rows_affected > 0
+            player_updated = results[6]
 
             return {
                 "success": True,
@@ -519,80 +922,139 @@ INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0
                     "team_id": player_updated[0][2],
                     "joined_at": player_updated[0][3]
                 },
-                "team_dissolved": team_dissolved
+                "team_dissolved": team_dissolved,
+                "state_version": results[-1][0][0]
+            }
+
+        return Operation("team_left", [
+            (
+                """
+                SELECT p.id, p.team_id, t.name
+                FROM players p LEFT JOIN teams t ON t.id = p.team_id
+                WHERE p.name = ?
+                """,
+                [player_name]
+            ),
+            (
+                f"""
+                DELETE FROM team_members
+                WHERE player_id = (SELECT id FROM players WHERE name = ?1)
+                  AND team_id = ({team_id_sql})
+                """,
+                [player_name]
+            ),
+            *self._dissolve_team_statements(team_id_sql, [player_name]),
+            ("UPDATE players SET team_id = NULL WHERE name = ? AND team_id IS NOT NULL", [player_name]),
+            self._count_changes(state_version=1),
+            ("SELECT id, name, team_id, joined_at FROM players WHERE name = ?", [player_name]),
+        ], [player_name], [], finish)
+
+    async def run_batch(self, operations: List[Tuple[str, List[str]]], atomic: bool = True) -> Dict[str, Any]:
+        """Run several game operations in order in one transaction and round trip
+
+        operations are (method, arguments) pairs for join_game, create_team, join_team,
+        poach_player or leave_team. An atomic batch applies every operation or none of
+        them; otherwise each operation that succeeds is kept.
+        """
+        try:
+            planned = []
+            for method, args in operations:
+                if method not in BATCH_METHODS:
+                    raise ValueError(f"{method} cannot run in a batch")
+                planned.append(await getattr(self, f"_{method}_operation")(*args))
+
+            if not atomic:
+                results = await self._run_operations(planned)
+                return {
+                    "success": True,
+                    "applied": sum(result["success"] for result in results),
+                    "results": results,
+                    "state_version": max(result.get("state_version", 0) for result in results) or None
+                }
+
+            try:
+                results = await self._run_operations(planned, atomic=True)
+                return {
+                    "success": True,
+                    "applied": len(results),
+                    "results": results,
+                    "state_version": results[-1]["state_version"]
+                }
+            except Exception as e:
+                if "batch_operation_failed" not in str(e):
+                    raise
+
+            # Nothing was written; replay it and roll back to find out which operation was rejected
+            results = await self._run_operations(planned, dry_run=True)
+            failed = next((index for index, result in enumerate(results) if not result["success"]), None)
+            if failed is None:
+                return {
+                    "success": False,
+                    "message": "The game changed while the batch was running; nothing was applied, try again",
+                    "failed_index": None,
+                    "results": []
+                }
+
+            return {
+                "success": False,
+                "message": f"Operation {failed} failed: {results[failed]['message']}; nothing was applied",
+                "failed_index": failed,
+                "results": [
+                    results[failed] if index == failed else {
+                        "success": False,
+                        "message": f"Not applied: operation {failed} failed"
+                    }
+                    for index in range(len(results))
+                ]
             }
 
         except Exception as e:
             return {
                 "success": False,
-                "message": f"Failed to leave team: {str(e)}"
+                "message": f"Failed to run batch: {str(e)}"
             }
 
-    async def get_status(self) -> Dict[str, Any]:
-        """Get current game status"""
+    async def get_status_snapshot(self, min_version: int = 0) -> Dict[str, Any]:
+        """Get the raw rows behind get_status from one consistent read, without building per-row dicts"""
         try:
-            client = self._get_client()
+            # Four reads in one transaction: a consistent snapshot in a single
+            # round trip, however many teams there are
+            version, players, teams, memberships, stats = await self._read([
+                ("SELECT id, name, team_id, joined_at FROM players ORDER BY joined_at, id", []),
+                ("SELECT id, name, created_at FROM teams ORDER BY created_at, id", []),
+                ("SELECT team_id, player_id FROM team_members ORDER BY rowid", []),
+                ("SELECT stat_key, stat_value FROM game_stats", []),
+            ], min_version=min_version)
+
+            # Group memberships by team in Python instead of one query per team
+            members_by_team: Dict[str, List[str]] = {}
+            for team_id, player_id in memberships:
+                members_by_team.setdefault(team_id, []).append(player_id)
 
-            # Get all players
-            players = client.execute(
-                "SELECT id, name, team_id, joined_at FROM players ORDER BY joined_at"
-            )
-            player_list = []
-            for row in players:
-                player_list.append({
-                    "id": row[0],
-                    "name": row[1],
-                    "team_id": row[2],
-                    "joined_at": row[3]
-                })
-
-            # Get all teams with member counts
-            teams = client.execute("""
-                SELECT t.id, t.name, t.created_at, COUNT(tm.player_id) as member_count
-                FROM teams t
-                LEFT JOIN team_members tm ON t.id = tm.team_id
-                GROUP BY t.id, t.name, t.created_at
-                ORDER BY t.created_at
-            """)
-
-            team_list = []
-            max_team_size = await self.get_max_team_size()
-            for row in teams:
-                team_dict = {
-                    "id": row[0],
-                    "name": row[1],
-                    "member_ids": [],  # Will be populated below
-                    "created_at": row[2],
-                    "is_full": row[3] >= max_team_size,
-                    "member_count": row[3]
-                }
-                team_list.append(team_dict)
-
-            # Populate member_ids for each team
-            for team in team_list:
-                members = client.execute(
-                    "SELECT player_id FROM team_members WHERE team_id = ?",
-                    [team["id"]]
-                )
-                team["member_ids"] = [row[0] for row in members]
-
-            # Get free agents (players without teams)
-            free_agents = [p for p in player_list if p["team_id"] is None]
-
-            # Get stats
-            stats = client.execute("SELECT stat_key, stat_value FROM game_stats")
             stats_dict = {row[0]: row[1] for row in stats}
+            # The stats read already carries the settings, so refresh the cache for free
+            self._cache_settings(stats_dict)
 
             return {
-                "players": player_list,
-                "teams": team_list,
-                "free_agents": free_agents,
-                "total_players": stats_dict.get("total_players", 0),
-                "total_teams": stats_dict.get("total_teams", 0),
-                "free_agents_count": len(free_agents)
+                "success": True,
+                "players": players,
+                "teams": teams,
+                "members_by_team": members_by_team,
+                "stats": stats_dict,
+                "max_team_size": self._settings["max_team_size"],
+                "state_version": version[0][0]
             }
 
         except Exception as e:
+            return {
+                "success": False,
+                "message": f"Failed to get status: {str(e)}"
+            }
+
+    async def get_status(self, min_version: int = 0) -> Dict[str, Any]:
+        """Get current game status, at least as new as min_version"""
+        snapshot = await self.get_status_snapshot(min_version=min_version)
+        if not snapshot["success"]:
             return {
                 "players": [],
                 "teams": [],
@@ -600,23 +1062,412 @@ INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0
                 "total_players": 0,
                 "total_teams": 0,
                 "free_agents_count": 0,
-                "error": str(e)
+                "error": snapshot["message"]
+            }
+
+        player_list = []
+        for row in snapshot["players"]:
+            player_list.append({
+                "id": row[0],
+                "name": row[1],
+                "team_id": row[2],
+                "joined_at": row[3]
+            })
+
+        team_list = []
+        for row in snapshot["teams"]:
+            member_ids = snapshot["members_by_team"].get(row[0], [])
+            team_list.append({
+                "id": row[0],
+                "name": row[1],
+                "member_ids": member_ids,
+                "created_at": row[2],
+                "is_full": len(member_ids) >= snapshot["max_team_size"],
+                "member_count": len(member_ids)
+            })
+
+        # Get free agents (players without teams)
+        free_agents = [p for p in player_list if p["team_id"] is None]
+
+        return {
+            "players": player_list,
+            "teams": team_list,
+            "free_agents": free_agents,
+            "total_players": snapshot["stats"].get("total_players", 0),
+            "total_teams": snapshot["stats"].get("total_teams", 0),
+            "free_agents_count": len(free_agents),
+            "state_version": snapshot["state_version"]
+        }
+
+    @staticmethod
+    def encode_cursor(sort_value: str, row_id: str) -> str:
+        """Opaque cursor pointing just past a row in (timestamp, id) order"""
+        return base64.urlsafe_b64encode(json.dumps([sort_value, row_id]).encode()).decode().rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[str, str]:
+        """Inverse of encode_cursor; raises ValueError for anything it did not produce"""
+        try:
+            sort_value, row_id = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        except Exception:
+            raise ValueError("Invalid cursor")
+        if not isinstance(sort_value, str) or not isinstance(row_id, str):
+            raise ValueError("Invalid cursor")
+        return sort_value, row_id
+
+    async def get_status_page(self, limit: int = STATUS_PAGE_SIZE, players_cursor: str = None,
+                              teams_cursor: str = None, free_agents_only: bool = False,
+                              team_name: str = None, has_space: bool = False,
+                              sections: Tuple[str, ...] = STATUS_SECTIONS,
+                              min_version: int = 0) -> Dict[str, Any]:
+        """Get one page of players and/or teams in index order, optionally filtered"""
+        players_cursor = self.decode_cursor(players_cursor) if players_cursor else None
+        teams_cursor = self.decode_cursor(teams_cursor) if teams_cursor else None
+
+        try:
+            statements = [("SELECT stat_key, stat_value FROM game_stats", [])]
+
+            # Free agents on their own are just the players filter
+            read_players = "players" in sections or "free_agents" in sections
+            if read_players:
+                conditions, args = [], []
+                if players_cursor:
+                    conditions.append("(joined_at, id) > (?, ?)")
+                    args.extend(players_cursor)
+                if free_agents_only or "players" not in sections:
+                    conditions.append("team_id IS NULL")
+                if team_name:
+                    conditions.append("team_id = (SELECT id FROM teams WHERE name = ?)")
+                    args.append(team_name)
+                where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+                statements.append((
+                    f"SELECT id, name, team_id, joined_at FROM players {where} "
+                    f"ORDER BY joined_at, id LIMIT ?",
+                    args + [limit + 1]
+                ))
+
+            read_teams = "teams" in sections
+            if read_teams:
+                conditions, args = [], []
+                if teams_cursor:
+                    conditions.append("(created_at, id) > (?, ?)")
+                    args.extend(teams_cursor)
+                if team_name:
+                    conditions.append("name = ?")
+                    args.append(team_name)
+                if has_space:
+                    conditions.append(
+                        f"(SELECT COUNT(*) FROM team_members WHERE team_id = teams.id) < {MAX_TEAM_SIZE_SQL}"
+                    )
+                where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+                page_sql = f"SELECT id, name, created_at FROM teams {where} ORDER BY created_at, id LIMIT ?"
+                statements.append((page_sql, args + [limit + 1]))
+                # Members of exactly the teams on this page, from the same snapshot
+                statements.append((
+                    f"SELECT team_id, player_id FROM team_members "
+                    f"WHERE team_id IN (SELECT id FROM ({page_sql})) ORDER BY rowid",
+                    args + [limit + 1]
+                ))
+
+            if "game_stats" in sections:
+                statements.append(("SELECT COUNT(*) FROM players WHERE team_id IS NULL", []))
+
+            version, stats, *results = await self._read(statements, min_version=min_version)
+
+            stats_dict = {row[0]: row[1] for row in stats}
+            self._cache_settings(stats_dict)
+            max_team_size = self._settings["max_team_size"]
+
+            status = {"success": True, "state_version": version[0][0]}
+
+            if read_players:
+                rows = results.pop(0)
+                page = [
+                    {"id": row[0], "name": row[1], "team_id": row[2], "joined_at": row[3]}
+                    for row in rows[:limit]
+                ]
+                if "players" in sections:
+                    status["players"] = page
+                if "free_agents" in sections:
+                    status["free_agents"] = [p for p in page if p["team_id"] is None]
+                status["next_players_cursor"] = (
+                    self.encode_cursor(page[-1]["joined_at"], page[-1]["id"]) if len(rows) > limit else None
+                )
+
+            if read_teams:
+                rows = results.pop(0)
+                members_by_team: Dict[str, List[str]] = {}
+                for team_id, player_id in results.pop(0):
+                    members_by_team.setdefault(team_id, []).append(player_id)
+
+                team_list = []
+                for row in rows[:limit]:
+                    member_ids = members_by_team.get(row[0], [])
+                    team_list.append({
+                        "id": row[0],
+                        "name": row[1],
+                        "member_ids": member_ids,
+                        "created_at": row[2],
+                        "is_full": len(member_ids) >= max_team_size,
+                        "member_count": len(member_ids)
+                    })
+                status["teams"] = team_list
+                status["next_teams_cursor"] = (
+                    self.encode_cursor(team_list[-1]["created_at"], team_list[-1]["id"]) if len(rows) > limit else None
+                )
+
+            if "game_stats" in sections:
+                status["game_stats"] = {
+                    "total_players": stats_dict.get("total_players", 0),
+                    "total_teams": stats_dict.get("total_teams", 0),
+                    "free_agents_count": results.pop(0)[0][0]
+                }
+
+            return status
+
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Failed to get status page: {str(e)}"
+            }
+
+    @staticmethod
+    def _admin_order(sort: str, columns: Dict[str, str], id_column: str, backwards: bool = False) -> str:
+        """ORDER BY clause for an admin sort like "name" or "-name" (descending), with the id breaking ties
+
+        backwards reverses it, to read the rows just before a cursor.
+        """
+        column = columns.get(sort.removeprefix("-"))
+        if column is None:
+            raise ValueError(f"Unknown sort '{sort}'; expected one of: {', '.join(columns)}")
+        direction = "DESC" if sort.startswith("-") != backwards else "ASC"
+        return f"ORDER BY {column} {direction}, {id_column} {direction}"
+
+    @staticmethod
+    def _admin_keyset(sort: str, columns: Dict[str, str], id_column: str, cursor: Optional[str],
+                      backwards: bool) -> Tuple[Optional[str], list]:
+        """Row-value condition for the rows after a cursor in the sort's order (before it when backwards)"""
+        if not cursor:
+            return None, []
+        operator = "<" if sort.startswith("-") != backwards else ">"
+        return f"({columns[sort.removeprefix('-')]}, {id_column}) {operator} (?, ?)", list(
+            TursoGameManager.decode_cursor(cursor)
+        )
+
+    @staticmethod
+    def _admin_where(filter_sql: str, search: str, name_column: str,
+                     keyset: Tuple[Optional[str], list] = (None, [])) -> Tuple[str, list]:
+        """WHERE clause combining an admin filter, a case-insensitive name search and a keyset condition"""
+        conditions, args = [filter_sql] if filter_sql else [], []
+        if search:
+            conditions.append(f"{name_column} LIKE ? ESCAPE '\\'")
+            args.append("%" + search.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%")
+        if keyset[0]:
+            conditions.append(keyset[0])
+            args.extend(keyset[1])
+        return (f"WHERE {' AND '.join(conditions)}" if conditions else ""), args
+
+    @classmethod
+    def check_admin_view(cls, players_filter: str, players_sort: str, teams_filter: str, teams_sort: str,
+                         *cursors: str):
+        """Raise ValueError for an admin filter, sort or cursor that get_admin_page does not know"""
+        for name, value, filters in (("players", players_filter, ADMIN_PLAYER_FILTERS),
+                                     ("teams", teams_filter, ADMIN_TEAM_FILTERS)):
+            if value not in filters:
+                raise ValueError(f"Unknown {name} filter '{value}'; expected one of: {', '.join(filters)}")
+        cls._admin_order(players_sort, ADMIN_PLAYER_SORTS, "p.id")
+        cls._admin_order(teams_sort, ADMIN_TEAM_SORTS, "t.id")
+        for cursor in cursors:
+            if cursor:
+                cls.decode_cursor(cursor)
+
+    @classmethod
+    def _admin_page_statement(cls, columns_sql: str, from_sql: str, filter_sql: str, search: str,
+                              name_column: str, sort: str, sorts: Dict[str, str], id_column: str,
+                              after: str, before: str, page_size: int) -> Tuple[str, list]:
+        """Query for one admin table's page from a cursor, with the sort column appended to each row"""
+        backwards = bool(before) and not after
+        keyset = cls._admin_keyset(sort, sorts, id_column, after or before, backwards)
+        where, args = cls._admin_where(filter_sql, search, name_column, keyset)
+        order = cls._admin_order(sort, sorts, id_column, backwards)
+        # One extra row tells whether there is another page in the direction read
+        return (
+            f"SELECT {columns_sql}, {sorts[sort.removeprefix('-')]} FROM {from_sql} {where} {order} LIMIT ?",
+            args + [page_size + 1]
+        )
+
+    def _admin_page(self, rows: list, after: str, before: str,
+                    page_size: int) -> Tuple[list, Optional[str], Optional[str]]:
+        """(rows in display order, previous page cursor, next page cursor) from an _admin_page_statement result"""
+        # Rows end with the sort column and start with the id
+        more = len(rows) > page_size
+        rows = list(rows[:page_size])
+        if before and not after:
+            rows.reverse()
+            previous_more, next_more = more, True
+        else:
+            previous_more, next_more = bool(after), more
+        if not rows:
+            return rows, None, None
+        return (
+            rows,
+            self.encode_cursor(rows[0][-1], rows[0][0]) if previous_more else None,
+            self.encode_cursor(rows[-1][-1], rows[-1][0]) if next_more else None,
+        )
+
+    async def get_admin_page(self, players_search: str = "", players_filter: str = "all",
+                             players_sort: str = "joined_at", players_after: str = "", players_before: str = "",
+                             teams_search: str = "", teams_filter: str = "all",
+                             teams_sort: str = "created_at", teams_after: str = "", teams_before: str = "",
+                             page_size: int = ADMIN_PAGE_SIZE, min_version: int = 0) -> Dict[str, Any]:
+        """Get one page of players and one of teams for the admin panel, searched, filtered and sorted in SQL
+
+        Pages are keyset pages: *_after is the previous page's next cursor, *_before the
+        next page's previous cursor, so each page is read from the sort column's index
+        wherever it starts. Filters and search are checked row by row as the index is
+        walked, so a page costs more only when few rows match them.
+        """
+        self.check_admin_view(players_filter, players_sort, teams_filter, teams_sort,
+                              players_after, players_before, teams_after, teams_before)
+        players_statement = self._admin_page_statement(
+            "p.id, p.name, p.team_id, p.joined_at, t.name", "players p LEFT JOIN teams t ON t.id = p.team_id",
+            ADMIN_PLAYER_FILTERS[players_filter], players_search, "p.name",
+            players_sort, ADMIN_PLAYER_SORTS, "p.id", players_after, players_before, page_size
+        )
+        teams_statement = self._admin_page_statement(
+            "t.id, t.name, t.created_at, (SELECT COUNT(*) FROM team_members WHERE team_id = t.id)", "teams t",
+            ADMIN_TEAM_FILTERS[teams_filter], teams_search, "t.name",
+            teams_sort, ADMIN_TEAM_SORTS, "t.id", teams_after, teams_before, page_size
+        )
+
+        try:
+            version, stats, free_agents, players, teams = await self._read([
+                ("SELECT stat_key, stat_value FROM game_stats", []),
+                ("SELECT COUNT(*) FROM players WHERE team_id IS NULL", []),
+                players_statement,
+                teams_statement,
+            ], min_version=min_version)
+
+            stats_dict = {row[0]: row[1] for row in stats}
+            self._cache_settings(stats_dict)
+            max_team_size = self._settings["max_team_size"]
+            players, players_previous, players_next = self._admin_page(players, players_after, players_before,
+                                                                       page_size)
+            teams, teams_previous, teams_next = self._admin_page(teams, teams_after, teams_before, page_size)
+
+            return {
+                "success": True,
+                "state_version": version[0][0],
+                "stats": {
+                    "total_players": stats_dict.get("total_players", 0),
+                    "total_teams": stats_dict.get("total_teams", 0),
+                    "free_agents_count": free_agents[0][0]
+                },
+                "max_team_size": max_team_size,
+                "poaching_enabled": bool(self._settings["poaching_enabled"]),
+                "players": [
+                    {"id": row[0], "name": row[1], "team_id": row[2], "joined_at": row[3], "team_name": row[4]}
+                    for row in players
+                ],
+                "players_previous_cursor": players_previous,
+                "players_next_cursor": players_next,
+                "teams": [
+                    {
+                        "id": row[0],
+                        "name": row[1],
+                        "created_at": row[2],
+                        "member_count": row[3],
+                        "is_full": row[3] >= max_team_size
+                    }
+                    for row in teams
+                ],
+                "teams_previous_cursor": teams_previous,
+                "teams_next_cursor": teams_next
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Failed to get admin page: {str(e)}"
+            }
+
+    async def get_state_version(self, min_version: int = 0) -> Optional[int]:
+        """Get the current state version with a single-row read, or None if it cannot be read"""
+        try:
+            version, = await self._read([], min_version=min_version)
+            return version[0][0]
+        except Exception:
+            return None
+
+    async def get_changes(self, since: int, limit: int = CHANGES_PAGE_SIZE, min_version: int = 0) -> Dict[str, Any]:
+        """Get change log entries after version since, oldest first"""
+        try:
+            version, changes, log_start = await self._read([
+                (
+                    "SELECT version, event, payload, created_at FROM state_changes "
+                    "WHERE version > ? ORDER BY version LIMIT ?",
+                    [since, limit + 1]
+                ),
+                ("SELECT version, event FROM state_changes ORDER BY version LIMIT 1", []),
+            ], min_version=min_version)
+
+            # The log holds every change after its oldest entry, and that entry too unless it
+            # only marks where the log started; anything older was pruned or never logged
+            if not log_start or since < log_start[0][0] - (log_start[0][1] != "log_started"):
+                return {
+                    "success": True,
+                    "since": since,
+                    "state_version": version[0][0],
+                    "changes": [],
+                    "has_more": False,
+                    "resync_required": True,
+                    "message": f"Version {since} is older than the change log; "
+                               f"resync from /status and ask for changes after its state version"
+                }
+
+            change_list = []
+            for row in changes[:limit]:
+                change = {"version": row[0], "event": row[1], "created_at": row[3]}
+                change.update(json.loads(row[2]))
+                change_list.append(change)
+
+            return {
+                "success": True,
+                "since": since,
+                "state_version": version[0][0],
+                "changes": change_list,
+                "has_more": len(changes) > limit,
+                "resync_required": False
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Failed to get changes: {str(e)}"
             }
 
     async def reset_database(self) -> Dict[str, Any]:
         """Reset the entire database - delete all data"""
         try:
-            client = self._get_client()
-            
-            # Delete all data
-            client.execute("DELETE FROM team_members")
-            client.execute("DELETE FROM teams")
-            client.execute("DELETE FROM players")
-            client.execute("UPDATE game_stats SET stat_value = 0 WHERE stat_key IN ('total_players', 'total_teams')")
+            # Delete all data and the change log before it; clients replaying the log
+            # from just before the reset start over from empty, older ones resync
+            results = await self._mutate("reset", [
+                (
+                    "DELETE FROM state_changes "
+                    "WHERE version <= (SELECT stat_value FROM game_stats WHERE stat_key = 'state_version')",
+                    []
+                ),
+                ("DELETE FROM team_members", []),
+                ("DELETE FROM teams", []),
+                ("DELETE FROM players", []),
+                ("UPDATE game_stats SET stat_value = 0 WHERE stat_key IN ('total_players', 'total_teams')", []),
+                ("UPDATE game_stats SET stat_value = stat_value + 1 WHERE stat_key = 'state_version'", []),
+            ])
             
             return {
                 "success": True,
-                "message": "Database reset successfully"
+                "message": "Database reset successfully",
+                "state_version": results[-1][0][0]
             }
         except Exception as e:
             return {
@@ -627,52 +1478,26 @@ INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0
     async def delete_player(self, player_name: str) -> Dict[str, Any]:
         """Delete a player and remove them from their team"""
         try:
-            client = self._get_client()
-            
-            # Get player info
-            player_data = client.execute(
-                "SELECT id, team_id FROM players WHERE name = ?",
-                [player_name]
-            )
+            results = await self._mutate("player_deleted", [
+                (
+                    "DELETE FROM team_members WHERE player_id = (SELECT id FROM players WHERE name = ?)",
+                    [player_name]
+                ),
+                *self._dissolve_team_statements("SELECT team_id FROM players WHERE name = ?1", [player_name]),
+                ("DELETE FROM players WHERE name = ?", [player_name]),
+                self._count_changes(total_players=-1, state_version=1),
+            ], players=[player_name])
             
-            if len(player_data) == 0:
+            if results[3].rows_affected == 0:
                 return {
                     "success": False,
                     "message": f"Player '{player_name}' not found"
                 }
             
-            player_id = player_data[0][0]
-            team_id = player_data[0][1]
-            
-            # Delete from team_members if in a team
-            if team_id:
-                client.execute(
-                    "DELETE FROM team_members WHERE player_id = ?",
-                    [player_id]
-                )
-                
-                # Check if team is now empty
-                remaining = client.execute(
-                    "SELECT COUNT(*) FROM team_members WHERE team_id = ?",
-                    [team_id]
-                )
-                
-                if remaining[0][0] == 0:
-                    # Delete empty team
-                    client.execute("DELETE FROM teams WHERE id = ?", [team_id])
-                    client.execute(
-                        "UPDATE game_stats SET stat_value = stat_value - 1 WHERE stat_key = 'total_teams'"
-                    )
-            
-            # Delete player
-            client.execute("DELETE FROM players WHERE id = ?", [player_id])
-            client.execute(
-                "UPDATE game_stats SET stat_value = stat_value - 1 WHERE stat_key = 'total_players'"
-            )
-            
             return {
                 "success": True,
-                "message": f"Player '{player_name}' deleted successfully"
+                "message": f"Player '{player_name}' deleted successfully",
+                "state_version": results[-1][0][0]
             }
         except Exception as e:
             return {
@@ -683,43 +1508,30 @@ INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0
     async def delete_team(self, team_name: str) -> Dict[str, Any]:
         """Delete a team and set all members as free agents"""
         try:
-            client = self._get_client()
+            results = await self._mutate("team_deleted", [
+                # Set all team members as free agents
+                (
+                    "UPDATE players SET team_id = NULL WHERE team_id = (SELECT id FROM teams WHERE name = ?)",
+                    [team_name]
+                ),
+                (
+                    "DELETE FROM team_members WHERE team_id = (SELECT id FROM teams WHERE name = ?)",
+                    [team_name]
+                ),
+                ("DELETE FROM teams WHERE name = ?", [team_name]),
+                self._count_changes(total_teams=-1, state_version=1),
+            ], teams=[team_name])
             
-            # Get team info
-            team_data = client.execute(
-                "SELECT id FROM teams WHERE name = ?",
-                [team_name]
-            )
-            
-            if len(team_data) == 0:
+            if results[2].rows_affected == 0:
                 return {
                     "success": False,
                     "message": f"Team '{team_name}' not found"
                 }
             
-            team_id = team_data[0][0]
-            
-            # Set all team members as free agents
-            client.execute(
-                "UPDATE players SET team_id = NULL WHERE team_id = ?",
-                [team_id]
-            )
-            
-            # Delete team_members relationships
-            client.execute(
-                "DELETE FROM team_members WHERE team_id = ?",
-                [team_id]
-            )
-            
-            # Delete team
-            client.execute("DELETE FROM teams WHERE id = ?", [team_id])
-            client.execute(
-                "UPDATE game_stats SET stat_value = stat_value - 1 WHERE stat_key = 'total_teams'"
-            )
-            
             return {
                 "success": True,
-                "message": f"Team '{team_name}' deleted successfully"
+                "message": f"Team '{team_name}' deleted successfully",
+                "state_version": results[-1][0][0]
             }
         except Exception as e:
             return {
@@ -733,23 +1545,28 @@ INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0
             # Create test players
             test_players = ["Alice", "Bob", "Charlie", "Diana", "Eve", "Frank"]
             created_players = []
+            results = []
             
             for name in test_players:
                 result = await self.join_game(name)
+                results.append(result)
                 if result["success"]:
                     created_players.append(name)
             
             # Create test teams
             if len(created_players) >= 4:
-                await self.create_team("TeamAlpha", created_players[0])
-                await self.join_team("TeamAlpha", created_players[1])
+                results.append(await self.create_team("TeamAlpha", created_players[0]))
+                results.append(await self.join_team("TeamAlpha", created_players[1]))
                 
-                await self.create_team("TeamBeta", created_players[2])
-                await self.join_team("TeamBeta", created_players[3])
+                results.append(await self.create_team("TeamBeta", created_players[2]))
+                results.append(await self.join_team("TeamBeta", created_players[3]))
             
+            # The version after the last write that went through, so readers can wait for all of them
+            versions = [result["state_version"] for result in results if result.get("state_version") is not None]
             return {
                 "success": True,
-                "message": f"Created {len(created_players)} test players and 2 teams"
+                "message": f"Created {len(created_players)} test players and 2 teams",
+                "state_version": max(versions) if versions else None
             }
         except Exception as e:
             return {
@@ -757,24 +1574,59 @@ INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0
                 "message": f"Failed to create test data: {str(e)}"
             }
 
+    async def _get_settings(self) -> Dict[str, int]:
+        """Get game settings from memory, re-checking settings_version once they go stale"""
+        now = time.monotonic()
+        if self._settings is not None and now - self._settings_checked_at < SETTINGS_REFRESH_SECONDS:
+            return self._settings
+
+        # Only returns rows when the stored version differs from the cached one
+        _, result = await self._read([(
+            """
+            SELECT stat_key, stat_value FROM game_stats
+            WHERE stat_key IN ('settings_version', 'max_team_size', 'poaching_enabled')
+              AND COALESCE((SELECT stat_value FROM game_stats WHERE stat_key = 'settings_version'), 0) IS NOT ?
+            """,
+            [self._settings_version]
+        )], min_version=self._settings_write_version)
+
+        if self._settings is None or len(result) > 0:
+            self._cache_settings({row[0]: row[1] for row in result})
+        self._settings_checked_at = now
+        return self._settings
+
+    def _cache_settings(self, stats: Dict[str, int]):
+        """Store settings read from game_stats, falling back to defaults"""
+        self._settings = {key: stats.get(key, default) for key, default in DEFAULT_SETTINGS.items()}
+        self._settings_version = stats.get("settings_version", 0)
+        self._settings_checked_at = time.monotonic()
+
+    def _invalidate_settings(self):
+        """Drop cached settings so the next read reloads them"""
+        self._settings = None
+        self._settings_version = None
+
+    async def _save_setting(self, key: str, value: int):
+        """Write a setting and bump settings_version so other workers reload"""
+        # A new max_team_size lists the teams whose is_full it flips, and their members
+        results = await self._mutate("setting_changed", [
+            ("INSERT OR REPLACE INTO game_stats (stat_key, stat_value) VALUES (?, ?)", [key, value]),
+            (
+                "UPDATE game_stats SET stat_value = stat_value + 1 "
+                "WHERE stat_key IN ('settings_version', 'state_version')",
+                []
+            ),
+        ], max_team_size=value if key == "max_team_size" else None)
+        # Reload from a replica only once it has seen this write
+        self._settings_write_version = results[-1][0][0]
+        self._invalidate_settings()
+        return self._settings_write_version
+
     async def get_max_team_size(self) -> int:
         """Get the current max team size setting"""
         try:
-            client = self._get_client()
-            
-            # Check if setting exists
-            result = client.execute(
-                "SELECT stat_value FROM game_stats WHERE stat_key = 'max_team_size'"
-            )
-            
-            if len(result) > 0:
-                return result[0][0]
-            else:
-                # Default to 2 if not set
-                client.execute(
-                    "INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('max_team_size', 2)"
-                )
-                return 2
+            settings = await self._get_settings()
+            return settings["max_team_size"]
         except Exception as e:
             return 2  # Default fallback
 
@@ -787,17 +1639,12 @@ INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0
                     "message": "Team size must be between 1 and 10"
                 }
             
-            client = self._get_client()
-            
-            # Insert or update the setting
-            client.execute(
-                "INSERT OR REPLACE INTO game_stats (stat_key, stat_value) VALUES ('max_team_size', ?)",
-                [size]
-            )
+            state_version = await self._save_setting("max_team_size", size)
             
             return {
                 "success": True,
-                "message": f"Max team size set to {size}"
+                "message": f"Max team size set to {size}",
+                "state_version": state_version
             }
         except Exception as e:
             return {
@@ -805,45 +1652,143 @@ INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('total_teams', 0
                 "message": f"Failed to set max team size: {str(e)}"
             }
 
+    async def auto_assign_free_agents(self) -> Dict[str, Any]:
+        """Put every free agent on a team, filling the emptiest teams first and creating teams as needed"""
+        try:
+            for _ in range(AUTO_ASSIGN_ATTEMPTS):
+                result = await self._auto_assign_once()
+                if result is not None:
+                    return result
+
+            return {
+                "success": False,
+                "message": "The game kept changing while free agents were being assigned; try again"
+            }
+
+        except Exception as e:
+            return {
+                "success": False,
+                "message": f"Failed to auto-assign free agents: {str(e)}"
+            }
+
+    async def _auto_assign_once(self) -> Optional[Dict[str, Any]]:
+        """Plan every assignment from one read and write it in one batch; None if the game changed in between"""
+        free_agents, teams, max_team_size = await self._batch([
+            ("SELECT id, name FROM players WHERE team_id IS NULL ORDER BY joined_at, id", []),
+            (
+                """
+                SELECT t.id, t.name, COUNT(tm.player_id)
+                FROM teams t LEFT JOIN team_members tm ON tm.team_id = t.id
+                GROUP BY t.id
+                ORDER BY t.created_at, t.id
+                """,
+                []
+            ),
+            (f"SELECT {MAX_TEAM_SIZE_SQL}", []),
+        ])
+        max_team_size = max_team_size[0][0]
+
+        if len(free_agents) == 0:
+            return {
+                "success": False,
+                "message": "No free agents to assign"
+            }
+
+        # Teams with space as (member count, creation order, id, name): the emptiest pops first
+        open_teams = [(count, order, team_id, name)
+                      for order, (team_id, name, count) in enumerate(teams) if count < max_team_size]
+        heapq.heapify(open_teams)
+        team_names = {team_id: name for team_id, name, _ in teams}
+        self._team_names.sync(name for _, name, _ in teams)
+
+        created_at = datetime.utcnow().isoformat()
+        assignments, new_teams = [], []
+        for player_id, _ in free_agents:
+            if open_teams:
+                count, order, team_id, name = heapq.heappop(open_teams)
+            else:
+                team_id = await self.get_next_id()
+                name = self._team_names.take()
+                count, order = 0, len(teams) + len(new_teams)
+                new_teams.append([team_id, name, created_at])
+                team_names[team_id] = name
+            assignments.append([player_id, team_id])
+            if count + 1 < max_team_size:
+                heapq.heappush(open_teams, (count + 1, order, team_id, name))
+
+        plan = json.dumps(assignments)
+        created = json.dumps(new_teams)
+        try:
+            results = await self._mutate("free_agents_assigned", [
+                (AUTO_ASSIGN_GUARD_SQL, [plan, created]),
+                (
+                    """
+                    INSERT INTO teams (id, name, created_at)
+                    SELECT json_extract(value, '$[0]'), json_extract(value, '$[1]'), json_extract(value, '$[2]')
+                    FROM json_each(?) ORDER BY key
+                    """,
+                    [created]
+                ),
+                (
+                    """
+                    INSERT INTO team_members (team_id, player_id, joined_at)
+                    SELECT json_extract(value, '$[1]'), json_extract(value, '$[0]'), ?2
+                    FROM json_each(?1) ORDER BY key
+                    """,
+                    [plan, created_at]
+                ),
+                (
+                    """
+                    UPDATE players SET team_id = (SELECT team_id FROM team_members WHERE player_id = players.id)
+                    WHERE id IN (SELECT json_extract(value, '$[0]') FROM json_each(?))
+                    """,
+                    [plan]
+                ),
+                (
+                    "UPDATE game_stats SET stat_value = stat_value + CASE stat_key WHEN 'total_teams' THEN ? ELSE 1 END "
+                    "WHERE stat_key IN ('total_teams', 'state_version')",
+                    [len(new_teams)]
+                ),
+            ], players=[name for _, name in free_agents],
+               teams=sorted({team_names[team_id] for _, team_id in assignments}))
+        except Exception as e:
+            if "batch_operation_failed" in str(e):
+                return None
+            raise
+
+        message = f"Assigned {len(assignments)} free agents to teams"
+        if new_teams:
+            message += f" (created {len(new_teams)} new teams)"
+
+        return {
+            "success": True,
+            "message": message,
+            "assigned_count": len(assignments),
+            "teams_created": len(new_teams),
+            "state_version": results[-1][0][0]
+        }
+
     async def get_poaching_enabled(self) -> bool:
         """Get the current poaching enabled setting"""
         try:
-            client = self._get_client()
-            
-            # Check if setting exists
-            result = client.execute(
-                "SELECT stat_value FROM game_stats WHERE stat_key = 'poaching_enabled'"
-            )
-            
-            if len(result) > 0:
-                return bool(result[0][0])
-            else:
-                # Default to enabled if not set
-                client.execute(
-                    "INSERT OR IGNORE INTO game_stats (stat_key, stat_value) VALUES ('poaching_enabled', 1)"
-                )
-                return True
+            settings = await self._get_settings()
+            return bool(settings["poaching_enabled"])
         except Exception as e:
             return True  # Default fallback
 
     async def set_poaching_enabled(self, enabled: bool) -> Dict[str, Any]:
         """Enable or disable poaching"""
         try:
-            client = self._get_client()
-            
             value = 1 if enabled else 0
             
-            # Insert or update the setting
-            client.execute(
-                "INSERT OR REPLACE INTO game_stats (stat_key, stat_value) VALUES ('poaching_enabled', ?)",
-                [value]
-            )
+            state_version = await self._save_setting("poaching_enabled", value)
             
             status = "enabled" if enabled else "disabled"
             return {
                 "success": True,
                 "message": f"Poaching {status}",
-                "poaching_enabled": enabled
+                "poaching_enabled": enabled,
+                "state_version": state_version
             }
         except Exception as e:
             return {